@@ -0,0 +1,44 @@
+"""Add numeric ticket priority rank for indexed ready ordering.
+
+Revision ID: 0002_ticket_priority_rank
+Revises: 0001_initial
+Create Date: 2026-10-17 00:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0002_ticket_priority_rank"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("tickets", sa.Column("priority_rank", sa.Integer(), nullable=True))
+    op.execute(
+        """
+        UPDATE tickets SET priority_rank = CASE priority
+            WHEN 'critical' THEN 0
+            WHEN 'high' THEN 1
+            WHEN 'medium' THEN 2
+            WHEN 'low' THEN 3
+            ELSE 4
+        END
+        """
+    )
+    with op.batch_alter_table("tickets") as batch_op:
+        batch_op.alter_column("priority_rank", existing_type=sa.Integer(), nullable=False)
+    op.create_index(
+        "ix_tickets_status_priority_created",
+        "tickets",
+        ["status", "priority_rank", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tickets_status_priority_created", table_name="tickets")
+    with op.batch_alter_table("tickets") as batch_op:
+        batch_op.drop_column("priority_rank")
@@ -0,0 +1,50 @@
+"""Link tickets to their active lease row and add the lease archive table.
+
+Revision ID: 0003_active_lease_and_archive
+Revises: 0002_ticket_priority_rank
+Create Date: 2026-10-17 00:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0003_active_lease_and_archive"
+down_revision = "0002_ticket_priority_rank"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("tickets", sa.Column("active_lease_id", sa.Integer(), nullable=True))
+    op.execute(
+        """
+        UPDATE tickets SET active_lease_id = (
+            SELECT MAX(leases.id) FROM leases WHERE leases.token = tickets.lease_token
+        )
+        WHERE lease_token IS NOT NULL
+        """
+    )
+    op.create_index("ix_leases_released_at", "leases", ["released_at"])
+
+    op.create_table(
+        "lease_archive",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("ticket_id", sa.String(length=64), nullable=False),
+        sa.Column("owner", sa.String(length=255), nullable=False),
+        sa.Column("token", sa.String(length=64), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("released_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_lease_archive_ticket_id", "lease_archive", ["ticket_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_lease_archive_ticket_id", table_name="lease_archive")
+    op.drop_table("lease_archive")
+
+    op.drop_index("ix_leases_released_at", table_name="leases")
+    with op.batch_alter_table("tickets") as batch_op:
+        batch_op.drop_column("active_lease_id")
@@ -0,0 +1,57 @@
+"""Add aged priority timestamp for starvation-free ready ordering.
+
+Revision ID: 0004_ticket_priority_due_at
+Revises: 0003_active_lease_and_archive
+Create Date: 2026-10-17 00:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0004_ticket_priority_due_at"
+down_revision = "0003_active_lease_and_archive"
+branch_labels = None
+depends_on = None
+
+# Existing tickets are backfilled with the default PRIORITY_AGING_MINUTES. A
+# deployment running another value should rerun the backfill with
+# scripts/backfill_priority_due_at.py, since readers order by the stored value.
+_AGING_MINUTES = 60
+
+
+def upgrade() -> None:
+    op.add_column("tickets", sa.Column("priority_due_at", sa.DateTime(timezone=True), nullable=True))
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute(
+            f"""
+            UPDATE tickets SET priority_due_at = strftime(
+                '%Y-%m-%d %H:%M:%f',
+                created_at,
+                '+' || (priority_rank * {_AGING_MINUTES}) || ' minutes'
+            )
+            """
+        )
+    else:
+        op.execute(
+            f"""
+            UPDATE tickets
+            SET priority_due_at = created_at + priority_rank * INTERVAL '{_AGING_MINUTES} minutes'
+            """
+        )
+    with op.batch_alter_table("tickets") as batch_op:
+        batch_op.alter_column(
+            "priority_due_at", existing_type=sa.DateTime(timezone=True), nullable=False
+        )
+    op.create_index(
+        "ix_tickets_status_priority_due",
+        "tickets",
+        ["status", "priority_due_at", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tickets_status_priority_due", table_name="tickets")
+    with op.batch_alter_table("tickets") as batch_op:
+        batch_op.drop_column("priority_due_at")
@@ -0,0 +1,23 @@
+"""Index tickets for keyset pagination on (created_at, id).
+
+Revision ID: 0005_ticket_keyset_index
+Revises: 0004_ticket_priority_due_at
+Create Date: 2026-10-17 00:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0005_ticket_keyset_index"
+down_revision = "0004_ticket_priority_due_at"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_tickets_created_id", "tickets", ["created_at", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tickets_created_id", table_name="tickets")
@@ -0,0 +1,41 @@
+"""Add precomputed run deadline for indexed runtime-budget sweeps.
+
+Revision ID: 0006_run_deadline_at
+Revises: 0005_ticket_keyset_index
+Create Date: 2026-10-17 00:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0006_run_deadline_at"
+down_revision = "0005_ticket_keyset_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("runs", sa.Column("deadline_at", sa.DateTime(timezone=True), nullable=True))
+    if op.get_bind().dialect.name == "sqlite":
+        op.execute(
+            """
+            UPDATE runs SET deadline_at = strftime(
+                '%Y-%m-%d %H:%M:%f',
+                started_at,
+                '+' || max_minutes || ' minutes'
+            )
+            """
+        )
+    else:
+        op.execute("UPDATE runs SET deadline_at = started_at + max_minutes * INTERVAL '1 minute'")
+    with op.batch_alter_table("runs") as batch_op:
+        batch_op.alter_column("deadline_at", existing_type=sa.DateTime(timezone=True), nullable=False)
+    op.create_index("ix_runs_state_deadline", "runs", ["state", "deadline_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_runs_state_deadline", table_name="runs")
+    with op.batch_alter_table("runs") as batch_op:
+        batch_op.drop_column("deadline_at")
@@ -0,0 +1,35 @@
+"""Add the run event segment index for archived run events.
+
+Revision ID: 0008_run_event_segments
+Revises: 0007_run_version
+Create Date: 2026-10-17 00:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0008_run_event_segments"
+down_revision = "0007_run_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "run_event_segments",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("run_id", sa.String(length=64), nullable=False),
+        sa.Column("segment", sa.String(length=255), nullable=False),
+        sa.Column("offset", sa.Integer(), nullable=False),
+        sa.Column("length", sa.Integer(), nullable=False),
+        sa.Column("event_count", sa.Integer(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_run_event_segments_run_id", "run_event_segments", ["run_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_run_event_segments_run_id", table_name="run_event_segments")
+    op.drop_table("run_event_segments")
@@ -0,0 +1,37 @@
+"""Add run snapshot and projection checkpoint tables.
+
+Revision ID: 0009_run_projection
+Revises: 0008_run_event_segments
+Create Date: 2026-10-17 00:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0009_run_projection"
+down_revision = "0008_run_event_segments"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "run_snapshots",
+        sa.Column("run_id", sa.String(length=64), primary_key=True),
+        sa.Column("last_event_id", sa.Integer(), nullable=False),
+        sa.Column("data", sa.JSON(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_table(
+        "projection_checkpoints",
+        sa.Column("name", sa.String(length=64), primary_key=True),
+        sa.Column("last_event_id", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("projection_checkpoints")
+    op.drop_table("run_snapshots")
@@ -0,0 +1,46 @@
+"""Add the SQL-backed ready queue and its dead-letter table.
+
+Revision ID: 0010_sql_queue
+Revises: 0009_run_projection
+Create Date: 2026-10-17 00:00:00
+"""
+
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0010_sql_queue"
+down_revision = "0009_run_projection"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "queue_items",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("queue", sa.String(length=64), nullable=False),
+        sa.Column("ticket_id", sa.String(length=64), nullable=False),
+        sa.Column("priority_rank", sa.Integer(), nullable=False),
+        sa.Column("enqueued_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_queue_items_queue_priority", "queue_items", ["queue", "priority_rank", "id"]
+    )
+    op.create_table(
+        "queue_dead_letters",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("queue", sa.String(length=64), nullable=False),
+        sa.Column("ticket_id", sa.String(length=64), nullable=False),
+        sa.Column("reason", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_queue_dead_letters_queue", "queue_dead_letters", ["queue"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_queue_dead_letters_queue", table_name="queue_dead_letters")
+    op.drop_table("queue_dead_letters")
+    op.drop_index("ix_queue_items_queue_priority", table_name="queue_items")
+    op.drop_table("queue_items")
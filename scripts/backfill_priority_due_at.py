@@ -0,0 +1,43 @@
+"""Recompute ``tickets.priority_due_at`` after changing ``PRIORITY_AGING_MINUTES``.
+
+Dispatch order follows the ``priority_due_at`` written at insert, so tickets
+created under an old aging value keep it until this script rewrites them.
+Runs in keyset batches by id, committing each batch.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from software_factory.config import get_settings
+from software_factory.core.backlog import operations
+from software_factory.db.session import create_session_factory
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--aging", type=int, default=get_settings().priority_aging_minutes)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    session_factory = create_session_factory()
+    after: str | None = None
+    while True:
+        with session_factory() as session:
+            last_id = operations.backfill_priority_due_at(session, args.aging, after, args.batch)
+            session.commit()
+        if last_id is None:
+            break
+        after = last_id
+    print(f"recomputed priority_due_at with aging={args.aging}")
+
+
+if __name__ == "__main__":
+    main()
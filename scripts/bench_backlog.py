@@ -0,0 +1,81 @@
+"""Compare backlog throughput of the in-memory and SQLAlchemy implementations."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from software_factory.core.backlog import BacklogInterface, InMemoryBacklog, SQLAlchemyBacklog
+from software_factory.core.models import Ticket, TicketPriority
+from software_factory.db.base import Base
+
+PRIORITIES = list(TicketPriority)
+
+
+def make_tickets(count: int) -> list[Ticket]:
+    return [
+        Ticket(
+            id=f"BENCH-{i}",
+            source="bench",
+            type="bug",
+            priority=PRIORITIES[i % len(PRIORITIES)],
+            repo="example/repo",
+            idempotency_key=f"bench-{i}",
+        )
+        for i in range(count)
+    ]
+
+
+def timed(label: str, fn: Callable[[], object]) -> None:
+    start = time.perf_counter()
+    fn()
+    print(f"  {label:<28} {(time.perf_counter() - start) * 1000:10.1f} ms")
+
+
+def run(name: str, backlog: BacklogInterface, tickets: list[Ticket], batch: int) -> None:
+    print(name)
+    timed(f"create_tickets x{len(tickets)}", lambda: backlog.create_tickets(tickets))
+    timed("fetch_ready x100", lambda: [backlog.fetch_ready(limit=batch) for _ in range(100)])
+
+    leases = []
+
+    def _claim_all() -> None:
+        while claimed := backlog.claim_next("bench", n=batch):
+            leases.extend(claimed)
+
+    timed(f"claim_next(n={batch}) drain", _claim_all)
+    timed("heartbeat_many all", lambda: backlog.heartbeat_many([(x.ticket_id, x.token) for x in leases]))
+    timed("complete_ticket all", lambda: [backlog.complete_ticket(x.ticket_id, x.token) for x in leases])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=50)
+    args = parser.parse_args()
+
+    tickets = make_tickets(args.tickets)
+    run("memory", InMemoryBacklog(lease_ttl_seconds=600), tickets, args.batch)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite+pysqlite:///{tmp}/bench.db", future=True)
+        Base.metadata.create_all(engine)
+        factory = sessionmaker(bind=engine, expire_on_commit=False, future=True)
+        run("sqlite", SQLAlchemyBacklog(factory, lease_ttl_seconds=600), tickets, args.batch)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compare queue throughput of the Redis (fakeredis) and SQL implementations."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+import fakeredis
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from software_factory.core.models import TicketPriority
+from software_factory.core.queue import (
+    PriorityRedisQueue,
+    QueueInterface,
+    QueueItem,
+    RedisQueue,
+    SQLQueue,
+)
+from software_factory.db.base import Base
+
+PRIORITIES = list(TicketPriority)
+
+
+def make_items(count: int) -> list[QueueItem]:
+    return [QueueItem(f"BENCH-{i}", PRIORITIES[i % len(PRIORITIES)]) for i in range(count)]
+
+
+def timed(label: str, fn: Callable[[], object]) -> None:
+    start = time.perf_counter()
+    fn()
+    print(f"  {label:<28} {(time.perf_counter() - start) * 1000:10.1f} ms")
+
+
+def run(name: str, queue: QueueInterface, items: list[QueueItem], batch: int) -> None:
+    print(name)
+    half = len(items) // 2
+    batches = [items[i : i + batch] for i in range(half, len(items), batch)]
+    timed(f"enqueue x{half}", lambda: [queue.enqueue(x) for x in items[:half]])
+    timed(f"enqueue_many(n={batch}) rest", lambda: [queue.enqueue_many(x) for x in batches])
+    timed("pending_count x100", lambda: [queue.pending_count() for _ in range(100)])
+    timed(f"dequeue x{half}", lambda: [queue.dequeue() for _ in range(half)])
+
+    def _drain() -> None:
+        while queue.dequeue_many(batch):
+            pass
+
+    timed(f"dequeue_many(n={batch}) drain", _drain)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=50)
+    args = parser.parse_args()
+
+    items = make_items(args.items)
+    run("redis list (fakeredis)", RedisQueue(fakeredis.FakeRedis()), items, args.batch)
+    run("redis zset (fakeredis)", PriorityRedisQueue(fakeredis.FakeRedis()), items, args.batch)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite+pysqlite:///{tmp}/bench.db", future=True)
+        Base.metadata.create_all(engine)
+        factory = sessionmaker(bind=engine, expire_on_commit=False, future=True)
+        run("sql (sqlite)", SQLQueue(factory), items, args.batch)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
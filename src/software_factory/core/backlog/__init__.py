@@ -1,6 +1,23 @@
 """Backlog package exports."""
 
-from software_factory.core.backlog.interface import BacklogInterface
+from software_factory.core.backlog.async_sqlalchemy_backlog import AsyncSQLAlchemyBacklog
+from software_factory.core.backlog.interface import (
+    AsyncBacklogInterface,
+    BacklogInterface,
+    HeartbeatResult,
+    ReapResult,
+)
+from software_factory.core.backlog.memory_backlog import InMemoryBacklog
+from software_factory.core.backlog.retention import archive_released_leases
 from software_factory.core.backlog.sqlalchemy_backlog import SQLAlchemyBacklog
 
-__all__ = ["BacklogInterface", "SQLAlchemyBacklog"]
+__all__ = [
+    "AsyncBacklogInterface",
+    "AsyncSQLAlchemyBacklog",
+    "BacklogInterface",
+    "HeartbeatResult",
+    "InMemoryBacklog",
+    "ReapResult",
+    "SQLAlchemyBacklog",
+    "archive_released_leases",
+]
@@ -0,0 +1,229 @@
+"""SQLAlchemy asyncio backlog implementation."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from software_factory.config import get_settings
+from software_factory.core.backlog import operations
+from software_factory.core.backlog.interface import (
+    AsyncBacklogInterface,
+    HeartbeatResult,
+    ReapResult,
+)
+from software_factory.core.models import Lease, Ticket, TicketStatus
+
+
+class AsyncSQLAlchemyBacklog(AsyncBacklogInterface):
+    """Backlog adapter using an asyncio SQLAlchemy session factory.
+
+    Each call runs the shared session-level operations through
+    ``AsyncSession.run_sync``, so SQL and semantics match
+    :class:`~software_factory.core.backlog.sqlalchemy_backlog.SQLAlchemyBacklog`
+    while the I/O goes through the async driver (asyncpg, aiosqlite).
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        lease_ttl_seconds: int | None = None,
+        priority_aging_minutes: int | None = None,
+        max_attempts: int | None = None,
+        outbox: bool | None = None,
+    ):
+        settings = get_settings()
+        self.session_factory = session_factory
+        self.lease_ttl_seconds = lease_ttl_seconds or settings.default_lease_ttl_seconds
+        self.priority_aging_minutes = (
+            settings.priority_aging_minutes if priority_aging_minutes is None else priority_aging_minutes
+        )
+        self.max_attempts = max_attempts or settings.max_ticket_attempts
+        self.outbox = settings.ticket_outbox_enabled if outbox is None else outbox
+
+    async def fetch_ready(self, limit: int = 50) -> list[Ticket]:
+        """Fetch ready tickets sorted by priority and creation timestamp."""
+
+        async with self.session_factory() as session:
+            return await session.run_sync(operations.fetch_ready, limit)
+
+    async def iter_tickets(
+        self,
+        status: TicketStatus | None = None,
+        repo: str | None = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Ticket]:
+        """Stream tickets with keyset pagination, one short session per page."""
+
+        after: tuple[datetime, str] | None = None
+        while True:
+            async with self.session_factory() as session:
+                page = await session.run_sync(
+                    operations.ticket_page, after, batch_size, status, repo
+                )
+            for ticket in page:
+                yield ticket
+            if len(page) < batch_size:
+                return
+            after = (page[-1].created_at, page[-1].id)
+
+    async def create_ticket(self, ticket: Ticket) -> Ticket:
+        """Idempotently create a new ticket."""
+
+        async with self.session_factory() as session:
+            try:
+                created = await session.run_sync(
+                    operations.create_tickets, [ticket], self.priority_aging_minutes, self.outbox
+                )
+                await session.commit()
+            except IntegrityError:
+                await session.rollback()
+                created = await session.run_sync(
+                    operations.create_tickets, [ticket], self.priority_aging_minutes, self.outbox
+                )
+                await session.commit()
+            return created[0]
+
+    async def create_tickets(self, tickets: list[Ticket], chunk_size: int = 500) -> list[Ticket]:
+        """Idempotently create tickets in chunks of multi-row inserts."""
+
+        unique: dict[str, Ticket] = {}
+        for ticket in tickets:
+            unique.setdefault(ticket.idempotency_key, ticket)
+
+        pending = list(unique.values())
+        canonical: dict[str, Ticket] = {}
+        async with self.session_factory() as session:
+            for start in range(0, len(pending), chunk_size):
+                chunk = pending[start : start + chunk_size]
+                created_chunk = await session.run_sync(
+                    operations.create_tickets, chunk, self.priority_aging_minutes, self.outbox
+                )
+                for created in created_chunk:
+                    canonical[created.idempotency_key] = created
+                await session.commit()
+
+        return [canonical[ticket.idempotency_key] for ticket in tickets]
+
+    async def claim_ticket(self, ticket_id: str, owner: str) -> Lease | None:
+        """Claim a ticket if it is available or has an expired lease."""
+
+        async with self.session_factory() as session:
+            lease = await session.run_sync(
+                operations.claim_ticket, ticket_id, owner, self.lease_ttl_seconds
+            )
+            await session.commit()
+            return lease
+
+    async def claim_next(self, owner: str, n: int = 1) -> list[Lease]:
+        """Claim up to ``n`` of the highest-priority ready tickets in one transaction."""
+
+        async with self.session_factory() as session:
+            leases = await session.run_sync(operations.claim_next, owner, n, self.lease_ttl_seconds)
+            await session.commit()
+            return leases
+
+    async def claim_tickets(self, ticket_ids: list[str], owner: str) -> list[Lease]:
+        """Claim the given ready tickets in one transaction."""
+
+        async with self.session_factory() as session:
+            leases = await session.run_sync(
+                operations.claim_tickets, ticket_ids, owner, self.lease_ttl_seconds
+            )
+            await session.commit()
+            return leases
+
+    async def heartbeat(self, ticket_id: str, lease_token: str) -> Lease | None:
+        """Extend a valid lease TTL."""
+
+        renewed = (await self.heartbeat_many([(ticket_id, lease_token)])).renewed
+        return renewed[0] if renewed else None
+
+    async def heartbeat_many(self, leases: list[tuple[str, str]]) -> HeartbeatResult:
+        """Extend every still-valid lease in one round trip."""
+
+        async with self.session_factory() as session:
+            result = await session.run_sync(
+                operations.heartbeat_many, leases, self.lease_ttl_seconds
+            )
+            await session.commit()
+            return result
+
+    async def complete_ticket(self, ticket_id: str, lease_token: str) -> Ticket | None:
+        """Complete a ticket when caller holds lease token."""
+
+        return await self._terminal_update(ticket_id, lease_token, TicketStatus.COMPLETED)
+
+    async def fail_ticket(
+        self, ticket_id: str, lease_token: str, reason: str | None = None
+    ) -> Ticket | None:
+        """Fail a ticket when caller holds lease token."""
+
+        return await self._terminal_update(ticket_id, lease_token, TicketStatus.FAILED, reason)
+
+    async def release_in_session(
+        self,
+        session: AsyncSession,
+        ticket_id: str,
+        lease_token: str,
+        status: TicketStatus,
+        reason: str | None = None,
+    ) -> Ticket | None:
+        """Complete or fail a ticket inside the caller's transaction.
+
+        The lease release, status change and attempt counter are staged on
+        ``session`` and committed together with whatever else the caller wrote.
+        """
+
+        return await session.run_sync(
+            operations.release_ticket, ticket_id, lease_token, status, reason, self.outbox
+        )
+
+    async def release_many_in_session(
+        self,
+        session: AsyncSession,
+        leases: list[tuple[str, str]],
+        status: TicketStatus,
+        reason: str | None = None,
+    ) -> list[str]:
+        """Bulk :meth:`release_in_session`; returns the ids of released tickets."""
+
+        return await session.run_sync(
+            operations.release_tickets, leases, status, reason, self.outbox
+        )
+
+    async def reap_expired_leases(
+        self, now: datetime | None = None, batch_size: int = 500
+    ) -> ReapResult:
+        """Reclaim every lease that expired before ``now``, one committed batch at a time."""
+
+        now = now or datetime.now(UTC)
+        requeued: list[str] = []
+        failed: list[str] = []
+        while True:
+            async with self.session_factory() as session:
+                result = await session.run_sync(
+                    operations.reap_expired_leases, now, batch_size, self.max_attempts, self.outbox
+                )
+                await session.commit()
+            requeued.extend(result.requeued)
+            failed.extend(result.failed)
+            if len(result.requeued) + len(result.failed) < batch_size:
+                return ReapResult(requeued=requeued, failed=failed)
+
+    async def _terminal_update(
+        self,
+        ticket_id: str,
+        lease_token: str,
+        status: TicketStatus,
+        reason: str | None = None,
+    ) -> Ticket | None:
+        async with self.session_factory() as session:
+            ticket = await session.run_sync(
+                operations.release_ticket, ticket_id, lease_token, status, reason, self.outbox
+            )
+            await session.commit()
+            return ticket
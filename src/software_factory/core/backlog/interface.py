@@ -3,8 +3,30 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
 
-from software_factory.core.models import Lease, Ticket
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from software_factory.core.models import Lease, Ticket, TicketStatus
+
+
+@dataclass(frozen=True)
+class HeartbeatResult:
+    """Outcome of a batched lease renewal."""
+
+    renewed: list[Lease] = field(default_factory=list)
+    lost: list[str] = field(default_factory=list)
+
+
+@dataclass(frozen=True)
+class ReapResult:
+    """Tickets whose expired leases were reclaimed by a reaper pass."""
+
+    requeued: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
 
 
 class BacklogInterface(ABC):
@@ -14,18 +36,43 @@ class BacklogInterface(ABC):
     def fetch_ready(self, limit: int = 50) -> list[Ticket]:
         """Return ready tickets ordered by priority and age."""
 
+    @abstractmethod
+    def iter_tickets(
+        self,
+        status: TicketStatus | None = None,
+        repo: str | None = None,
+        batch_size: int = 500,
+    ) -> Iterator[Ticket]:
+        """Stream tickets ordered by ``(created_at, id)``, fetching ``batch_size`` at a time."""
+
     @abstractmethod
     def create_ticket(self, ticket: Ticket) -> Ticket:
         """Create a ticket in idempotent manner based on idempotency_key."""
 
+    @abstractmethod
+    def create_tickets(self, tickets: list[Ticket]) -> list[Ticket]:
+        """Idempotently create many tickets, returning canonical tickets in input order."""
+
     @abstractmethod
     def claim_ticket(self, ticket_id: str, owner: str) -> Lease | None:
         """Attempt to claim a ticket; return lease if successful."""
 
+    @abstractmethod
+    def claim_next(self, owner: str, n: int = 1) -> list[Lease]:
+        """Atomically claim up to ``n`` ready tickets in priority order."""
+
+    @abstractmethod
+    def claim_tickets(self, ticket_ids: list[str], owner: str) -> list[Lease]:
+        """Claim the given ready tickets in one batch; return leases for those won."""
+
     @abstractmethod
     def heartbeat(self, ticket_id: str, lease_token: str) -> Lease | None:
         """Renew an existing lease."""
 
+    @abstractmethod
+    def heartbeat_many(self, leases: list[tuple[str, str]]) -> HeartbeatResult:
+        """Renew many ``(ticket_id, lease_token)`` leases; report renewed and lost tickets."""
+
     @abstractmethod
     def complete_ticket(self, ticket_id: str, lease_token: str) -> Ticket | None:
         """Mark ticket completed if lease is valid."""
@@ -33,3 +80,133 @@ class BacklogInterface(ABC):
     @abstractmethod
     def fail_ticket(self, ticket_id: str, lease_token: str, reason: str | None = None) -> Ticket | None:
         """Mark ticket failed if lease is valid."""
+
+    def release_in_session(
+        self,
+        session: Session,
+        ticket_id: str,
+        lease_token: str,
+        status: TicketStatus,
+        reason: str | None = None,
+    ) -> Ticket | None:
+        """Complete or fail a ticket as part of the caller's transaction on ``session``.
+
+        Returns None if ``lease_token`` no longer holds the ticket. Backlogs
+        stored outside that database release through :meth:`complete_ticket`
+        or :meth:`fail_ticket` instead and ignore ``session``.
+        """
+
+        if status == TicketStatus.COMPLETED:
+            return self.complete_ticket(ticket_id, lease_token)
+        return self.fail_ticket(ticket_id, lease_token, reason=reason)
+
+    def release_many_in_session(
+        self,
+        session: Session,
+        leases: list[tuple[str, str]],
+        status: TicketStatus,
+        reason: str | None = None,
+    ) -> list[str]:
+        """Bulk :meth:`release_in_session`; returns the ids of released tickets."""
+
+        return [
+            ticket_id
+            for ticket_id, lease_token in leases
+            if self.release_in_session(session, ticket_id, lease_token, status, reason) is not None
+        ]
+
+    @abstractmethod
+    def reap_expired_leases(
+        self, now: datetime | None = None, batch_size: int = 500
+    ) -> ReapResult:
+        """Return expired claimed tickets to READY, or FAILED once out of attempts."""
+
+
+class AsyncBacklogInterface(ABC):
+    """Asyncio counterpart of :class:`BacklogInterface` with identical semantics."""
+
+    @abstractmethod
+    async def fetch_ready(self, limit: int = 50) -> list[Ticket]:
+        """Return ready tickets ordered by priority and age."""
+
+    @abstractmethod
+    def iter_tickets(
+        self,
+        status: TicketStatus | None = None,
+        repo: str | None = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Ticket]:
+        """Stream tickets ordered by ``(created_at, id)``, fetching ``batch_size`` at a time."""
+
+    @abstractmethod
+    async def create_ticket(self, ticket: Ticket) -> Ticket:
+        """Create a ticket in idempotent manner based on idempotency_key."""
+
+    @abstractmethod
+    async def create_tickets(self, tickets: list[Ticket]) -> list[Ticket]:
+        """Idempotently create many tickets, returning canonical tickets in input order."""
+
+    @abstractmethod
+    async def claim_ticket(self, ticket_id: str, owner: str) -> Lease | None:
+        """Attempt to claim a ticket; return lease if successful."""
+
+    @abstractmethod
+    async def claim_next(self, owner: str, n: int = 1) -> list[Lease]:
+        """Atomically claim up to ``n`` ready tickets in priority order."""
+
+    @abstractmethod
+    async def claim_tickets(self, ticket_ids: list[str], owner: str) -> list[Lease]:
+        """Claim the given ready tickets in one batch; return leases for those won."""
+
+    @abstractmethod
+    async def heartbeat(self, ticket_id: str, lease_token: str) -> Lease | None:
+        """Renew an existing lease."""
+
+    @abstractmethod
+    async def heartbeat_many(self, leases: list[tuple[str, str]]) -> HeartbeatResult:
+        """Renew many ``(ticket_id, lease_token)`` leases; report renewed and lost tickets."""
+
+    @abstractmethod
+    async def complete_ticket(self, ticket_id: str, lease_token: str) -> Ticket | None:
+        """Mark ticket completed if lease is valid."""
+
+    @abstractmethod
+    async def fail_ticket(
+        self, ticket_id: str, lease_token: str, reason: str | None = None
+    ) -> Ticket | None:
+        """Mark ticket failed if lease is valid."""
+
+    async def release_in_session(
+        self,
+        session: AsyncSession,
+        ticket_id: str,
+        lease_token: str,
+        status: TicketStatus,
+        reason: str | None = None,
+    ) -> Ticket | None:
+        """Complete or fail a ticket as part of the caller's transaction on ``session``."""
+
+        if status == TicketStatus.COMPLETED:
+            return await self.complete_ticket(ticket_id, lease_token)
+        return await self.fail_ticket(ticket_id, lease_token, reason=reason)
+
+    async def release_many_in_session(
+        self,
+        session: AsyncSession,
+        leases: list[tuple[str, str]],
+        status: TicketStatus,
+        reason: str | None = None,
+    ) -> list[str]:
+        """Bulk :meth:`release_in_session`; returns the ids of released tickets."""
+
+        released: list[str] = []
+        for ticket_id, lease_token in leases:
+            if await self.release_in_session(session, ticket_id, lease_token, status, reason):
+                released.append(ticket_id)
+        return released
+
+    @abstractmethod
+    async def reap_expired_leases(
+        self, now: datetime | None = None, batch_size: int = 500
+    ) -> ReapResult:
+        """Return expired claimed tickets to READY, or FAILED once out of attempts."""
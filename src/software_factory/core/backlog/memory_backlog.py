@@ -0,0 +1,364 @@
+"""In-process heap-backed backlog for single-node mode and benchmarks."""
+
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import threading
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+from software_factory.config import get_settings
+from software_factory.core.backlog.interface import BacklogInterface, HeartbeatResult, ReapResult
+from software_factory.core.backlog.operations import priority_due_at
+from software_factory.core.models import Lease, Ticket, TicketStatus
+
+
+@dataclass
+class _Record:
+    ticket: Ticket
+    lease: Lease | None = None
+    last_failure_reason: str | None = None
+    ready_seq: int = 0
+
+
+class InMemoryBacklog(BacklogInterface):
+    """Backlog kept entirely in process memory.
+
+    Ready tickets sit in a min-heap keyed by ``(priority_due_at, created_at)`` and
+    active leases in a min-heap keyed by expiry. Both heaps use lazy deletion:
+    entries are validated against the record when popped. Claim, heartbeat and
+    terminal semantics match :class:`SQLAlchemyBacklog`.
+    """
+
+    def __init__(
+        self,
+        lease_ttl_seconds: int | None = None,
+        priority_aging_minutes: int | None = None,
+        max_attempts: int | None = None,
+    ):
+        settings = get_settings()
+        self.lease_ttl_seconds = lease_ttl_seconds or settings.default_lease_ttl_seconds
+        self.priority_aging_minutes = (
+            settings.priority_aging_minutes if priority_aging_minutes is None else priority_aging_minutes
+        )
+        self.max_attempts = max_attempts or settings.max_ticket_attempts
+        self._lock = threading.RLock()
+        self._records: dict[str, _Record] = {}
+        self._by_idempotency_key: dict[str, str] = {}
+        self._ready_heap: list[tuple[float, datetime, str, int]] = []
+        self._expiry_heap: list[tuple[datetime, str, str]] = []
+        self._sequence = 0
+
+    def fetch_ready(self, limit: int = 50) -> list[Ticket]:
+        """Return ready tickets ordered by priority and age without claiming them."""
+
+        with self._lock:
+            records = self._pop_ready(limit)
+            for record in records:
+                heapq.heappush(self._ready_heap, self._ready_key(record))
+            return [record.ticket for record in records]
+
+    def iter_tickets(
+        self,
+        status: TicketStatus | None = None,
+        repo: str | None = None,
+        batch_size: int = 500,
+    ) -> Iterator[Ticket]:
+        """Stream tickets ordered by ``(created_at, id)``, holding the lock per batch only."""
+
+        with self._lock:
+            keys = sorted(
+                (record.ticket.created_at, ticket_id) for ticket_id, record in self._records.items()
+            )
+        for start in range(0, len(keys), batch_size):
+            with self._lock:
+                batch = [self._records[key[1]].ticket for key in keys[start : start + batch_size]]
+            for ticket in batch:
+                if status is not None and ticket.status != status:
+                    continue
+                if repo is not None and ticket.repo != repo:
+                    continue
+                yield ticket
+
+    def create_ticket(self, ticket: Ticket) -> Ticket:
+        """Idempotently create a new ticket."""
+
+        return self.create_tickets([ticket])[0]
+
+    def create_tickets(self, tickets: list[Ticket]) -> list[Ticket]:
+        """Idempotently create tickets, returning canonical tickets in input order."""
+
+        now = datetime.now(UTC)
+        with self._lock:
+            created: list[Ticket] = []
+            for ticket in tickets:
+                existing_id = self._by_idempotency_key.get(ticket.idempotency_key)
+                if existing_id is None:
+                    record = _Record(
+                        ticket=ticket.model_copy(
+                            update={
+                                "status": TicketStatus.READY,
+                                "attempts": 0,
+                                "created_at": now,
+                                "updated_at": now,
+                            }
+                        )
+                    )
+                    self._records[ticket.id] = record
+                    self._by_idempotency_key[ticket.idempotency_key] = ticket.id
+                    self._push_ready(record)
+                    existing_id = ticket.id
+                created.append(self._records[existing_id].ticket)
+            return created
+
+    def claim_ticket(self, ticket_id: str, owner: str) -> Lease | None:
+        """Claim a ticket if it is available or has an expired lease."""
+
+        now = datetime.now(UTC)
+        with self._lock:
+            record = self._records.get(ticket_id)
+            if record is None:
+                return None
+            status = record.ticket.status
+            expired = (
+                status == TicketStatus.CLAIMED
+                and record.lease is not None
+                and record.lease.expires_at < now
+            )
+            if status != TicketStatus.READY and not expired:
+                return None
+            return self._lease(record, owner, now)
+
+    def claim_next(self, owner: str, n: int = 1) -> list[Lease]:
+        """Claim up to ``n`` of the highest-priority ready tickets."""
+
+        now = datetime.now(UTC)
+        with self._lock:
+            return [self._lease(record, owner, now) for record in self._pop_ready(n)]
+
+    def claim_tickets(self, ticket_ids: list[str], owner: str) -> list[Lease]:
+        """Claim the given ready tickets; tickets no longer ready are skipped."""
+
+        now = datetime.now(UTC)
+        with self._lock:
+            leases: list[Lease] = []
+            for ticket_id in dict.fromkeys(ticket_ids):
+                record = self._records.get(ticket_id)
+                if record is not None and record.ticket.status == TicketStatus.READY:
+                    leases.append(self._lease(record, owner, now))
+            return leases
+
+    def heartbeat(self, ticket_id: str, lease_token: str) -> Lease | None:
+        """Extend a valid lease TTL."""
+
+        renewed = self.heartbeat_many([(ticket_id, lease_token)]).renewed
+        return renewed[0] if renewed else None
+
+    def heartbeat_many(self, leases: list[tuple[str, str]]) -> HeartbeatResult:
+        """Extend every still-valid lease."""
+
+        now = datetime.now(UTC)
+        expires_at = now + timedelta(seconds=self.lease_ttl_seconds)
+        renewed: list[Lease] = []
+        lost: list[str] = []
+        with self._lock:
+            for ticket_id, lease_token in leases:
+                record = self._records.get(ticket_id)
+                lease = record.lease if record is not None else None
+                if (
+                    record is None
+                    or lease is None
+                    or record.ticket.status != TicketStatus.CLAIMED
+                    or lease.token != lease_token
+                    or lease.expires_at < now
+                ):
+                    lost.append(ticket_id)
+                    continue
+                record.lease = lease.model_copy(update={"expires_at": expires_at, "updated_at": now})
+                record.ticket = record.ticket.model_copy(update={"updated_at": now})
+                heapq.heappush(self._expiry_heap, (expires_at, ticket_id, lease_token))
+                renewed.append(record.lease)
+        return HeartbeatResult(renewed=renewed, lost=lost)
+
+    def complete_ticket(self, ticket_id: str, lease_token: str) -> Ticket | None:
+        """Complete a ticket when caller holds lease token."""
+
+        return self._terminal_update(ticket_id, lease_token, TicketStatus.COMPLETED)
+
+    def fail_ticket(self, ticket_id: str, lease_token: str, reason: str | None = None) -> Ticket | None:
+        """Fail a ticket when caller holds lease token."""
+
+        return self._terminal_update(ticket_id, lease_token, TicketStatus.FAILED, reason)
+
+    def expired_leases(self, now: datetime | None = None) -> list[Lease]:
+        """Return leases whose expiry has passed, earliest first."""
+
+        now = now or datetime.now(UTC)
+        with self._lock:
+            expired: list[Lease] = []
+            while self._expiry_heap and self._expiry_heap[0][0] < now:
+                expires_at, ticket_id, token = heapq.heappop(self._expiry_heap)
+                lease = self._active_lease(ticket_id, token, expires_at)
+                if lease is not None:
+                    expired.append(lease)
+            for lease in expired:
+                heapq.heappush(self._expiry_heap, (lease.expires_at, lease.ticket_id, lease.token))
+            return expired
+
+    def reap_expired_leases(
+        self, now: datetime | None = None, batch_size: int = 500
+    ) -> ReapResult:
+        """Pop expired leases off the expiry heap and requeue or fail their tickets.
+
+        ``batch_size`` is accepted for interface parity; the whole pass runs
+        under the lock.
+        """
+
+        now = now or datetime.now(UTC)
+        requeued: list[str] = []
+        failed: list[str] = []
+        with self._lock:
+            while self._expiry_heap and self._expiry_heap[0][0] < now:
+                expires_at, ticket_id, token = heapq.heappop(self._expiry_heap)
+                if self._active_lease(ticket_id, token, expires_at) is None:
+                    continue
+                record = self._records[ticket_id]
+                attempts = record.ticket.attempts + 1
+                status = TicketStatus.FAILED if attempts >= self.max_attempts else TicketStatus.READY
+                record.ticket = record.ticket.model_copy(
+                    update={"status": status, "attempts": attempts, "updated_at": now}
+                )
+                record.lease = None
+                record.last_failure_reason = "lease_expired"
+                if status == TicketStatus.READY:
+                    self._push_ready(record)
+                    requeued.append(ticket_id)
+                else:
+                    failed.append(ticket_id)
+        return ReapResult(requeued=requeued, failed=failed)
+
+    def snapshot(self, path: str | Path) -> None:
+        """Atomically write every ticket and active lease to a JSON file."""
+
+        with self._lock:
+            payload = {
+                "tickets": [
+                    {
+                        "ticket": record.ticket.model_dump(mode="json"),
+                        "lease": record.lease.model_dump(mode="json") if record.lease else None,
+                        "last_failure_reason": record.last_failure_reason,
+                    }
+                    for record in self._records.values()
+                ]
+            }
+        target = Path(path)
+        tmp = target.with_name(f"{target.name}.tmp")
+        tmp.write_text(json.dumps(payload))
+        os.replace(tmp, target)
+
+    @classmethod
+    def restore(
+        cls,
+        path: str | Path,
+        lease_ttl_seconds: int | None = None,
+        priority_aging_minutes: int | None = None,
+        max_attempts: int | None = None,
+    ) -> InMemoryBacklog:
+        """Rebuild a backlog, including its heaps, from a :meth:`snapshot` file."""
+
+        backlog = cls(
+            lease_ttl_seconds=lease_ttl_seconds,
+            priority_aging_minutes=priority_aging_minutes,
+            max_attempts=max_attempts,
+        )
+        payload: dict[str, Any] = json.loads(Path(path).read_text())
+        for item in payload["tickets"]:
+            record = _Record(
+                ticket=Ticket.model_validate(item["ticket"]),
+                lease=Lease.model_validate(item["lease"]) if item["lease"] else None,
+                last_failure_reason=item["last_failure_reason"],
+            )
+            backlog._records[record.ticket.id] = record
+            backlog._by_idempotency_key[record.ticket.idempotency_key] = record.ticket.id
+            if record.ticket.status == TicketStatus.READY:
+                backlog._push_ready(record)
+            elif record.lease is not None:
+                heapq.heappush(
+                    backlog._expiry_heap,
+                    (record.lease.expires_at, record.ticket.id, record.lease.token),
+                )
+        return backlog
+
+    def _terminal_update(
+        self,
+        ticket_id: str,
+        lease_token: str,
+        status: TicketStatus,
+        reason: str | None = None,
+    ) -> Ticket | None:
+        now = datetime.now(UTC)
+        with self._lock:
+            record = self._records.get(ticket_id)
+            if (
+                record is None
+                or record.lease is None
+                or record.lease.token != lease_token
+                or record.ticket.status != TicketStatus.CLAIMED
+            ):
+                return None
+
+            update: dict[str, Any] = {"status": status, "updated_at": now}
+            if status == TicketStatus.FAILED:
+                update["attempts"] = record.ticket.attempts + 1
+                record.last_failure_reason = reason
+            record.ticket = record.ticket.model_copy(update=update)
+            record.lease = None
+            return record.ticket
+
+    def _lease(self, record: _Record, owner: str, now: datetime) -> Lease:
+        expires_at = now + timedelta(seconds=self.lease_ttl_seconds)
+        lease = Lease(ticket_id=record.ticket.id, owner=owner, token=str(uuid4()), expires_at=expires_at)
+        record.lease = lease
+        record.ticket = record.ticket.model_copy(
+            update={"status": TicketStatus.CLAIMED, "updated_at": now}
+        )
+        heapq.heappush(self._expiry_heap, (expires_at, lease.ticket_id, lease.token))
+        return lease
+
+    def _active_lease(self, ticket_id: str, token: str, expires_at: datetime) -> Lease | None:
+        record = self._records.get(ticket_id)
+        if record is None or record.lease is None or record.ticket.status != TicketStatus.CLAIMED:
+            return None
+        if record.lease.token != token or record.lease.expires_at != expires_at:
+            return None
+        return record.lease
+
+    def _push_ready(self, record: _Record) -> None:
+        self._sequence += 1
+        record.ready_seq = self._sequence
+        heapq.heappush(self._ready_heap, self._ready_key(record))
+
+    def _ready_key(self, record: _Record) -> tuple[float, datetime, str, int]:
+        ticket = record.ticket
+        due_at = priority_due_at(ticket.priority.value, ticket.created_at, self.priority_aging_minutes)
+        # The id breaks ties ahead of ready_seq, so a requeued ticket keeps its place.
+        return (due_at.timestamp(), ticket.created_at, ticket.id, record.ready_seq)
+
+    def _pop_ready(self, limit: int) -> list[_Record]:
+        records: list[_Record] = []
+        while self._ready_heap and len(records) < limit:
+            _, _, ticket_id, seq = heapq.heappop(self._ready_heap)
+            record = self._records.get(ticket_id)
+            if (
+                record is not None
+                and record.ready_seq == seq
+                and record.ticket.status == TicketStatus.READY
+            ):
+                records.append(record)
+        return records
@@ -0,0 +1,607 @@
+"""Session-level backlog operations shared by the sync and async adapters.
+
+Every function here runs against a caller-owned :class:`~sqlalchemy.orm.Session`
+and never commits; the adapter decides the transaction boundary. The async
+backlog runs the same functions through ``AsyncSession.run_sync`` so both
+adapters issue identical SQL.
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from typing import Any, cast
+from uuid import uuid4
+
+from sqlalchemy import Insert, Select, and_, case, insert, literal, or_, select, tuple_, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.orm import Session
+
+from software_factory.core.backlog.interface import HeartbeatResult, ReapResult
+from software_factory.core.models import Lease, Ticket, TicketPriority, TicketStatus
+from software_factory.db.models import LeaseRow, TicketOutboxRow, TicketRow
+
+PRIORITY_ORDER = {
+    TicketPriority.CRITICAL.value: 0,
+    TicketPriority.HIGH.value: 1,
+    TicketPriority.MEDIUM.value: 2,
+    TicketPriority.LOW.value: 3,
+}
+# Rank spacing of ``priority_due_at`` when aging is disabled: like the rank span
+# of ``PriorityRedisQueue``, wider than any wait, so ordering stays strict.
+_STRICT_PRIORITY_STEP = timedelta(days=36500)
+
+
+def fetch_ready(session: Session, limit: int) -> list[Ticket]:
+    """Return ready tickets in dispatch order (see :func:`priority_due_at`)."""
+
+    rows: list[TicketRow] = list(session.execute(_ready_query(select(TicketRow), limit)).scalars())
+    return [to_ticket(row) for row in rows]
+
+
+def ticket_page(
+    session: Session,
+    after: tuple[datetime, str] | None,
+    batch_size: int,
+    status: TicketStatus | None = None,
+    repo: str | None = None,
+) -> list[Ticket]:
+    """Return the next keyset page of tickets ordered by ``(created_at, id)``.
+
+    ``after`` is the ``(created_at, id)`` of the last ticket of the previous
+    page, so each page is an index range scan regardless of scan depth.
+    """
+
+    stmt = select(TicketRow).order_by(TicketRow.created_at, TicketRow.id).limit(batch_size)
+    if after is not None:
+        stmt = stmt.where(tuple_(TicketRow.created_at, TicketRow.id) > tuple_(*after))
+    if status is not None:
+        stmt = stmt.where(TicketRow.status == status)
+    if repo is not None:
+        stmt = stmt.where(TicketRow.repo == repo)
+    rows: list[TicketRow] = list(session.execute(stmt).scalars())
+    return [to_ticket(row) for row in rows]
+
+
+def create_tickets(
+    session: Session, tickets: list[Ticket], priority_aging_minutes: int = 0, outbox: bool = False
+) -> list[Ticket]:
+    """Insert tickets that do not exist yet and return canonical tickets in input order.
+
+    PostgreSQL and SQLite use one ``INSERT ... ON CONFLICT (idempotency_key) DO
+    NOTHING RETURNING`` plus one SELECT for keys that already existed. Other
+    dialects select existing keys first and insert the rest. With ``outbox``,
+    newly inserted tickets are also staged in the ticket outbox.
+    """
+
+    unique: dict[str, Ticket] = {}
+    for ticket in tickets:
+        unique.setdefault(ticket.idempotency_key, ticket)
+    if not unique:
+        return []
+
+    now = datetime.now(UTC)
+    values = {
+        key: _row_values(ticket, now, priority_aging_minutes) for key, ticket in unique.items()
+    }
+    canonical: dict[str, Ticket] = {}
+    created_ids: list[str] = []
+    stmt = _insert_ignoring_duplicates(session.get_bind().dialect.name)
+    if stmt is not None:
+        inserted: list[TicketRow] = list(
+            session.execute(stmt.returning(TicketRow), list(values.values())).scalars()
+        )
+        for row in inserted:
+            canonical[row.idempotency_key] = to_ticket(row)
+            created_ids.append(row.id)
+
+    missing = [key for key in unique if key not in canonical]
+    if missing:
+        existing = session.execute(
+            select(TicketRow).where(TicketRow.idempotency_key.in_(missing))
+        ).scalars()
+        for row in existing:
+            canonical[row.idempotency_key] = to_ticket(row)
+
+    if stmt is None:
+        rows = [TicketRow(**row) for key, row in values.items() if key not in canonical]
+        session.add_all(rows)
+        session.flush()
+        for row in rows:
+            canonical[row.idempotency_key] = to_ticket(row)
+            created_ids.append(row.id)
+
+    if outbox and created_ids:
+        _stage_outbox(session, created_ids, now)
+    return [canonical[ticket.idempotency_key] for ticket in tickets]
+
+
+def claim_ticket(session: Session, ticket_id: str, owner: str, lease_ttl_seconds: int) -> Lease | None:
+    """Claim a ticket if it is available or has an expired lease."""
+
+    now = datetime.now(UTC)
+    expires_at = now + timedelta(seconds=lease_ttl_seconds)
+    lease_token = str(uuid4())
+
+    stmt = (
+        update(TicketRow)
+        .where(
+            and_(
+                TicketRow.id == ticket_id,
+                or_(
+                    TicketRow.status == TicketStatus.READY,
+                    and_(
+                        TicketRow.status == TicketStatus.CLAIMED,
+                        TicketRow.lease_expires_at.is_not(None),
+                        TicketRow.lease_expires_at < now,
+                    ),
+                ),
+            )
+        )
+        .values(
+            status=TicketStatus.CLAIMED,
+            lease_owner=owner,
+            lease_token=lease_token,
+            lease_expires_at=expires_at,
+            updated_at=now,
+        )
+    )
+    result = cast(CursorResult[tuple[object]], session.execute(stmt))
+    if result.rowcount != 1:
+        return None
+
+    # A reclaimed expired lease is still the ticket's active one until
+    # _record_leases relinks it; stamp it released so retention can archive it.
+    session.execute(
+        update(LeaseRow)
+        .where(
+            LeaseRow.id
+            == select(TicketRow.active_lease_id).where(TicketRow.id == ticket_id).scalar_subquery(),
+            LeaseRow.released_at.is_(None),
+        )
+        .values(released_at=now)
+    )
+    lease = Lease(ticket_id=ticket_id, owner=owner, token=lease_token, expires_at=expires_at)
+    _record_leases(session, [lease])
+    return lease
+
+
+def claim_next(
+    session: Session,
+    owner: str,
+    n: int,
+    lease_ttl_seconds: int,
+) -> list[Lease]:
+    """Claim up to ``n`` of the highest-priority ready tickets.
+
+    Candidate rows are locked with ``FOR UPDATE SKIP LOCKED`` so concurrent
+    claimers on PostgreSQL pick disjoint tickets instead of colliding. SQLite
+    ignores the locking clause; the guarded UPDATE then decides the winners.
+    """
+
+    if n <= 0:
+        return []
+
+    candidate_ids: list[str] = list(
+        session.execute(
+            _ready_query(select(TicketRow.id), n).with_for_update(skip_locked=True)
+        ).scalars()
+    )
+    return claim_tickets(session, candidate_ids, owner, lease_ttl_seconds)
+
+
+def claim_tickets(
+    session: Session, ticket_ids: list[str], owner: str, lease_ttl_seconds: int
+) -> list[Lease]:
+    """Claim the given tickets that are still READY with one guarded UPDATE ... RETURNING.
+
+    Returns leases in input order for the tickets this call won.
+    """
+
+    if not ticket_ids:
+        return []
+
+    now = datetime.now(UTC)
+    expires_at = now + timedelta(seconds=lease_ttl_seconds)
+    tokens = {ticket_id: str(uuid4()) for ticket_id in ticket_ids}
+    claimed = set(
+        session.execute(
+            update(TicketRow)
+            .where(
+                and_(
+                    TicketRow.id.in_(list(tokens)),
+                    TicketRow.status == TicketStatus.READY,
+                )
+            )
+            .values(
+                status=TicketStatus.CLAIMED,
+                lease_owner=owner,
+                lease_token=case(tokens, value=TicketRow.id),
+                lease_expires_at=expires_at,
+                updated_at=now,
+            )
+            .returning(TicketRow.id)
+        ).scalars()
+    )
+    if not claimed:
+        return []
+
+    leases = [
+        Lease(ticket_id=ticket_id, owner=owner, token=tokens[ticket_id], expires_at=expires_at)
+        for ticket_id in tokens
+        if ticket_id in claimed
+    ]
+    _record_leases(session, leases)
+    return leases
+
+
+def heartbeat_many(
+    session: Session, leases: list[tuple[str, str]], lease_ttl_seconds: int
+) -> HeartbeatResult:
+    """Extend every still-valid lease with one set-based UPDATE ... RETURNING."""
+
+    if not leases:
+        return HeartbeatResult()
+
+    now = datetime.now(UTC)
+    expires_at = now + timedelta(seconds=lease_ttl_seconds)
+    renewed_rows = session.execute(
+        update(TicketRow)
+        .where(
+            and_(
+                tuple_(TicketRow.id, TicketRow.lease_token).in_(leases),
+                TicketRow.status == TicketStatus.CLAIMED,
+                TicketRow.lease_expires_at.is_not(None),
+                TicketRow.lease_expires_at >= now,
+            )
+        )
+        .values(lease_expires_at=expires_at, updated_at=now)
+        .returning(
+            TicketRow.id,
+            TicketRow.lease_owner,
+            TicketRow.lease_token,
+            TicketRow.active_lease_id,
+        )
+    ).all()
+    if not renewed_rows:
+        return HeartbeatResult(lost=[ticket_id for ticket_id, _ in leases])
+
+    session.execute(
+        update(LeaseRow)
+        .where(LeaseRow.id.in_([row.active_lease_id for row in renewed_rows]))
+        .values(expires_at=expires_at)
+    )
+
+    renewed = {
+        row.id: Lease(
+            ticket_id=row.id,
+            owner=row.lease_owner or "",
+            token=row.lease_token or "",
+            expires_at=expires_at,
+        )
+        for row in renewed_rows
+    }
+    return HeartbeatResult(
+        renewed=[renewed[ticket_id] for ticket_id, _ in leases if ticket_id in renewed],
+        lost=[ticket_id for ticket_id, _ in leases if ticket_id not in renewed],
+    )
+
+
+def release_ticket(
+    session: Session,
+    ticket_id: str,
+    lease_token: str,
+    status: TicketStatus,
+    reason: str | None = None,
+    outbox: bool = False,
+) -> Ticket | None:
+    """Move a claimed ticket to ``status`` if ``lease_token`` still holds it.
+
+    With ``outbox``, a ticket released back to READY is staged in the ticket
+    outbox so the relay queues it again.
+    """
+
+    now = datetime.now(UTC)
+    row = session.execute(
+        select(TicketRow).where(
+            and_(
+                TicketRow.id == ticket_id,
+                TicketRow.lease_token == lease_token,
+                TicketRow.status == TicketStatus.CLAIMED,
+            )
+        )
+    ).scalar_one_or_none()
+    if row is None:
+        return None
+
+    if row.active_lease_id is not None:
+        session.execute(
+            update(LeaseRow).where(LeaseRow.id == row.active_lease_id).values(released_at=now)
+        )
+
+    row.status = status
+    row.lease_owner = None
+    row.lease_token = None
+    row.lease_expires_at = None
+    row.active_lease_id = None
+    row.updated_at = now
+    if status == TicketStatus.FAILED:
+        row.attempts += 1
+        row.last_failure_reason = reason
+    if outbox and status == TicketStatus.READY:
+        _stage_outbox(session, [row.id], now)
+
+    return to_ticket(row)
+
+
+def release_tickets(
+    session: Session,
+    leases: list[tuple[str, str]],
+    status: TicketStatus,
+    reason: str | None = None,
+    outbox: bool = False,
+) -> list[str]:
+    """Set-based :func:`release_ticket` over ``(ticket_id, lease_token)`` pairs.
+
+    Returns the ids of tickets that were still held by the given tokens, in
+    input order.
+    """
+
+    if not leases:
+        return []
+
+    now = datetime.now(UTC)
+    held_by_token = and_(
+        tuple_(TicketRow.id, TicketRow.lease_token).in_(leases),
+        TicketRow.status == TicketStatus.CLAIMED,
+    )
+    held = session.execute(
+        select(TicketRow.id, TicketRow.active_lease_id).where(held_by_token).with_for_update()
+    ).all()
+    if not held:
+        return []
+
+    values: dict[str, Any] = {
+        "status": status,
+        "lease_owner": None,
+        "lease_token": None,
+        "lease_expires_at": None,
+        "active_lease_id": None,
+        "updated_at": now,
+    }
+    if status == TicketStatus.FAILED:
+        values["attempts"] = TicketRow.attempts + 1
+        values["last_failure_reason"] = reason
+    released = set(
+        session.execute(
+            update(TicketRow).where(held_by_token).values(**values).returning(TicketRow.id)
+        ).scalars()
+    )
+
+    lease_ids = [
+        row.active_lease_id for row in held if row.id in released and row.active_lease_id is not None
+    ]
+    if lease_ids:
+        session.execute(
+            update(LeaseRow).where(LeaseRow.id.in_(lease_ids)).values(released_at=now)
+        )
+    if outbox and status == TicketStatus.READY and released:
+        _stage_outbox(session, sorted(released), now)
+    return [ticket_id for ticket_id, _ in leases if ticket_id in released]
+
+
+def reap_expired_leases(
+    session: Session, now: datetime, batch_size: int, max_attempts: int, outbox: bool = False
+) -> ReapResult:
+    """Reclaim one batch of claimed tickets whose lease expired before ``now``.
+
+    Candidates are read in expiry order off ``ix_tickets_lease_expiry`` and
+    locked with ``FOR UPDATE SKIP LOCKED`` so concurrent reapers take disjoint
+    batches. One guarded UPDATE counts the expiry as a failed attempt and moves
+    each ticket back to READY, or to FAILED once it has used ``max_attempts``;
+    a second UPDATE stamps ``released_at`` on the expired lease rows. With
+    ``outbox``, requeued tickets are staged in the ticket outbox.
+    """
+
+    expired = session.execute(
+        select(TicketRow.id, TicketRow.active_lease_id)
+        .where(
+            and_(
+                TicketRow.lease_expires_at < now,
+                TicketRow.status == TicketStatus.CLAIMED,
+            )
+        )
+        .order_by(TicketRow.lease_expires_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if not expired:
+        return ReapResult()
+
+    status_type = TicketRow.status.type
+    reaped = {
+        row.id: row.status
+        for row in session.execute(
+            update(TicketRow)
+            .where(
+                and_(
+                    TicketRow.id.in_([row.id for row in expired]),
+                    TicketRow.status == TicketStatus.CLAIMED,
+                    TicketRow.lease_expires_at < now,
+                )
+            )
+            .values(
+                status=case(
+                    (
+                        TicketRow.attempts + 1 >= max_attempts,
+                        literal(TicketStatus.FAILED, status_type),
+                    ),
+                    else_=literal(TicketStatus.READY, status_type),
+                ),
+                attempts=TicketRow.attempts + 1,
+                last_failure_reason="lease_expired",
+                lease_owner=None,
+                lease_token=None,
+                lease_expires_at=None,
+                active_lease_id=None,
+                updated_at=now,
+            )
+            .returning(TicketRow.id, TicketRow.status)
+        )
+    }
+
+    lease_ids = [
+        row.active_lease_id
+        for row in expired
+        if row.id in reaped and row.active_lease_id is not None
+    ]
+    if lease_ids:
+        session.execute(
+            update(LeaseRow).where(LeaseRow.id.in_(lease_ids)).values(released_at=now)
+        )
+
+    result = ReapResult(
+        requeued=[row.id for row in expired if reaped.get(row.id) == TicketStatus.READY],
+        failed=[row.id for row in expired if reaped.get(row.id) == TicketStatus.FAILED],
+    )
+    if outbox and result.requeued:
+        _stage_outbox(session, result.requeued, now)
+    return result
+
+
+def priority_due_at(priority: str, created_at: datetime, priority_aging_minutes: int) -> datetime:
+    """Return when a ticket has aged up to the top priority rank.
+
+    A ticket gains one priority rank for every ``priority_aging_minutes`` it
+    waits, so ordering ready tickets by this timestamp lets a LOW ticket
+    overtake a CRITICAL ticket created more than three aging intervals after
+    it. With aging disabled (``0``) ranks are spaced further apart than any
+    realistic wait, which keeps the same ordering strictly by priority.
+
+    The value is written once at insert and every reader orders by it, so the
+    writer's ``PRIORITY_AGING_MINUTES`` decides dispatch order. All processes
+    must share one setting; after changing it, recompute existing rows with
+    ``scripts/backfill_priority_due_at.py``.
+    """
+
+    step = (
+        timedelta(minutes=priority_aging_minutes)
+        if priority_aging_minutes > 0
+        else _STRICT_PRIORITY_STEP
+    )
+    return created_at + PRIORITY_ORDER[priority] * step
+
+
+def backfill_priority_due_at(
+    session: Session, priority_aging_minutes: int, after: str | None, batch_size: int
+) -> str | None:
+    """Recompute ``priority_due_at`` for the next keyset page of tickets by id.
+
+    Run after changing ``PRIORITY_AGING_MINUTES`` so existing tickets use the
+    new aging value. Returns the last id of the page, or ``None`` once every
+    ticket has been rewritten.
+    """
+
+    stmt = select(TicketRow).order_by(TicketRow.id).limit(batch_size)
+    if after is not None:
+        stmt = stmt.where(TicketRow.id > after)
+    rows: list[TicketRow] = list(session.execute(stmt).scalars())
+    for row in rows:
+        row.priority_due_at = priority_due_at(row.priority, row.created_at, priority_aging_minutes)
+    session.flush()
+    return rows[-1].id if rows else None
+
+
+def to_ticket(row: TicketRow) -> Ticket:
+    """Convert a persisted ticket row to the domain model."""
+
+    return Ticket(
+        id=row.id,
+        source=row.source,
+        type=row.type,
+        priority=TicketPriority(row.priority),
+        repo=row.repo,
+        context=row.context,
+        acceptance_criteria=list(row.acceptance_criteria),
+        idempotency_key=row.idempotency_key,
+        status=row.status,
+        attempts=row.attempts,
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+    )
+
+
+def _record_leases(session: Session, leases: list[Lease]) -> None:
+    """Insert lease history rows and link each ticket to its active lease row."""
+
+    lease_ids = {
+        row.ticket_id: row.id
+        for row in session.execute(
+            insert(LeaseRow).returning(LeaseRow.id, LeaseRow.ticket_id),
+            [
+                {
+                    "ticket_id": lease.ticket_id,
+                    "owner": lease.owner,
+                    "token": lease.token,
+                    "expires_at": lease.expires_at,
+                }
+                for lease in leases
+            ],
+        )
+    }
+    session.execute(
+        update(TicketRow)
+        .where(TicketRow.id.in_(lease_ids))
+        .values(active_lease_id=case(lease_ids, value=TicketRow.id))
+    )
+
+
+def _stage_outbox(session: Session, ticket_ids: list[str], now: datetime) -> None:
+    """Insert one outbox row per ticket, copied from the ticket rows in one statement."""
+
+    session.execute(
+        insert(TicketOutboxRow).from_select(
+            ["ticket_id", "idempotency_key", "created_at"],
+            select(TicketRow.id, TicketRow.idempotency_key, literal(now, TicketOutboxRow.created_at.type))
+            .where(TicketRow.id.in_(ticket_ids))
+            .order_by(TicketRow.priority_rank, TicketRow.created_at),
+        )
+    )
+
+
+def _insert_ignoring_duplicates(dialect: str) -> Insert | None:
+    if dialect == "postgresql":
+        return postgresql.insert(TicketRow).on_conflict_do_nothing(
+            index_elements=[TicketRow.idempotency_key]
+        )
+    if dialect == "sqlite":
+        return sqlite.insert(TicketRow).on_conflict_do_nothing(
+            index_elements=[TicketRow.idempotency_key]
+        )
+    return None
+
+
+def _row_values(ticket: Ticket, now: datetime, priority_aging_minutes: int) -> dict[str, Any]:
+    return {
+        "id": ticket.id,
+        "source": ticket.source,
+        "type": ticket.type,
+        "priority": ticket.priority.value,
+        "priority_rank": PRIORITY_ORDER[ticket.priority.value],
+        "repo": ticket.repo,
+        "context": ticket.context,
+        "acceptance_criteria": ticket.acceptance_criteria,
+        "idempotency_key": ticket.idempotency_key,
+        "status": TicketStatus.READY,
+        "priority_due_at": priority_due_at(ticket.priority.value, now, priority_aging_minutes),
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _ready_query(stmt: Select[Any], limit: int) -> Select[Any]:
+    return (
+        stmt.where(TicketRow.status == TicketStatus.READY)
+        .order_by(TicketRow.priority_due_at, TicketRow.created_at)
+        .limit(limit)
+    )
@@ -0,0 +1,58 @@
+"""Retention jobs that keep the hot lease table small."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from software_factory.config import get_settings
+from software_factory.db.models import LeaseArchiveRow, LeaseRow
+
+_ARCHIVE_COLUMNS = ("id", "ticket_id", "owner", "token", "expires_at", "released_at", "created_at")
+
+
+def archive_released_leases(
+    session_factory: sessionmaker[Session],
+    retention_days: int | None = None,
+    batch_size: int = 1000,
+    now: datetime | None = None,
+) -> int:
+    """Move leases released more than ``retention_days`` ago into ``lease_archive``.
+
+    Rows are copied and deleted in primary-key batches, one transaction per
+    batch, so the job can be interrupted and resumed safely. Returns the number
+    of archived leases.
+    """
+
+    if retention_days is None:
+        retention_days = get_settings().lease_retention_days
+    cutoff = (now or datetime.now(UTC)) - timedelta(days=retention_days)
+    archived = 0
+
+    while True:
+        with session_factory() as session:
+            batch_ids: list[int] = list(
+                session.execute(
+                    select(LeaseRow.id)
+                    .where(LeaseRow.released_at.is_not(None), LeaseRow.released_at < cutoff)
+                    .order_by(LeaseRow.id)
+                    .limit(batch_size)
+                    .with_for_update(skip_locked=True)
+                ).scalars()
+            )
+            if not batch_ids:
+                return archived
+
+            session.execute(
+                insert(LeaseArchiveRow).from_select(
+                    _ARCHIVE_COLUMNS,
+                    select(*(getattr(LeaseRow, column) for column in _ARCHIVE_COLUMNS)).where(
+                        LeaseRow.id.in_(batch_ids)
+                    ),
+                )
+            )
+            session.execute(delete(LeaseRow).where(LeaseRow.id.in_(batch_ids)))
+            session.commit()
+            archived += len(batch_ids)
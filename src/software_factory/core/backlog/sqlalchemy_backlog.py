@@ -2,171 +2,139 @@
 
 from __future__ import annotations
 
-from datetime import UTC, datetime, timedelta
-from typing import cast
-from uuid import uuid4
+from collections.abc import Iterator
+from datetime import UTC, datetime
 
-from sqlalchemy import and_, or_, select, update
-from sqlalchemy.engine import CursorResult
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, sessionmaker
 
 from software_factory.config import get_settings
-from software_factory.core.backlog.interface import BacklogInterface
-from software_factory.core.models import Lease, Ticket, TicketPriority, TicketStatus
-from software_factory.db.models import LeaseRow, TicketRow
-
-_PRIORITY_ORDER = {
-    TicketPriority.CRITICAL.value: 0,
-    TicketPriority.HIGH.value: 1,
-    TicketPriority.MEDIUM.value: 2,
-    TicketPriority.LOW.value: 3,
-}
+from software_factory.core.backlog import operations
+from software_factory.core.backlog.interface import BacklogInterface, HeartbeatResult, ReapResult
+from software_factory.core.models import Lease, Ticket, TicketStatus
 
 
 class SQLAlchemyBacklog(BacklogInterface):
     """Backlog adapter using SQLAlchemy session factory."""
 
-    def __init__(self, session_factory: sessionmaker[Session], lease_ttl_seconds: int | None = None):
+    def __init__(
+        self,
+        session_factory: sessionmaker[Session],
+        lease_ttl_seconds: int | None = None,
+        priority_aging_minutes: int | None = None,
+        max_attempts: int | None = None,
+        outbox: bool | None = None,
+    ):
+        settings = get_settings()
         self.session_factory = session_factory
-        self.lease_ttl_seconds = lease_ttl_seconds or get_settings().default_lease_ttl_seconds
+        self.lease_ttl_seconds = lease_ttl_seconds or settings.default_lease_ttl_seconds
+        self.priority_aging_minutes = (
+            settings.priority_aging_minutes if priority_aging_minutes is None else priority_aging_minutes
+        )
+        self.max_attempts = max_attempts or settings.max_ticket_attempts
+        self.outbox = settings.ticket_outbox_enabled if outbox is None else outbox
 
     def fetch_ready(self, limit: int = 50) -> list[Ticket]:
         """Fetch ready tickets sorted by priority and creation timestamp."""
 
         with self.session_factory() as session:
-            rows = session.execute(
-                select(TicketRow).where(TicketRow.status == TicketStatus.READY)
-            ).scalars()
-            ordered = sorted(
-                rows,
-                key=lambda row: (
-                    _PRIORITY_ORDER.get(row.priority, len(_PRIORITY_ORDER)),
-                    row.created_at,
-                ),
-            )
-            return [self._to_ticket(row) for row in ordered[:limit]]
+            return operations.fetch_ready(session, limit)
+
+    def iter_tickets(
+        self,
+        status: TicketStatus | None = None,
+        repo: str | None = None,
+        batch_size: int = 500,
+    ) -> Iterator[Ticket]:
+        """Stream tickets with keyset pagination, one short session per page."""
+
+        after: tuple[datetime, str] | None = None
+        while True:
+            with self.session_factory() as session:
+                page = operations.ticket_page(session, after, batch_size, status, repo)
+            yield from page
+            if len(page) < batch_size:
+                return
+            after = (page[-1].created_at, page[-1].id)
 
     def create_ticket(self, ticket: Ticket) -> Ticket:
         """Idempotently create a new ticket."""
 
         with self.session_factory() as session:
-            existing = session.execute(
-                select(TicketRow).where(TicketRow.idempotency_key == ticket.idempotency_key)
-            ).scalar_one_or_none()
-            if existing:
-                return self._to_ticket(existing)
-
-            row = TicketRow(
-                id=ticket.id,
-                source=ticket.source,
-                type=ticket.type,
-                priority=ticket.priority.value,
-                repo=ticket.repo,
-                context=ticket.context,
-                acceptance_criteria=ticket.acceptance_criteria,
-                idempotency_key=ticket.idempotency_key,
-                status=TicketStatus.READY,
-            )
-            session.add(row)
             try:
+                created = operations.create_tickets(
+                    session, [ticket], self.priority_aging_minutes, self.outbox
+                )
                 session.commit()
             except IntegrityError:
                 session.rollback()
-                retry = session.execute(
-                    select(TicketRow).where(TicketRow.idempotency_key == ticket.idempotency_key)
-                ).scalar_one()
-                return self._to_ticket(retry)
-            session.refresh(row)
-            return self._to_ticket(row)
+                created = operations.create_tickets(
+                    session, [ticket], self.priority_aging_minutes, self.outbox
+                )
+                session.commit()
+            return created[0]
+
+    def create_tickets(self, tickets: list[Ticket], chunk_size: int = 500) -> list[Ticket]:
+        """Idempotently create tickets in chunks of multi-row inserts.
+
+        Each chunk is committed on its own. Duplicate keys in the input resolve
+        to the same canonical ticket.
+        """
+
+        unique: dict[str, Ticket] = {}
+        for ticket in tickets:
+            unique.setdefault(ticket.idempotency_key, ticket)
+
+        pending = list(unique.values())
+        canonical: dict[str, Ticket] = {}
+        with self.session_factory() as session:
+            for start in range(0, len(pending), chunk_size):
+                chunk = pending[start : start + chunk_size]
+                for created in operations.create_tickets(
+                    session, chunk, self.priority_aging_minutes, self.outbox
+                ):
+                    canonical[created.idempotency_key] = created
+                session.commit()
+
+        return [canonical[ticket.idempotency_key] for ticket in tickets]
 
     def claim_ticket(self, ticket_id: str, owner: str) -> Lease | None:
         """Claim a ticket if it is available or has an expired lease."""
 
-        now = datetime.now(UTC)
-        expires_at = now + timedelta(seconds=self.lease_ttl_seconds)
-        lease_token = str(uuid4())
+        with self.session_factory() as session:
+            lease = operations.claim_ticket(session, ticket_id, owner, self.lease_ttl_seconds)
+            session.commit()
+            return lease
+
+    def claim_next(self, owner: str, n: int = 1) -> list[Lease]:
+        """Claim up to ``n`` of the highest-priority ready tickets in one transaction."""
 
         with self.session_factory() as session:
-            stmt = (
-                update(TicketRow)
-                .where(
-                    and_(
-                        TicketRow.id == ticket_id,
-                        or_(
-                            TicketRow.status == TicketStatus.READY,
-                            and_(
-                                TicketRow.status == TicketStatus.CLAIMED,
-                                TicketRow.lease_expires_at.is_not(None),
-                                TicketRow.lease_expires_at < now,
-                            ),
-                        ),
-                    )
-                )
-                .values(
-                    status=TicketStatus.CLAIMED,
-                    lease_owner=owner,
-                    lease_token=lease_token,
-                    lease_expires_at=expires_at,
-                    updated_at=now,
-                )
-            )
-            result = cast(CursorResult[tuple[object]], session.execute(stmt))
-            if result.rowcount != 1:
-                session.rollback()
-                return None
-
-            session.add(
-                LeaseRow(
-                    ticket_id=ticket_id,
-                    owner=owner,
-                    token=lease_token,
-                    expires_at=expires_at,
-                )
-            )
+            leases = operations.claim_next(session, owner, n, self.lease_ttl_seconds)
             session.commit()
-            return Lease(ticket_id=ticket_id, owner=owner, token=lease_token, expires_at=expires_at)
+            return leases
+
+    def claim_tickets(self, ticket_ids: list[str], owner: str) -> list[Lease]:
+        """Claim the given ready tickets in one transaction."""
+
+        with self.session_factory() as session:
+            leases = operations.claim_tickets(session, ticket_ids, owner, self.lease_ttl_seconds)
+            session.commit()
+            return leases
 
     def heartbeat(self, ticket_id: str, lease_token: str) -> Lease | None:
         """Extend a valid lease TTL."""
 
-        now = datetime.now(UTC)
-        expires_at = now + timedelta(seconds=self.lease_ttl_seconds)
+        renewed = self.heartbeat_many([(ticket_id, lease_token)]).renewed
+        return renewed[0] if renewed else None
+
+    def heartbeat_many(self, leases: list[tuple[str, str]]) -> HeartbeatResult:
+        """Extend every still-valid lease in one round trip."""
+
         with self.session_factory() as session:
-            stmt = (
-                update(TicketRow)
-                .where(
-                    and_(
-                        TicketRow.id == ticket_id,
-                        TicketRow.status == TicketStatus.CLAIMED,
-                        TicketRow.lease_token == lease_token,
-                        TicketRow.lease_expires_at.is_not(None),
-                        TicketRow.lease_expires_at >= now,
-                    )
-                )
-                .values(lease_expires_at=expires_at, updated_at=now)
-            )
-            result = cast(CursorResult[tuple[object]], session.execute(stmt))
-            if result.rowcount != 1:
-                session.rollback()
-                return None
-
-            lease_row = session.execute(
-                select(LeaseRow)
-                .where(LeaseRow.token == lease_token)
-                .order_by(LeaseRow.id.desc())
-            ).scalar_one_or_none()
-            if lease_row is not None:
-                lease_row.expires_at = expires_at
+            result = operations.heartbeat_many(session, leases, self.lease_ttl_seconds)
             session.commit()
-
-            row = session.execute(select(TicketRow).where(TicketRow.id == ticket_id)).scalar_one()
-            return Lease(
-                ticket_id=row.id,
-                owner=row.lease_owner or "",
-                token=lease_token,
-                expires_at=expires_at,
-            )
+            return result
 
     def complete_ticket(self, ticket_id: str, lease_token: str) -> Ticket | None:
         """Complete a ticket when caller holds lease token."""
@@ -178,60 +146,64 @@ class SQLAlchemyBacklog(BacklogInterface):
 
         return self._terminal_update(ticket_id, lease_token, TicketStatus.FAILED, reason)
 
-    def _terminal_update(
+    def release_in_session(
         self,
+        session: Session,
         ticket_id: str,
         lease_token: str,
         status: TicketStatus,
         reason: str | None = None,
     ) -> Ticket | None:
-        now = datetime.now(UTC)
-        with self.session_factory() as session:
-            row = session.execute(
-                select(TicketRow).where(
-                    and_(
-                        TicketRow.id == ticket_id,
-                        TicketRow.lease_token == lease_token,
-                        TicketRow.status == TicketStatus.CLAIMED,
-                    )
+        """Complete or fail a ticket inside the caller's transaction.
+
+        The lease release, status change and attempt counter are staged on
+        ``session`` and committed together with whatever else the caller wrote.
+        """
+
+        return operations.release_ticket(
+            session, ticket_id, lease_token, status, reason, self.outbox
+        )
+
+    def release_many_in_session(
+        self,
+        session: Session,
+        leases: list[tuple[str, str]],
+        status: TicketStatus,
+        reason: str | None = None,
+    ) -> list[str]:
+        """Bulk :meth:`release_in_session`; returns the ids of released tickets."""
+
+        return operations.release_tickets(session, leases, status, reason, self.outbox)
+
+    def reap_expired_leases(
+        self, now: datetime | None = None, batch_size: int = 500
+    ) -> ReapResult:
+        """Reclaim every lease that expired before ``now``, one committed batch at a time."""
+
+        now = now or datetime.now(UTC)
+        requeued: list[str] = []
+        failed: list[str] = []
+        while True:
+            with self.session_factory() as session:
+                result = operations.reap_expired_leases(
+                    session, now, batch_size, self.max_attempts, self.outbox
                 )
-            ).scalar_one_or_none()
-            if row is None:
-                return None
-
-            row.status = status
-            row.lease_owner = None
-            row.lease_token = None
-            row.lease_expires_at = None
-            row.updated_at = now
-            if status == TicketStatus.FAILED:
-                row.attempts += 1
-                row.last_failure_reason = reason
-
-            lease = session.execute(
-                select(LeaseRow)
-                .where(LeaseRow.token == lease_token)
-                .order_by(LeaseRow.id.desc())
-            ).scalar_one_or_none()
-            if lease is not None:
-                lease.released_at = now
+                session.commit()
+            requeued.extend(result.requeued)
+            failed.extend(result.failed)
+            if len(result.requeued) + len(result.failed) < batch_size:
+                return ReapResult(requeued=requeued, failed=failed)
 
+    def _terminal_update(
+        self,
+        ticket_id: str,
+        lease_token: str,
+        status: TicketStatus,
+        reason: str | None = None,
+    ) -> Ticket | None:
+        with self.session_factory() as session:
+            ticket = operations.release_ticket(
+                session, ticket_id, lease_token, status, reason, self.outbox
+            )
             session.commit()
-            session.refresh(row)
-            return self._to_ticket(row)
-
-    def _to_ticket(self, row: TicketRow) -> Ticket:
-        return Ticket(
-            id=row.id,
-            source=row.source,
-            type=row.type,
-            priority=TicketPriority(row.priority),
-            repo=row.repo,
-            context=row.context,
-            acceptance_criteria=list(row.acceptance_criteria),
-            idempotency_key=row.idempotency_key,
-            status=row.status,
-            attempts=row.attempts,
-            created_at=row.created_at,
-            updated_at=row.updated_at,
-        )
+            return ticket
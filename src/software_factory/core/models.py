@@ -97,6 +97,7 @@ class Run(BaseModel):
     ticket_id: str
     harness: str
     state: RunState = RunState.CLAIMED
+    version: int = 1
     sandbox_id: str | None = None
     lease_token: str
     budget: RunBudget
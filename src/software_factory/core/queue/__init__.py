@@ -1,6 +1,21 @@
 """Queue implementations."""
 
-from software_factory.core.queue.interface import QueueInterface, QueueItem
+from software_factory.core.queue.async_redis_queue import AsyncRedisQueue
+from software_factory.core.queue.interface import AsyncQueueInterface, QueueInterface, QueueItem
+from software_factory.core.queue.outbox_relay import OutboxRelay
+from software_factory.core.queue.priority_queue import PriorityRedisQueue
 from software_factory.core.queue.redis_queue import RedisQueue
+from software_factory.core.queue.reliable_queue import ReliableRedisQueue
+from software_factory.core.queue.sql_queue import SQLQueue
 
-__all__ = ["QueueInterface", "QueueItem", "RedisQueue"]
+__all__ = [
+    "AsyncQueueInterface",
+    "AsyncRedisQueue",
+    "OutboxRelay",
+    "PriorityRedisQueue",
+    "QueueInterface",
+    "QueueItem",
+    "RedisQueue",
+    "ReliableRedisQueue",
+    "SQLQueue",
+]
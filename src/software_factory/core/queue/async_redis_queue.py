@@ -0,0 +1,110 @@
+"""Asyncio Redis-backed queue implementation."""
+
+from __future__ import annotations
+
+import json
+import math
+from collections import deque
+from collections.abc import AsyncGenerator, Awaitable
+from typing import Any, cast
+
+from redis.asyncio import Redis
+
+from software_factory.core.queue.interface import AsyncQueueInterface, QueueItem
+from software_factory.core.queue.redis_queue import decode_item, encode_item
+
+
+class AsyncRedisQueue(AsyncQueueInterface):
+    """``redis.asyncio`` list queue, wire-compatible with :class:`RedisQueue`.
+
+    Pops block server-side on ``BLMPOP``, so an idle consumer costs one parked
+    connection rather than a polling loop, and an enqueued item is picked up
+    as soon as Redis hands it over. A batch is a single ``BLMPOP count``
+    (Redis 7+), so Redis pops it atomically.
+
+    Delivery is at-most-once: popped items exist only in the reply, so a
+    consumer that is cancelled or dies after Redis pops a batch but before
+    the reply is read loses it. Consumers that need at-least-once delivery
+    should use :class:`ReliableRedisQueue`, whose ``BLMOVE`` hands items to
+    a processing list until they are acknowledged.
+    """
+
+    def __init__(self, redis_client: Redis, name: str = "factory:ready", dlq_name: str = "factory:dlq"):
+        self.redis_client = redis_client
+        self.name = name
+        self.dlq_name = dlq_name
+
+    async def enqueue(self, item: QueueItem) -> None:
+        await self.enqueue_many([item])
+
+    async def enqueue_many(self, items: list[QueueItem]) -> None:
+        if items:
+            await cast(
+                Awaitable[int],
+                self.redis_client.rpush(self.name, *(encode_item(item) for item in items)),
+            )
+
+    async def dequeue(self, timeout: float | None = None) -> QueueItem | None:
+        items = await self.dequeue_many(1, timeout)
+        return items[0] if items else None
+
+    async def dequeue_many(self, n: int, timeout: float | None = None) -> list[QueueItem]:
+        if n <= 0:
+            return []
+        # One LMPOP/BLMPOP per batch. Cancelling after Redis has run it but
+        # before the reply is read drops the popped items (see the class
+        # docstring). BLMPOP takes whole seconds; 0 blocks forever. Sent raw
+        # because redis-py types the key varargs as lists.
+        if timeout is not None and timeout <= 0:
+            command: tuple[Any, ...] = ("LMPOP", 1, self.name)
+        else:
+            command = ("BLMPOP", 0 if timeout is None else math.ceil(timeout), 1, self.name)
+        popped = await cast(
+            Awaitable[list[Any] | None],
+            self.redis_client.execute_command(*command, "LEFT", "COUNT", n),
+        )
+        if popped is None:
+            return []
+        return [decode_item(payload) for payload in popped[1]]
+
+    async def consume(self, batch: int = 1, timeout: float | None = None) -> AsyncGenerator[QueueItem, None]:
+        """Yield items as they arrive until none arrives within ``timeout`` seconds.
+
+        At most ``batch`` items are popped ahead of the consumer, and the next
+        batch is only popped once every item of the previous one has been
+        taken, so a slow consumer applies back-pressure instead of draining
+        the queue into memory. If the consumer stops early or its task is
+        cancelled, items popped but not yet yielded are pushed back to the
+        head of the queue; wrap the iterator in :func:`contextlib.aclosing`
+        so that happens as soon as the loop exits.
+        """
+
+        pending: deque[QueueItem] = deque()
+        try:
+            while True:
+                pending = deque(await self.dequeue_many(batch, timeout))
+                if not pending:
+                    return
+                while pending:
+                    item = pending.popleft()
+                    yield item
+        finally:
+            if pending:
+                await cast(
+                    Awaitable[int],
+                    self.redis_client.lpush(
+                        self.name, *(encode_item(item) for item in reversed(pending))
+                    ),
+                )
+
+    async def dead_letter(self, item: QueueItem, reason: str) -> None:
+        await cast(
+            Awaitable[int],
+            self.redis_client.rpush(
+                self.dlq_name,
+                json.dumps({"ticket_id": item.ticket_id, "reason": reason}),
+            ),
+        )
+
+    async def pending_count(self) -> int:
+        return await cast(Awaitable[int], self.redis_client.llen(self.name))
@@ -3,14 +3,22 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import AsyncGenerator
 from dataclasses import dataclass
 
+from software_factory.core.models import TicketPriority
+
 
 @dataclass(frozen=True)
 class QueueItem:
-    """Minimal queued item payload."""
+    """Minimal queued item payload.
+
+    ``priority`` orders items in priority-aware queues; dequeued items only
+    carry ``ticket_id``.
+    """
 
     ticket_id: str
+    priority: TicketPriority = TicketPriority.MEDIUM
 
 
 class QueueInterface(ABC):
@@ -24,6 +32,23 @@ class QueueInterface(ABC):
     def dequeue(self) -> QueueItem | None:
         """Pop next item from ready queue."""
 
+    def enqueue_many(self, items: list[QueueItem]) -> None:
+        """Push items onto ready queue; implementations batch the round trips."""
+
+        for item in items:
+            self.enqueue(item)
+
+    def dequeue_many(self, n: int) -> list[QueueItem]:
+        """Pop up to ``n`` items from ready queue in order."""
+
+        items: list[QueueItem] = []
+        while len(items) < n:
+            item = self.dequeue()
+            if item is None:
+                break
+            items.append(item)
+        return items
+
     @abstractmethod
     def dead_letter(self, item: QueueItem, reason: str) -> None:
         """Move item to dead-letter set."""
@@ -31,3 +56,37 @@ class QueueInterface(ABC):
     @abstractmethod
     def pending_count(self) -> int:
         """Return ready queue depth."""
+
+
+class AsyncQueueInterface(ABC):
+    """Asyncio counterpart of :class:`QueueInterface` with blocking consumption."""
+
+    @abstractmethod
+    async def enqueue(self, item: QueueItem) -> None:
+        """Push an item onto ready queue."""
+
+    @abstractmethod
+    async def enqueue_many(self, items: list[QueueItem]) -> None:
+        """Push items onto ready queue in one round trip."""
+
+    @abstractmethod
+    async def dequeue(self, timeout: float | None = None) -> QueueItem | None:
+        """Pop next item, waiting up to ``timeout`` seconds (None waits forever)."""
+
+    @abstractmethod
+    async def dequeue_many(self, n: int, timeout: float | None = None) -> list[QueueItem]:
+        """Pop up to ``n`` items, waiting up to ``timeout`` seconds for the first."""
+
+    @abstractmethod
+    def consume(
+        self, batch: int = 1, timeout: float | None = None
+    ) -> AsyncGenerator[QueueItem, None]:
+        """Yield items as they arrive until none arrives within ``timeout`` seconds."""
+
+    @abstractmethod
+    async def dead_letter(self, item: QueueItem, reason: str) -> None:
+        """Move item to dead-letter set."""
+
+    @abstractmethod
+    async def pending_count(self) -> int:
+        """Return ready queue depth."""
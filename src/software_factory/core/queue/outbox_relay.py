@@ -0,0 +1,84 @@
+"""Relay from the ticket outbox to a ready queue."""
+
+from __future__ import annotations
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from software_factory.config import get_settings
+from software_factory.core.models import TicketPriority, TicketStatus
+from software_factory.core.queue.interface import QueueItem
+from software_factory.core.queue.priority_queue import PriorityRedisQueue
+from software_factory.db.models import TicketOutboxRow, TicketRow
+
+
+class OutboxRelay:
+    """Publish tickets staged in ``ticket_outbox`` to ``queue`` in batches.
+
+    The backlog stages an outbox row in the same transaction that makes a
+    ticket READY (creation, release back to READY, lease reaping), so a
+    ticket is never READY in the database without eventually reaching the
+    queue. Each batch is read ``FOR UPDATE SKIP LOCKED`` so concurrent relays
+    take disjoint batches, enqueued, and deleted in the same transaction.
+
+    Delivery is idempotent across batches and relay restarts: the queue is a
+    :class:`PriorityRedisQueue`, whose ``ZADD NX`` makes publishing a ticket
+    that is already pending a no-op. That covers rows replayed after a crash
+    between enqueue and commit, and a ticket staged again by a later batch.
+    Tickets no longer READY are dropped. A replayed item whose ticket was
+    already popped is queued once more, but claiming is guarded by ticket
+    status, so it cannot run twice.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker[Session],
+        queue: PriorityRedisQueue,
+        batch_size: int | None = None,
+    ):
+        self.session_factory = session_factory
+        self.queue = queue
+        self.batch_size = batch_size or get_settings().outbox_relay_batch_size
+
+    def relay_once(self) -> int:
+        """Publish one batch and return the number of outbox rows consumed."""
+
+        with self.session_factory() as session:
+            rows = session.execute(
+                select(
+                    TicketOutboxRow.id,
+                    TicketOutboxRow.idempotency_key,
+                    TicketRow.id.label("ticket_id"),
+                    TicketRow.priority,
+                    TicketRow.status,
+                )
+                .join(TicketRow, TicketRow.id == TicketOutboxRow.ticket_id)
+                .order_by(TicketOutboxRow.id)
+                .limit(self.batch_size)
+                .with_for_update(of=TicketOutboxRow, skip_locked=True)
+            ).all()
+            if not rows:
+                return 0
+
+            items: dict[str, QueueItem] = {}
+            for row in rows:
+                if row.status == TicketStatus.READY:
+                    items.setdefault(
+                        row.idempotency_key, QueueItem(row.ticket_id, TicketPriority(row.priority))
+                    )
+            self.queue.enqueue_many(list(items.values()))
+            session.execute(
+                delete(TicketOutboxRow).where(TicketOutboxRow.id.in_([row.id for row in rows]))
+            )
+            session.commit()
+        return len(rows)
+
+    def drain(self) -> int:
+        """Relay batches until the outbox is empty; returns the rows consumed."""
+
+        total = 0
+        while True:
+            relayed = self.relay_once()
+            total += relayed
+            if relayed < self.batch_size:
+                return total
@@ -19,16 +19,25 @@ class RedisQueue(QueueInterface):
         self.dlq_name = dlq_name
 
     def enqueue(self, item: QueueItem) -> None:
-        self.redis_client.rpush(self.name, json.dumps({"ticket_id": item.ticket_id}))
+        self.redis_client.rpush(self.name, encode_item(item))
+
+    def enqueue_many(self, items: list[QueueItem]) -> None:
+        if items:
+            self.redis_client.rpush(
+                self.name, *(encode_item(item) for item in items)
+            )
 
     def dequeue(self) -> QueueItem | None:
         payload = cast(str | bytes | None, self.redis_client.lpop(self.name))
         if payload is None:
             return None
-        if isinstance(payload, bytes):
-            payload = payload.decode("utf-8")
-        data = json.loads(payload)
-        return QueueItem(ticket_id=data["ticket_id"])
+        return decode_item(payload)
+
+    def dequeue_many(self, n: int) -> list[QueueItem]:
+        if n <= 0:
+            return []
+        payloads = cast(list[str | bytes] | None, self.redis_client.lpop(self.name, n))
+        return [decode_item(payload) for payload in payloads or []]
 
     def dead_letter(self, item: QueueItem, reason: str) -> None:
         self.redis_client.rpush(
@@ -38,3 +47,18 @@ class RedisQueue(QueueInterface):
 
     def pending_count(self) -> int:
         return cast(int, self.redis_client.llen(self.name))
+
+
+def encode_item(item: QueueItem) -> str:
+    """Serialise a queue item to its list payload."""
+
+    return json.dumps({"ticket_id": item.ticket_id})
+
+
+def decode_item(payload: str | bytes) -> QueueItem:
+    """Parse a list payload back into a queue item."""
+
+    if isinstance(payload, bytes):
+        payload = payload.decode("utf-8")
+    data = json.loads(payload)
+    return QueueItem(ticket_id=data["ticket_id"])
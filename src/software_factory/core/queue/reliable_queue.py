@@ -0,0 +1,193 @@
+"""Redis list queue with at-least-once delivery."""
+
+from __future__ import annotations
+
+import json
+import math
+from datetime import UTC, datetime
+from typing import Any, cast
+
+from redis import Redis
+
+from software_factory.config import get_settings
+from software_factory.core.queue.interface import QueueItem
+from software_factory.core.queue.redis_queue import RedisQueue, decode_item, encode_item
+
+# KEYS processing list, in-flight zset, deliveries hash, ready list, dead-letter list;
+# ARGV payload, in-flight member, max deliveries, dead-letter payload.
+# Returns 0 if the item was no longer in flight, 1 if requeued, 2 if dead-lettered.
+_RELEASE_SCRIPT = """
+redis.call('ZREM', KEYS[2], ARGV[2])
+if redis.call('LREM', KEYS[1], 1, ARGV[1]) == 0 then
+  return 0
+end
+local deliveries = tonumber(redis.call('HGET', KEYS[3], ARGV[1]) or '0')
+if deliveries >= tonumber(ARGV[3]) then
+  redis.call('HDEL', KEYS[3], ARGV[1])
+  redis.call('RPUSH', KEYS[5], ARGV[4])
+  return 2
+end
+redis.call('RPUSH', KEYS[4], ARGV[1])
+return 1
+"""
+
+
+class ReliableRedisQueue(RedisQueue):
+    """:class:`RedisQueue` whose items stay in flight until acknowledged.
+
+    :meth:`dequeue` blocks for up to ``block_timeout_seconds`` on ``BLMOVE``,
+    moving the item into this consumer's processing list, and records a
+    visibility deadline for it. The caller must :meth:`ack` the item once it
+    has been handled (e.g. after ``claim_ticket``) or :meth:`nack` it to hand
+    it back. :meth:`requeue_expired` returns items whose deadline passed to
+    the ready list, or to the dead-letter list once they have been delivered
+    ``max_deliveries`` times, so a worker crash loses nothing.
+    """
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        consumer: str,
+        name: str = "factory:ready",
+        dlq_name: str = "factory:dlq",
+        visibility_timeout_seconds: float | None = None,
+        max_deliveries: int | None = None,
+        block_timeout_seconds: float | None = None,
+    ):
+        super().__init__(redis_client, name=name, dlq_name=dlq_name)
+        settings = get_settings()
+        self.consumer = consumer
+        self.visibility_timeout_seconds = (
+            visibility_timeout_seconds or settings.queue_visibility_timeout_seconds
+        )
+        self.max_deliveries = max_deliveries or settings.queue_max_deliveries
+        self.block_timeout_seconds = (
+            settings.queue_block_timeout_seconds
+            if block_timeout_seconds is None
+            else block_timeout_seconds
+        )
+        self.processing_name = self._processing_name(consumer)
+        self.inflight_name = f"{name}:inflight"
+        self.deliveries_name = f"{name}:deliveries"
+        self.consumers_name = f"{name}:consumers"
+        self._release_script = redis_client.register_script(_RELEASE_SCRIPT)
+
+    def dequeue(self) -> QueueItem | None:
+        """Move the next item in flight, waiting up to ``block_timeout_seconds``."""
+
+        return self._move(self.block_timeout_seconds)
+
+    def dequeue_many(self, n: int) -> list[QueueItem]:
+        """Move up to ``n`` items in flight, blocking only for the first."""
+
+        items: list[QueueItem] = []
+        while len(items) < n:
+            item = self._move(self.block_timeout_seconds if not items else 0)
+            if item is None:
+                break
+            items.append(item)
+        return items
+
+    def ack(self, item: QueueItem) -> bool:
+        """Drop a handled item; False if it was no longer in flight here."""
+
+        payload = encode_item(item)
+        pipe = self.redis_client.pipeline()
+        pipe.lrem(self.processing_name, 1, payload)
+        pipe.zrem(self.inflight_name, self._member(self.consumer, payload))
+        pipe.hdel(self.deliveries_name, payload)
+        removed, _, _ = pipe.execute()
+        return bool(removed)
+
+    def nack(self, item: QueueItem, reason: str = "nack") -> bool:
+        """Hand an item back for redelivery, or dead-letter it past ``max_deliveries``.
+
+        Returns False if the item was no longer in flight here.
+        """
+
+        return self._release(self.consumer, encode_item(item), reason) > 0
+
+    def requeue_expired(self, now: datetime | None = None) -> int:
+        """Release every in-flight item past its visibility deadline.
+
+        Items found in a processing list without a deadline (a consumer died
+        between the move and its bookkeeping) are given one first. Returns
+        the number of items requeued or dead-lettered.
+        """
+
+        now = now or datetime.now(UTC)
+        self._adopt_orphans()
+        expired = cast(
+            list[Any],
+            self.redis_client.zrangebyscore(self.inflight_name, "-inf", now.timestamp()),
+        )
+        released = 0
+        for member in expired:
+            consumer, payload = json.loads(_text(member))
+            if self._release(consumer, payload, "visibility_timeout") > 0:
+                released += 1
+        return released
+
+    def inflight_count(self) -> int:
+        """Return the number of items delivered but not yet acknowledged."""
+
+        return cast(int, self.redis_client.zcard(self.inflight_name))
+
+    def _move(self, block_timeout_seconds: float) -> QueueItem | None:
+        if block_timeout_seconds > 0:
+            payload = self.redis_client.blmove(
+                self.name, self.processing_name, math.ceil(block_timeout_seconds), "LEFT", "RIGHT"
+            )
+        else:
+            payload = self.redis_client.lmove(self.name, self.processing_name, "LEFT", "RIGHT")
+        if payload is None:
+            return None
+
+        payload = _text(payload)
+        pipe = self.redis_client.pipeline()
+        pipe.zadd(self.inflight_name, {self._member(self.consumer, payload): self._deadline()})
+        pipe.hincrby(self.deliveries_name, payload, 1)
+        pipe.sadd(self.consumers_name, self.consumer)
+        pipe.execute()
+        return decode_item(payload)
+
+    def _release(self, consumer: str, payload: str, reason: str) -> int:
+        dead_letter = json.dumps({**json.loads(payload), "reason": reason})
+        return cast(
+            int,
+            self._release_script(
+                keys=[
+                    self._processing_name(consumer),
+                    self.inflight_name,
+                    self.deliveries_name,
+                    self.name,
+                    self.dlq_name,
+                ],
+                args=[payload, self._member(consumer, payload), self.max_deliveries, dead_letter],
+            ),
+        )
+
+    def _adopt_orphans(self) -> None:
+        consumers = cast(set[Any], self.redis_client.smembers(self.consumers_name))
+        for consumer in sorted(_text(member) for member in consumers):
+            payloads = cast(list[Any], self.redis_client.lrange(self._processing_name(consumer), 0, -1))
+            if payloads:
+                self.redis_client.zadd(
+                    self.inflight_name,
+                    {self._member(consumer, _text(payload)): self._deadline() for payload in payloads},
+                    nx=True,
+                )
+
+    def _processing_name(self, consumer: str) -> str:
+        return f"{self.name}:processing:{consumer}"
+
+    def _deadline(self) -> float:
+        return datetime.now(UTC).timestamp() + self.visibility_timeout_seconds
+
+    @staticmethod
+    def _member(consumer: str, payload: str) -> str:
+        return json.dumps([consumer, payload])
+
+
+def _text(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
@@ -0,0 +1,155 @@
+"""Database-backed queue for deployments without Redis."""
+
+from __future__ import annotations
+
+import time
+
+import psycopg
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from software_factory.config import get_settings
+from software_factory.core.backlog.operations import PRIORITY_ORDER
+from software_factory.core.models import TicketPriority
+from software_factory.core.queue.interface import QueueInterface, QueueItem
+from software_factory.db.models import QueueDeadLetterRow, QueueItemRow
+
+# One channel for every queue; the payload names the queue that gained items.
+NOTIFY_CHANNEL = "software_factory_queue"
+
+_PRIORITY_BY_RANK = {rank: TicketPriority(value) for value, rank in PRIORITY_ORDER.items()}
+
+
+class SQLQueue(QueueInterface):
+    """Queue stored in the ``queue_items`` table, ordered by priority then FIFO.
+
+    :meth:`dequeue_many` is a single ``DELETE ... RETURNING`` over the head
+    of the queue selected ``FOR UPDATE SKIP LOCKED``, so concurrent consumers
+    on PostgreSQL take disjoint batches without waiting on each other; on
+    SQLite the statement is serialised by the database lock instead. On
+    PostgreSQL every enqueue also issues ``pg_notify`` in its transaction,
+    and :meth:`wait` parks on ``LISTEN`` rather than polling; other backends
+    fall back to sleeping ``poll_interval_seconds``.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker[Session],
+        name: str = "factory:ready",
+        dlq_name: str = "factory:dlq",
+        poll_interval_seconds: float | None = None,
+    ):
+        self.session_factory = session_factory
+        self.name = name
+        self.dlq_name = dlq_name
+        self.poll_interval_seconds = (
+            get_settings().queue_poll_interval_seconds
+            if poll_interval_seconds is None
+            else poll_interval_seconds
+        )
+        self._listener: psycopg.Connection | None = None
+
+    def enqueue(self, item: QueueItem) -> None:
+        self.enqueue_many([item])
+
+    def enqueue_many(self, items: list[QueueItem]) -> None:
+        if not items:
+            return
+        with self.session_factory() as session:
+            session.execute(
+                insert(QueueItemRow),
+                [
+                    {
+                        "queue": self.name,
+                        "ticket_id": item.ticket_id,
+                        "priority_rank": PRIORITY_ORDER[item.priority.value],
+                    }
+                    for item in items
+                ],
+            )
+            if session.get_bind().dialect.name == "postgresql":
+                session.execute(select(func.pg_notify(NOTIFY_CHANNEL, self.name)))
+            session.commit()
+
+    def dequeue(self) -> QueueItem | None:
+        items = self.dequeue_many(1)
+        return items[0] if items else None
+
+    def dequeue_many(self, n: int) -> list[QueueItem]:
+        if n <= 0:
+            return []
+        head = (
+            select(QueueItemRow.id)
+            .where(QueueItemRow.queue == self.name)
+            .order_by(QueueItemRow.priority_rank, QueueItemRow.id)
+            .limit(n)
+            .with_for_update(skip_locked=True)
+        )
+        with self.session_factory() as session:
+            rows = session.execute(
+                delete(QueueItemRow)
+                .where(QueueItemRow.id.in_(head))
+                .returning(QueueItemRow.id, QueueItemRow.ticket_id, QueueItemRow.priority_rank)
+            ).all()
+            session.commit()
+        # RETURNING order is unspecified, so restore queue order here.
+        return [
+            QueueItem(ticket_id=row.ticket_id, priority=_PRIORITY_BY_RANK[row.priority_rank])
+            for row in sorted(rows, key=lambda row: (row.priority_rank, row.id))
+        ]
+
+    def dead_letter(self, item: QueueItem, reason: str) -> None:
+        with self.session_factory() as session:
+            session.add(QueueDeadLetterRow(queue=self.dlq_name, ticket_id=item.ticket_id, reason=reason))
+            session.commit()
+
+    def pending_count(self) -> int:
+        with self.session_factory() as session:
+            count = session.scalar(
+                select(func.count()).select_from(QueueItemRow).where(QueueItemRow.queue == self.name)
+            )
+        return count or 0
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until items may be pending, for at most ``timeout`` seconds.
+
+        Defaults to ``poll_interval_seconds``. Returns whether the queue has
+        pending items, so a consumer loops ``wait`` then ``dequeue_many``.
+        """
+
+        timeout = self.poll_interval_seconds if timeout is None else timeout
+        listener = self._listen()
+        if listener is None:
+            if self.pending_count() == 0:
+                time.sleep(timeout)
+        elif self.pending_count() == 0:
+            deadline = time.monotonic() + timeout
+            while (remaining := deadline - time.monotonic()) > 0:
+                notices = list(listener.notifies(timeout=remaining, stop_after=1))
+                if not notices or notices[0].payload == self.name:
+                    break
+        return self.pending_count() > 0
+
+    def close(self) -> None:
+        """Close the ``LISTEN`` connection, if one was opened."""
+
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+
+    def _listen(self) -> psycopg.Connection | None:
+        if self._listener is not None:
+            return self._listener
+        engine = self.session_factory.kw.get("bind")
+        if not isinstance(engine, Engine) or engine.dialect.driver != "psycopg":
+            return None
+        # A dedicated autocommit connection outside the pool, so notifications
+        # are delivered as they arrive rather than at transaction boundaries.
+        listener = psycopg.Connection.connect(
+            engine.url.set(drivername="postgresql").render_as_string(hide_password=False),
+            autocommit=True,
+        )
+        listener.execute(f'LISTEN "{NOTIFY_CHANNEL}"')
+        self._listener = listener
+        return listener
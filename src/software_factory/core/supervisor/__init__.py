@@ -1,5 +1,44 @@
 """Supervisor package exports."""
 
+from software_factory.core.supervisor.async_run_supervisor import AsyncRunSupervisor
+from software_factory.core.supervisor.event_archive import (
+    LocalSegmentStore,
+    SegmentStore,
+    archive_run_events,
+    read_run_events,
+)
+from software_factory.core.supervisor.event_buffer import RunEventBuffer
+from software_factory.core.supervisor.hot_counters import (
+    AsyncRunCounters,
+    CounterReport,
+    RunCounters,
+    RunUsage,
+)
+from software_factory.core.supervisor.projection import (
+    RunProjection,
+    RunProjector,
+    apply_event,
+    fold_events,
+)
+from software_factory.core.supervisor.run_cache import ActiveRunCache, CachedRun
 from software_factory.core.supervisor.run_supervisor import RunSupervisor
 
-__all__ = ["RunSupervisor"]
+__all__ = [
+    "ActiveRunCache",
+    "AsyncRunCounters",
+    "AsyncRunSupervisor",
+    "CachedRun",
+    "CounterReport",
+    "LocalSegmentStore",
+    "RunCounters",
+    "RunEventBuffer",
+    "RunProjection",
+    "RunProjector",
+    "RunSupervisor",
+    "RunUsage",
+    "SegmentStore",
+    "apply_event",
+    "archive_run_events",
+    "fold_events",
+    "read_run_events",
+]
@@ -0,0 +1,333 @@
+"""Asyncio run supervisor."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Mapping
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from software_factory.core.backlog.interface import AsyncBacklogInterface
+from software_factory.core.models import Run, RunBudget, RunState, TicketStatus
+from software_factory.core.supervisor import operations
+from software_factory.core.supervisor.base import SupervisorBase
+from software_factory.core.supervisor.event_buffer import RunEventBuffer
+from software_factory.core.supervisor.hot_counters import (
+    AsyncRunCounters,
+    CounterReport,
+    RunUsage,
+)
+from software_factory.core.supervisor.run_cache import ActiveRunCache
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRunSupervisor(SupervisorBase):
+    """Asyncio counterpart of :class:`~software_factory.core.supervisor.RunSupervisor`."""
+
+    def __init__(
+        self,
+        backlog: AsyncBacklogInterface,
+        session_factory: async_sessionmaker[AsyncSession],
+        heartbeat_timeout_seconds: int | None = None,
+        events: RunEventBuffer | None = None,
+        cache: ActiveRunCache | None = None,
+        counters: AsyncRunCounters | None = None,
+    ):
+        super().__init__(heartbeat_timeout_seconds, events, cache)
+        self.backlog = backlog
+        self.session_factory = session_factory
+        self.counters = counters
+        self._flusher: asyncio.Task[None] | None = None
+
+    async def dispatch(self, ticket_id: str, owner: str, harness: str, budget: RunBudget) -> Run | None:
+        """Claim a ticket and create a new run."""
+
+        lease = await self.backlog.claim_ticket(ticket_id=ticket_id, owner=owner)
+        if lease is None:
+            return None
+        runs = operations.start_runs([lease], {ticket_id: harness}, budget)
+        return (await self._start(runs, owner))[0]
+
+    async def dispatch_many(
+        self, assignments: list[tuple[str, str]], owner: str, budget: RunBudget
+    ) -> list[Run]:
+        """Claim ``(ticket_id, harness)`` assignments in one batch and create their runs.
+
+        Tickets that are no longer ready are skipped; all new runs are recorded
+        in one transaction.
+        """
+
+        harnesses = dict(assignments)
+        leases = await self.backlog.claim_tickets(list(harnesses), owner)
+        if not leases:
+            return []
+        return await self._start(operations.start_runs(leases, harnesses, budget), owner)
+
+    async def active_run_counts(self) -> tuple[dict[str, int], dict[str, int]]:
+        """Return active run counts keyed by harness and by repo."""
+
+        async with self.session_factory() as session:
+            return await session.run_sync(operations.active_run_counts)
+
+    async def monitor_run(
+        self,
+        run_id: str,
+        new_state: RunState,
+        token_delta: int = 0,
+        payload: dict[str, Any] | None = None,
+        expected_version: int | None = None,
+    ) -> Run | None:
+        """Transition run state and record a run event.
+
+        Pass ``expected_version`` to make the transition conditional on the run
+        not having changed state since the caller last read it.
+
+        Terminal transitions release the ticket in the same transaction as the
+        run update when the backlog is SQL-backed, and write then drop the
+        run's hot counters, if any. With hot counters, ``token_delta`` of a
+        tracked run is added in Redis and the resulting total written here.
+        """
+
+        terminal = new_state in operations.TERMINAL_STATES
+        usage: dict[str, RunUsage] = {}
+        if self.counters is not None and (terminal or token_delta):
+            if token_delta and await self.counters.report(run_id, token_delta) is not None:
+                token_delta = 0
+            usage = await self.counters.usage([run_id])
+        async with self.session_factory() as session:
+            run_row = await session.run_sync(
+                operations.apply_transition,
+                run_id,
+                new_state,
+                token_delta,
+                payload,
+                self.events,
+                expected_version,
+                self._cached(run_id),
+                usage,
+            )
+            if run_row is None:
+                self._forget([run_id])
+                return None
+
+            ticket_status = operations.TERMINAL_TICKET_STATUS.get(new_state)
+            if ticket_status is not None:
+                await self.backlog.release_in_session(
+                    session, run_row.ticket_id, run_row.lease_token, ticket_status, new_state.value
+                )
+
+            await session.commit()
+
+        self._refresh(run_row)
+        if terminal and self.counters is not None:
+            await self.counters.forget([run_id])
+        await self._maybe_flush_events()
+        return operations.to_run(run_row)
+
+    async def enforce_limits(self, run_id: str, token_count: int | None = None) -> Run | None:
+        """Apply budget constraints to a run and timeout if limits are exceeded.
+
+        With hot counters, a reported ``token_count`` of a tracked run becomes
+        its total in Redis and is checked there, so the report writes nothing
+        to the database; later :meth:`record_usage` deltas build on it.
+        """
+
+        if self.counters is not None and token_count is not None:
+            report = await self._count(run_id, token_count=token_count)
+            if report is not None:
+                if report.exceeded is not None:
+                    return await self.monitor_run(
+                        run_id,
+                        RunState.TIMED_OUT,
+                        payload={"reason": report.exceeded, "token_count": token_count},
+                    )
+                async with self.session_factory() as session:
+                    run = await session.run_sync(operations.active_run, run_id)
+                return run.model_copy(update={"token_count": report.token_count}) if run else None
+
+        async with self.session_factory() as session:
+            run_row, reason = await session.run_sync(
+                operations.check_budget, run_id, token_count, self.events, self._cached(run_id)
+            )
+            if run_row is None:
+                self._forget([run_id])
+                return None
+            await session.commit()
+
+        self._refresh(run_row)
+        await self._maybe_flush_events()
+        if reason is not None:
+            return await self.monitor_run(
+                run_id,
+                RunState.TIMED_OUT,
+                payload={"reason": reason, "token_count": token_count},
+            )
+        return operations.to_run(run_row)
+
+    async def record_usage(self, run_id: str, token_delta: int = 0) -> CounterReport | None:
+        """Count reported tokens and a heartbeat in Redis, timing the run out on overrun.
+
+        See :meth:`RunSupervisor.record_usage`.
+        """
+
+        report = await self._count(run_id, token_delta)
+        if report is not None and report.exceeded is not None:
+            await self.monitor_run(
+                run_id,
+                RunState.TIMED_OUT,
+                payload={"reason": report.exceeded, "token_count": report.token_count},
+            )
+        return report
+
+    async def enforce_all_limits(self, token_counts: Mapping[str, int] | None = None) -> list[str]:
+        """Time out every run over its runtime or token budget in one transaction.
+
+        ``token_counts`` maps run ids to their latest reported token usage. The
+        sweep costs a constant number of queries regardless of fleet size and
+        returns the ids of the runs it timed out. Pending hot counters are
+        written in the same transaction first.
+        """
+
+        usage = await self.counters.collect() if self.counters is not None else {}
+        try:
+            async with self.session_factory() as session:
+                timed_out = await session.run_sync(
+                    operations.sweep_budgets, usage, dict(token_counts or {}), self.events
+                )
+                await self.backlog.release_many_in_session(
+                    session,
+                    [(ticket_id, lease_token) for _, ticket_id, lease_token in timed_out],
+                    TicketStatus.FAILED,
+                    RunState.TIMED_OUT.value,
+                )
+                await session.commit()
+        except Exception:
+            if self.counters is not None:
+                await self.counters.mark_dirty(list(usage))
+            raise
+
+        self._forget([run_id for run_id, _, _ in timed_out])
+        if self.counters is not None:
+            await self.counters.forget([run_id for run_id, _, _ in timed_out])
+        await self._maybe_flush_events()
+        return [run_id for run_id, _, _ in timed_out]
+
+    async def recover_stale_runs(self, batch_size: int = 500) -> list[str]:
+        """Mark runs timed_out if heartbeat is stale beyond configured timeout.
+
+        Runs are recovered in set-based batches, one transaction each. Hot
+        counters are flushed first so heartbeats held in Redis count.
+        """
+
+        await self.flush_counters()
+        cutoff = self._stale_cutoff()
+        recovered: list[str] = []
+
+        while True:
+            async with self.session_factory() as session:
+                timed_out = await session.run_sync(
+                    operations.time_out_stale_runs, cutoff, batch_size, self.events
+                )
+                await self.backlog.release_many_in_session(
+                    session,
+                    [(ticket_id, lease_token) for _, ticket_id, lease_token in timed_out],
+                    TicketStatus.FAILED,
+                    RunState.TIMED_OUT.value,
+                )
+                await session.commit()
+            self._forget([run_id for run_id, _, _ in timed_out])
+            if self.counters is not None:
+                await self.counters.forget([run_id for run_id, _, _ in timed_out])
+            recovered.extend(run_id for run_id, _, _ in timed_out)
+            if len(timed_out) < batch_size:
+                return recovered
+
+    async def flush_counters(self) -> int:
+        """Write the hot counters of every run reported since the last flush."""
+
+        if self.counters is None:
+            return 0
+        usage = await self.counters.collect()
+        if not usage:
+            return 0
+        try:
+            async with self.session_factory() as session:
+                written = await session.run_sync(
+                    operations.apply_run_usage, usage, self.events
+                )
+                await session.commit()
+        except Exception:
+            await self.counters.mark_dirty(list(usage))
+            raise
+
+        await self.counters.forget(sorted(set(usage) - set(written)))
+        await self._maybe_flush_events()
+        return len(written)
+
+    async def flush_events(self) -> int:
+        """Write every buffered run event now with one multi-row INSERT."""
+
+        async with self.session_factory() as session:
+            flushed = await session.run_sync(self.events.drain_into)
+            await session.commit()
+        return flushed
+
+    def start_event_flusher(self) -> None:
+        """Flush buffered run events from a background task; see :meth:`RunSupervisor.start_event_flusher`."""
+
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_events_periodically())
+
+    async def close(self) -> None:
+        """Flush hot counters and buffered run events before shutdown."""
+
+        if self._flusher is not None:
+            self._flusher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flusher
+            self._flusher = None
+        await self.flush_counters()
+        await self.flush_events()
+        self.events.close()
+
+    async def _count(
+        self, run_id: str, token_delta: int = 0, token_count: int | None = None
+    ) -> CounterReport | None:
+        if self.counters is None:
+            return None
+        report = await self.counters.report(run_id, token_delta, token_count=token_count)
+        if report is None:
+            async with self.session_factory() as session:
+                run = await session.run_sync(operations.active_run, run_id)
+            if run is None:
+                return None
+            await self.counters.track([run])
+            report = await self.counters.report(run_id, token_delta, token_count=token_count)
+        return report
+
+    async def _start(self, runs: list[Run], owner: str) -> list[Run]:
+        async with self.session_factory() as session:
+            await session.run_sync(operations.record_dispatches, runs, owner, self.events)
+            await session.commit()
+
+        self._remember(runs)
+        if self.counters is not None:
+            await self.counters.track(runs)
+        await self._maybe_flush_events()
+        return runs
+
+    async def _flush_events_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.events.seconds_until_flush())
+            try:
+                await self._maybe_flush_events()
+            except Exception:
+                logger.exception("periodic run event flush failed")
+
+    async def _maybe_flush_events(self) -> None:
+        if self.events.should_flush():
+            await self.flush_events()
@@ -0,0 +1,64 @@
+"""State and bookkeeping shared by the sync and async run supervisors."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+from software_factory.config import get_settings
+from software_factory.core.models import Run
+from software_factory.core.supervisor.event_buffer import RunEventBuffer
+from software_factory.core.supervisor.operations import TERMINAL_STATES
+from software_factory.core.supervisor.run_cache import ActiveRunCache, CachedRun
+from software_factory.db.models import RunRow
+
+
+class SupervisorBase:
+    """Configuration, event buffer and active-run cache of a supervisor.
+
+    Subclasses add the backlog, session factory and hot counters and do the
+    I/O; every database decision lives in
+    :mod:`software_factory.core.supervisor.operations`.
+    """
+
+    def __init__(
+        self,
+        heartbeat_timeout_seconds: int | None = None,
+        events: RunEventBuffer | None = None,
+        cache: ActiveRunCache | None = None,
+    ):
+        settings = get_settings()
+        self.heartbeat_timeout_seconds = (
+            heartbeat_timeout_seconds or settings.run_heartbeat_timeout_seconds
+        )
+        if events is None:
+            events = RunEventBuffer(
+                settings.run_event_buffered_types,
+                max_batch=settings.run_event_batch_size,
+                flush_interval_seconds=settings.run_event_flush_interval_seconds,
+                wal_path=settings.run_event_wal_path,
+            )
+        self.events = events
+        self.cache = cache
+
+    def _stale_cutoff(self) -> datetime:
+        return datetime.now(UTC) - timedelta(seconds=self.heartbeat_timeout_seconds)
+
+    def _cached(self, run_id: str) -> CachedRun | None:
+        return self.cache.get(run_id) if self.cache is not None else None
+
+    def _remember(self, runs: list[Run]) -> None:
+        if self.cache is not None:
+            for run in runs:
+                self.cache.put(CachedRun.from_run(run))
+
+    def _refresh(self, run_row: RunRow) -> None:
+        if self.cache is None:
+            return
+        if run_row.state in TERMINAL_STATES:
+            self.cache.evict([run_row.id])
+        else:
+            self.cache.put(CachedRun.from_row(run_row))
+
+    def _forget(self, run_ids: list[str]) -> None:
+        if self.cache is not None:
+            self.cache.evict(run_ids)
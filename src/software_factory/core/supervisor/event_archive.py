@@ -0,0 +1,170 @@
+"""Cold-storage archival of the run_events ledger."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from abc import ABC, abstractmethod
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from software_factory.config import get_settings
+from software_factory.core.supervisor.operations import TERMINAL_STATES, as_utc
+from software_factory.db.models import RunEventRow, RunEventSegmentRow, RunRow
+
+_EVENT_COLUMNS = ("id", "run_id", "ticket_id", "event_type", "payload", "created_at")
+
+
+class SegmentStore(ABC):
+    """Write-once blob store for archived event segments."""
+
+    @abstractmethod
+    def put(self, name: str, data: bytes) -> None:
+        """Store a complete segment under ``name``."""
+
+    @abstractmethod
+    def get_range(self, name: str, offset: int, length: int) -> bytes:
+        """Return ``length`` bytes of segment ``name`` starting at ``offset``."""
+
+
+class LocalSegmentStore(SegmentStore):
+    """Segment store on local disk, standing in for an object store.
+
+    Segments are written to a temporary file and renamed into place, so a
+    reader never sees a partial segment.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def put(self, name: str, data: bytes) -> None:
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def get_range(self, name: str, offset: int, length: int) -> bytes:
+        with (self.root / name).open("rb") as segment:
+            segment.seek(offset)
+            return segment.read(length)
+
+
+def archive_run_events(
+    session_factory: sessionmaker[Session],
+    store: SegmentStore,
+    archive_after_days: int | None = None,
+    batch_size: int = 500,
+    now: datetime | None = None,
+) -> int:
+    """Move events of runs that ended over ``archive_after_days`` ago into segments.
+
+    Each batch of up to ``batch_size`` runs becomes one JSONL-gzip segment in
+    ``store``. Every run is its own gzip member, so the ``run_event_segments``
+    index can point at its byte range and a reader decompresses only that
+    run. The segment is written before the transaction that indexes it and
+    deletes the hot rows, so an interrupted batch leaves at worst an
+    unreferenced segment. Returns the number of runs archived.
+    """
+
+    if archive_after_days is None:
+        archive_after_days = get_settings().run_event_archive_after_days
+    now = now or datetime.now(UTC)
+    cutoff = now - timedelta(days=archive_after_days)
+    archived = 0
+
+    while True:
+        with session_factory() as session:
+            candidates = (
+                select(RunEventRow.run_id)
+                .join(RunRow, RunRow.id == RunEventRow.run_id)
+                .where(RunRow.state.in_(TERMINAL_STATES), RunRow.ended_at < cutoff)
+                .group_by(RunEventRow.run_id)
+                .order_by(func.min(RunEventRow.id))
+                .limit(batch_size)
+            )
+            run_ids: list[str] = list(
+                session.execute(
+                    select(RunRow.id)
+                    .where(RunRow.id.in_(candidates))
+                    .with_for_update(skip_locked=True)
+                ).scalars()
+            )
+            if not run_ids:
+                return archived
+
+            by_run: dict[str, list[dict[str, Any]]] = {run_id: [] for run_id in run_ids}
+            for row in session.execute(
+                select(*(getattr(RunEventRow, column) for column in _EVENT_COLUMNS))
+                .where(RunEventRow.run_id.in_(run_ids))
+                .order_by(RunEventRow.id)
+            ):
+                by_run[row.run_id].append(_to_record(row._mapping))
+
+            name = f"{now:%Y/%m/%d}/{uuid4().hex}.jsonl.gz"
+            data = bytearray()
+            index: list[dict[str, Any]] = []
+            for run_id, records in by_run.items():
+                member = gzip.compress(
+                    "".join(json.dumps(record) + "\n" for record in records).encode("utf-8")
+                )
+                index.append(
+                    {
+                        "run_id": run_id,
+                        "segment": name,
+                        "offset": len(data),
+                        "length": len(member),
+                        "event_count": len(records),
+                        "archived_at": now,
+                    }
+                )
+                data.extend(member)
+            store.put(name, bytes(data))
+
+            session.execute(insert(RunEventSegmentRow), index)
+            session.execute(delete(RunEventRow).where(RunEventRow.run_id.in_(run_ids)))
+            session.commit()
+            archived += len(run_ids)
+
+
+def read_run_events(session: Session, store: SegmentStore, run_id: str) -> list[dict[str, Any]]:
+    """Return every event of a run, archived and hot, in ledger order.
+
+    Archived events are read from the byte ranges listed in
+    ``run_event_segments`` and merged with the rows still in ``run_events``;
+    each event is a column mapping of ``run_events``.
+    """
+
+    merged: dict[int, dict[str, Any]] = {}
+    for entry in session.execute(
+        select(RunEventSegmentRow)
+        .where(RunEventSegmentRow.run_id == run_id)
+        .order_by(RunEventSegmentRow.id)
+    ).scalars():
+        member = gzip.decompress(store.get_range(entry.segment, entry.offset, entry.length))
+        for line in member.decode("utf-8").splitlines():
+            record = _from_record(json.loads(line))
+            merged[record["id"]] = record
+
+    for row in session.execute(
+        select(*(getattr(RunEventRow, column) for column in _EVENT_COLUMNS)).where(
+            RunEventRow.run_id == run_id
+        )
+    ):
+        merged[row.id] = {**row._mapping, "created_at": as_utc(row.created_at)}
+
+    return [merged[event_id] for event_id in sorted(merged)]
+
+
+def _to_record(row: Any) -> dict[str, Any]:
+    return {**row, "created_at": as_utc(row["created_at"]).isoformat()}
+
+
+def _from_record(record: dict[str, Any]) -> dict[str, Any]:
+    return {**record, "created_at": datetime.fromisoformat(record["created_at"])}
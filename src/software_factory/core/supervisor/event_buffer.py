@@ -0,0 +1,183 @@
+"""Buffered writer for the run_events ledger."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterable
+from datetime import datetime
+from pathlib import Path
+from typing import Any, TextIO
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session, SessionTransaction
+
+from software_factory.db.models import RunEventRow
+
+
+class RunEventBuffer:
+    """Hold selected run event types in memory and write them with multi-row INSERTs.
+
+    Events whose type is in ``buffered_types`` are queued in arrival order and
+    written when ``max_batch`` events are pending or ``flush_interval_seconds``
+    has passed since the last flush; every other type stays synchronous. A
+    synchronous event for a run that still has queued events drains the queue
+    into the same transaction first, so per-run order in ``run_events`` holds.
+
+    With ``wal_path`` set, queued events are also appended to a local JSON-lines
+    file that is replayed on construction, making buffered events survive a
+    crash with at-least-once delivery. Without it, events still queued when
+    the process dies are lost, so call :meth:`RunSupervisor.close` on shutdown.
+
+    The buffer does no I/O of its own: supervisors flush it when a call
+    crosses a threshold, and :meth:`RunSupervisor.start_event_flusher` adds
+    a timer so the time threshold holds while no calls arrive.
+    """
+
+    def __init__(
+        self,
+        buffered_types: Iterable[str] = (),
+        max_batch: int = 500,
+        flush_interval_seconds: float = 1.0,
+        wal_path: str | Path | None = None,
+    ):
+        self.buffered_types = frozenset(buffered_types)
+        self.max_batch = max_batch
+        self.flush_interval_seconds = flush_interval_seconds
+        self._lock = threading.Lock()
+        self._pending: list[dict[str, Any]] = []
+        self._pending_runs: Counter[str] = Counter()
+        self._in_flight: dict[int, list[dict[str, Any]]] = {}
+        self._last_flush = time.monotonic()
+        self._wal_path = Path(wal_path) if wal_path is not None else None
+        self._wal: TextIO | None = None
+        if self._wal_path is not None:
+            if self._wal_path.exists():
+                for line in self._wal_path.read_text().splitlines():
+                    self._queue(_from_wal(json.loads(line)))
+            self._wal = self._wal_path.open("a")
+
+    def is_buffered(self, event_type: str) -> bool:
+        """Return whether events of ``event_type`` go through the buffer."""
+
+        return event_type in self.buffered_types
+
+    def append(self, run_event: dict[str, Any]) -> None:
+        """Queue a ``run_events`` row given as a column mapping."""
+
+        with self._lock:
+            self._queue(run_event)
+            if self._wal is not None:
+                self._wal.write(json.dumps(_to_wal(run_event)) + "\n")
+                self._wal.flush()
+
+    def has_pending(self, run_ids: Iterable[str]) -> bool:
+        """Return whether any of ``run_ids`` has queued events."""
+
+        with self._lock:
+            return any(self._pending_runs[run_id] for run_id in run_ids)
+
+    def should_flush(self) -> bool:
+        """Return whether the size or time threshold has been reached."""
+
+        with self._lock:
+            if not self._pending:
+                return False
+            return (
+                len(self._pending) >= self.max_batch
+                or time.monotonic() - self._last_flush >= self.flush_interval_seconds
+            )
+
+    def seconds_until_flush(self) -> float:
+        """Return how long until the time threshold is reached.
+
+        With nothing queued this is the whole ``flush_interval_seconds``.
+        """
+
+        with self._lock:
+            if not self._pending:
+                return self.flush_interval_seconds
+            return max(0.0, self.flush_interval_seconds - (time.monotonic() - self._last_flush))
+
+    def drain_into(self, session: Session) -> int:
+        """Insert every queued event through ``session`` and return how many.
+
+        The events count as written once ``session`` commits; if its
+        transaction ends any other way (rollback, or close without commit)
+        they go back to the front of the queue.
+        """
+
+        with self._lock:
+            batch = self._pending
+            self._pending = []
+            self._pending_runs.clear()
+            self._last_flush = time.monotonic()
+            if not batch:
+                return 0
+            self._in_flight[id(batch)] = batch
+
+        settled = False
+
+        def settle(requeue: bool) -> None:
+            nonlocal settled
+            if not settled:
+                settled = True
+                self._settle(batch, requeue)
+
+        def transaction_ended(_: Session, transaction: SessionTransaction) -> None:
+            # after_commit fires first, so only an uncommitted end requeues.
+            if transaction.parent is None:
+                settle(requeue=True)
+
+        event.listen(session, "after_commit", lambda _: settle(requeue=False), once=True)
+        event.listen(session, "after_transaction_end", transaction_ended)
+        session.execute(insert(RunEventRow), batch)
+        return len(batch)
+
+    def close(self) -> None:
+        """Close the WAL file handle; queued events stay in the WAL for replay."""
+
+        with self._lock:
+            if self._wal is not None:
+                self._wal.close()
+                self._wal = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _queue(self, run_event: dict[str, Any]) -> None:
+        self._pending.append(run_event)
+        self._pending_runs[run_event["run_id"]] += 1
+
+    def _settle(self, batch: list[dict[str, Any]], requeue: bool) -> None:
+        with self._lock:
+            self._in_flight.pop(id(batch), None)
+            if requeue:
+                pending = self._pending
+                self._pending = []
+                self._pending_runs.clear()
+                for run_event in [*batch, *pending]:
+                    self._queue(run_event)
+            elif self._wal is not None and self._wal_path is not None:
+                self._rewrite_wal(self._wal_path)
+
+    def _rewrite_wal(self, path: Path) -> None:
+        retained = [*(e for batch in self._in_flight.values() for e in batch), *self._pending]
+        tmp = path.with_name(f"{path.name}.tmp")
+        tmp.write_text("".join(json.dumps(_to_wal(run_event)) + "\n" for run_event in retained))
+        if self._wal is not None:
+            self._wal.close()
+        os.replace(tmp, path)
+        self._wal = path.open("a")
+
+
+def _to_wal(run_event: dict[str, Any]) -> dict[str, Any]:
+    return {**run_event, "created_at": run_event["created_at"].isoformat()}
+
+
+def _from_wal(record: dict[str, Any]) -> dict[str, Any]:
+    return {**record, "created_at": datetime.fromisoformat(record["created_at"])}
@@ -0,0 +1,272 @@
+"""Redis-backed hot counters for run token and heartbeat accounting."""
+
+from __future__ import annotations
+
+from collections.abc import Awaitable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any, cast
+
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+
+from software_factory.core.models import Run
+
+# KEYS[1] run hash, KEYS[2] dirty set; ARGV run id, token delta, now (epoch seconds),
+# and "set" to make the delta the new total. Returns nil for an untracked run,
+# else {token_count, exceeded limit or ""}.
+_REPORT_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+  return nil
+end
+local tokens
+if ARGV[4] == 'set' then
+  redis.call('HSET', KEYS[1], 'tokens', ARGV[2])
+  tokens = tonumber(ARGV[2])
+else
+  tokens = redis.call('HINCRBY', KEYS[1], 'tokens', ARGV[2])
+end
+redis.call('HSET', KEYS[1], 'heartbeat_at', ARGV[3])
+redis.call('SADD', KEYS[2], ARGV[1])
+local budget = redis.call('HMGET', KEYS[1], 'max_tokens', 'deadline_at')
+if tonumber(ARGV[3]) > tonumber(budget[2]) then
+  return {tokens, 'max_minutes'}
+end
+if tokens > tonumber(budget[1]) then
+  return {tokens, 'max_tokens'}
+end
+return {tokens, ''}
+"""
+
+# KEYS[1] run hash; ARGV tokens, heartbeat_at, max_tokens, deadline_at, expire at.
+# Seeds the hash only if absent, so re-tracking never clobbers counted tokens.
+_TRACK_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+  return 0
+end
+redis.call('HSET', KEYS[1], 'tokens', ARGV[1], 'heartbeat_at', ARGV[2],
+           'max_tokens', ARGV[3], 'deadline_at', ARGV[4])
+redis.call('EXPIREAT', KEYS[1], ARGV[5])
+return 1
+"""
+
+# Seconds a run's counters outlive its deadline if it is never forgotten.
+_EXPIRY_GRACE_SECONDS = 3600
+
+
+@dataclass(frozen=True)
+class CounterReport:
+    """Running token total after a report and the limit it exceeded, if any."""
+
+    token_count: int
+    exceeded: str | None = None
+
+
+@dataclass(frozen=True)
+class RunUsage:
+    """Aggregated counters for one run, ready to be written to ``runs``."""
+
+    token_count: int
+    heartbeat_at: datetime
+
+
+class _CounterKeys:
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.dirty = f"{prefix}:dirty"
+
+    def run(self, run_id: str) -> str:
+        return f"{self.prefix}:run:{run_id}"
+
+    def track_args(self, run: Run) -> list[Any]:
+        deadline_at = run.started_at + timedelta(minutes=run.budget.max_minutes)
+        return [
+            run.token_count,
+            run.heartbeat_at.timestamp(),
+            run.budget.max_tokens,
+            deadline_at.timestamp(),
+            int(deadline_at.timestamp()) + _EXPIRY_GRACE_SECONDS,
+        ]
+
+    def report_args(
+        self, run_id: str, token_delta: int, now: datetime, token_count: int | None
+    ) -> list[Any]:
+        if token_count is not None:
+            return [run_id, token_count, now.timestamp(), "set"]
+        return [run_id, token_delta, now.timestamp(), ""]
+
+
+def _text(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+def _report(result: Any) -> CounterReport | None:
+    if result is None:
+        return None
+    tokens, exceeded = result
+    return CounterReport(token_count=int(tokens), exceeded=_text(exceeded) or None)
+
+
+def _usage(run_ids: list[str], values: list[Any]) -> dict[str, RunUsage]:
+    usage: dict[str, RunUsage] = {}
+    for run_id, (tokens, heartbeat_at) in zip(run_ids, values, strict=True):
+        if tokens is None or heartbeat_at is None:
+            continue
+        usage[run_id] = RunUsage(
+            token_count=int(tokens),
+            heartbeat_at=datetime.fromtimestamp(float(heartbeat_at), UTC),
+        )
+    return usage
+
+
+class RunCounters:
+    """Per-run token and heartbeat counters kept in Redis between DB flushes.
+
+    Each tracked run is a hash holding its running token total, last heartbeat
+    and budget. :meth:`report` applies ``HINCRBY`` and the heartbeat, marks the
+    run dirty and checks the budget in one Lua script, so a report is a single
+    round trip and concurrent reporters cannot race past a limit. Dirty runs are
+    written to ``runs`` by :meth:`RunSupervisor.flush_counters`.
+    """
+
+    def __init__(self, redis_client: Redis, prefix: str = "software_factory:counters"):
+        self.redis_client = redis_client
+        self.keys = _CounterKeys(prefix)
+        self._report_script = redis_client.register_script(_REPORT_SCRIPT)
+        self._track_script = redis_client.register_script(_TRACK_SCRIPT)
+
+    def track(self, runs: list[Run]) -> None:
+        """Start counting for runs, seeded with their budget and current usage.
+
+        Runs that are already tracked keep their counters, so a re-seed racing
+        a report never loses the reported tokens.
+        """
+
+        pipe = self.redis_client.pipeline()
+        for run in runs:
+            self._track_script(
+                keys=[self.keys.run(run.run_id)], args=self.keys.track_args(run), client=pipe
+            )
+        pipe.execute()
+
+    def report(
+        self,
+        run_id: str,
+        token_delta: int = 0,
+        now: datetime | None = None,
+        token_count: int | None = None,
+    ) -> CounterReport | None:
+        """Add ``token_delta`` and a heartbeat; None if the run is not tracked.
+
+        With ``token_count`` the run's total is set to it instead.
+        """
+
+        now = now or datetime.now(UTC)
+        return _report(
+            self._report_script(
+                keys=[self.keys.run(run_id), self.keys.dirty],
+                args=self.keys.report_args(run_id, token_delta, now, token_count),
+            )
+        )
+
+    def usage(self, run_ids: list[str]) -> dict[str, RunUsage]:
+        """Read the counters of ``run_ids`` without clearing their dirty mark."""
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        for run_id in run_ids:
+            pipe.hmget(self.keys.run(run_id), ["tokens", "heartbeat_at"])
+        return _usage(run_ids, pipe.execute())
+
+    def collect(self) -> dict[str, RunUsage]:
+        """Take the dirty set and return the counters of every run in it."""
+
+        pipe = self.redis_client.pipeline()
+        pipe.smembers(self.keys.dirty)
+        pipe.delete(self.keys.dirty)
+        members, _ = pipe.execute()
+        return self.usage(sorted(_text(member) for member in members))
+
+    def mark_dirty(self, run_ids: list[str]) -> None:
+        """Put runs back in the dirty set, e.g. after a failed flush."""
+
+        if run_ids:
+            self.redis_client.sadd(self.keys.dirty, *run_ids)
+
+    def forget(self, run_ids: list[str]) -> None:
+        """Drop the counters of runs that reached a terminal state."""
+
+        if run_ids:
+            pipe = self.redis_client.pipeline()
+            pipe.delete(*(self.keys.run(run_id) for run_id in run_ids))
+            pipe.srem(self.keys.dirty, *run_ids)
+            pipe.execute()
+
+
+class AsyncRunCounters:
+    """Asyncio counterpart of :class:`RunCounters` over ``redis.asyncio``."""
+
+    def __init__(self, redis_client: AsyncRedis, prefix: str = "software_factory:counters"):
+        self.redis_client = redis_client
+        self.keys = _CounterKeys(prefix)
+        self._report_script = redis_client.register_script(_REPORT_SCRIPT)
+        self._track_script = redis_client.register_script(_TRACK_SCRIPT)
+
+    async def track(self, runs: list[Run]) -> None:
+        """Start counting for runs not yet tracked, seeded with their budget and usage."""
+
+        async with self.redis_client.pipeline() as pipe:
+            for run in runs:
+                await self._track_script(
+                    keys=[self.keys.run(run.run_id)], args=self.keys.track_args(run), client=pipe
+                )
+            await pipe.execute()
+
+    async def report(
+        self,
+        run_id: str,
+        token_delta: int = 0,
+        now: datetime | None = None,
+        token_count: int | None = None,
+    ) -> CounterReport | None:
+        """Add ``token_delta`` (or set ``token_count``) and a heartbeat; None if untracked."""
+
+        now = now or datetime.now(UTC)
+        return _report(
+            await self._report_script(
+                keys=[self.keys.run(run_id), self.keys.dirty],
+                args=self.keys.report_args(run_id, token_delta, now, token_count),
+            )
+        )
+
+    async def usage(self, run_ids: list[str]) -> dict[str, RunUsage]:
+        """Read the counters of ``run_ids`` without clearing their dirty mark."""
+
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for run_id in run_ids:
+                pipe.hmget(self.keys.run(run_id), ["tokens", "heartbeat_at"])
+            values = await pipe.execute()
+        return _usage(run_ids, values)
+
+    async def collect(self) -> dict[str, RunUsage]:
+        """Take the dirty set and return the counters of every run in it."""
+
+        async with self.redis_client.pipeline() as pipe:
+            pipe.smembers(self.keys.dirty)
+            pipe.delete(self.keys.dirty)
+            members, _ = await pipe.execute()
+        return await self.usage(sorted(_text(member) for member in members))
+
+    async def mark_dirty(self, run_ids: list[str]) -> None:
+        """Put runs back in the dirty set, e.g. after a failed flush."""
+
+        if run_ids:
+            await cast(Awaitable[int], self.redis_client.sadd(self.keys.dirty, *run_ids))
+
+    async def forget(self, run_ids: list[str]) -> None:
+        """Drop the counters of runs that reached a terminal state."""
+
+        if run_ids:
+            async with self.redis_client.pipeline() as pipe:
+                pipe.delete(*(self.keys.run(run_id) for run_id in run_ids))
+                pipe.srem(self.keys.dirty, *run_ids)
+                await pipe.execute()
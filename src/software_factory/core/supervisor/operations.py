@@ -0,0 +1,610 @@
+"""Session-level run supervisor operations shared by the sync and async supervisors.
+
+Functions here work on a caller-owned :class:`~sqlalchemy.orm.Session` and never
+commit, so a terminal transition can share one transaction with the backlog's
+lease release.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import case, func, insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from software_factory.core.models import Lease, Run, RunBudget, RunState, TicketStatus
+from software_factory.core.supervisor.event_buffer import RunEventBuffer
+from software_factory.core.supervisor.hot_counters import RunUsage
+from software_factory.core.supervisor.run_cache import CachedRun
+from software_factory.db.models import RunEventRow, RunRow, TicketRow
+
+TERMINAL_STATES: set[RunState] = {
+    RunState.SUCCEEDED,
+    RunState.FAILED,
+    RunState.TIMED_OUT,
+    RunState.CANCELED,
+}
+
+ALLOWED_TRANSITIONS: dict[RunState, set[RunState]] = {
+    RunState.CLAIMED: {RunState.RUNNING, RunState.CANCELED, RunState.TIMED_OUT, RunState.FAILED},
+    RunState.RUNNING: {
+        RunState.BLOCKED,
+        RunState.SUCCEEDED,
+        RunState.FAILED,
+        RunState.TIMED_OUT,
+        RunState.CANCELED,
+        RunState.AWAITING_APPROVAL,
+    },
+    RunState.BLOCKED: {RunState.RUNNING, RunState.CANCELED, RunState.TIMED_OUT, RunState.FAILED},
+    RunState.AWAITING_APPROVAL: {RunState.RUNNING, RunState.CANCELED, RunState.TIMED_OUT},
+    RunState.SUCCEEDED: set(),
+    RunState.FAILED: set(),
+    RunState.TIMED_OUT: set(),
+    RunState.CANCELED: set(),
+}
+
+# Precomputed inverse of ALLOWED_TRANSITIONS: the states a run may be in to move to each state.
+SOURCE_STATES: dict[RunState, list[RunState]] = {
+    target: [source for source, targets in ALLOWED_TRANSITIONS.items() if target in targets]
+    for target in RunState
+}
+
+ACTIVE_STATES: list[RunState] = [RunState.CLAIMED, RunState.RUNNING, RunState.BLOCKED]
+
+TIMEOUT_STATES: list[RunState] = SOURCE_STATES[RunState.TIMED_OUT]
+
+TERMINAL_TICKET_STATUS: dict[RunState, TicketStatus] = {
+    RunState.SUCCEEDED: TicketStatus.COMPLETED,
+    RunState.FAILED: TicketStatus.FAILED,
+    RunState.TIMED_OUT: TicketStatus.FAILED,
+    RunState.CANCELED: TicketStatus.FAILED,
+}
+
+
+def start_runs(leases: list[Lease], harnesses: Mapping[str, str], budget: RunBudget) -> list[Run]:
+    """Build the CLAIMED runs for freshly won ``leases``, one per ticket."""
+
+    now = datetime.now(UTC)
+    return [
+        Run(
+            ticket_id=lease.ticket_id,
+            harness=harnesses[lease.ticket_id],
+            state=RunState.CLAIMED,
+            lease_token=lease.token,
+            budget=budget,
+            started_at=now,
+            heartbeat_at=now,
+        )
+        for lease in leases
+    ]
+
+
+def record_dispatches(
+    session: Session, runs: list[Run], owner: str, events: RunEventBuffer | None = None
+) -> None:
+    """Stage :func:`record_dispatch` for every run."""
+
+    for run in runs:
+        record_dispatch(session, run, owner, events)
+
+
+def record_dispatch(
+    session: Session, run: Run, owner: str, events: RunEventBuffer | None = None
+) -> None:
+    """Stage a new run row and its ``run_claimed`` event."""
+
+    session.add(
+        RunRow(
+            id=run.run_id,
+            ticket_id=run.ticket_id,
+            harness=run.harness,
+            state=run.state,
+            lease_token=run.lease_token,
+            max_minutes=run.budget.max_minutes,
+            max_tokens=run.budget.max_tokens,
+            token_count=0,
+            started_at=run.started_at,
+            deadline_at=run.started_at + timedelta(minutes=run.budget.max_minutes),
+            heartbeat_at=run.heartbeat_at,
+        )
+    )
+    add_event(
+        session,
+        run.run_id,
+        run.ticket_id,
+        "run_claimed",
+        {"owner": owner, "harness": run.harness},
+        events,
+    )
+
+
+def active_run_counts(session: Session) -> tuple[dict[str, int], dict[str, int]]:
+    """Return active run counts grouped by harness and by ticket repo."""
+
+    active = RunRow.state.in_(ACTIVE_STATES)
+    by_harness = {
+        harness: count
+        for harness, count in session.execute(
+            select(RunRow.harness, func.count()).where(active).group_by(RunRow.harness)
+        )
+    }
+    by_repo = {
+        repo: count
+        for repo, count in session.execute(
+            select(TicketRow.repo, func.count())
+            .join(RunRow, RunRow.ticket_id == TicketRow.id)
+            .where(active)
+            .group_by(TicketRow.repo)
+        )
+    }
+    return by_harness, by_repo
+
+
+def transition_run(
+    session: Session,
+    run_id: str,
+    new_state: RunState,
+    token_delta: int = 0,
+    payload: dict[str, Any] | None = None,
+    events: RunEventBuffer | None = None,
+    expected_version: int | None = None,
+    known: CachedRun | None = None,
+) -> RunRow | None:
+    """Apply a validated state transition and stage its ``state_transition`` event.
+
+    The current ``(state, version)`` is read without locking and the change is
+    a conditional ``UPDATE ... WHERE id AND state AND version`` that also
+    checks ``state`` against :data:`SOURCE_STATES`, so validation happens in
+    SQL and a concurrent transition makes this one match no row. Returns None
+    when the run is missing, the transition is not allowed, ``expected_version``
+    is stale or another writer won the race.
+
+    With ``known`` (a cached copy of the run) the UPDATE is tried with its
+    state and version first, skipping the read; if it matches no row the
+    entry was stale and the run is read as usual.
+    """
+
+    if known is not None and expected_version in (None, known.version):
+        run_row = _update_state(session, run_id, known.state, known.version, new_state, token_delta)
+        if run_row is not None:
+            _stage_transition(session, run_row, known.state, new_state, token_delta, payload, events)
+            return run_row
+
+    current = session.execute(
+        select(RunRow.state, RunRow.version).where(RunRow.id == run_id)
+    ).one_or_none()
+    if current is None:
+        return None
+    if expected_version is not None and current.version != expected_version:
+        return None
+
+    run_row = _update_state(session, run_id, current.state, current.version, new_state, token_delta)
+    if run_row is None:
+        return None
+    _stage_transition(session, run_row, current.state, new_state, token_delta, payload, events)
+    return run_row
+
+
+def apply_transition(
+    session: Session,
+    run_id: str,
+    new_state: RunState,
+    token_delta: int = 0,
+    payload: dict[str, Any] | None = None,
+    events: RunEventBuffer | None = None,
+    expected_version: int | None = None,
+    known: CachedRun | None = None,
+    usage: Mapping[str, RunUsage] | None = None,
+) -> RunRow | None:
+    """Write ``usage`` from the hot counters, then :func:`transition_run`.
+
+    The caller releases the ticket (see :data:`TERMINAL_TICKET_STATUS`) in
+    the same session before committing.
+    """
+
+    apply_run_usage(session, usage or {}, events)
+    return transition_run(
+        session, run_id, new_state, token_delta, payload, events, expected_version, known
+    )
+
+
+def check_budget(
+    session: Session,
+    run_id: str,
+    token_count: int | None = None,
+    events: RunEventBuffer | None = None,
+    known: CachedRun | None = None,
+) -> tuple[RunRow | None, str | None]:
+    """Record a budget report and return the run with the exceeded limit, if any.
+
+    With ``known`` the budget is checked against the cached copy and the
+    report is one version-guarded UPDATE ... RETURNING; a stale entry falls
+    back to reading the run.
+    """
+
+    now = datetime.now(UTC)
+    if known is not None:
+        reason = _exceeded_limit(now, known.deadline_at, known.max_tokens, token_count)
+        if reason is not None or token_count is not None:
+            values: dict[str, Any] = (
+                {"error_message": f"Budget exceeded: {reason}"}
+                if reason is not None
+                else {"token_count": token_count, "heartbeat_at": now}
+            )
+            cached_row = session.execute(
+                update(RunRow)
+                .where(RunRow.id == run_id, RunRow.version == known.version)
+                .values(**values)
+                .returning(RunRow)
+            ).scalar_one_or_none()
+            if cached_row is not None:
+                if reason is None:
+                    _stage_budget_check(session, cached_row, token_count, events)
+                return cached_row, reason
+
+    run_row = session.execute(select(RunRow).where(RunRow.id == run_id)).scalar_one_or_none()
+    if run_row is None:
+        return None, None
+
+    reason = _exceeded_limit(now, run_row.deadline_at, run_row.max_tokens, token_count)
+    if reason is not None:
+        run_row.error_message = f"Budget exceeded: {reason}"
+        return run_row, reason
+
+    if token_count is not None:
+        run_row.token_count = token_count
+        run_row.heartbeat_at = now
+        _stage_budget_check(session, run_row, token_count, events)
+    return run_row, None
+
+
+def time_out_stale_runs(
+    session: Session,
+    cutoff: datetime,
+    batch_size: int,
+    events: RunEventBuffer | None = None,
+) -> list[tuple[str, str, str]]:
+    """Time out one batch of active runs whose heartbeat is older than ``cutoff``.
+
+    Candidates come off ``ix_runs_heartbeat`` oldest first and are locked with
+    ``FOR UPDATE SKIP LOCKED``, so manager replicas recovering at the same time
+    take disjoint batches. A single UPDATE ... RETURNING, guarded on the state
+    each run was read in, moves them to TIMED_OUT and one executemany INSERT
+    stages their ``state_transition`` events. Returns ``(run_id, ticket_id,
+    lease_token)`` for every run timed out.
+    """
+
+    candidates = session.execute(
+        select(RunRow.id, RunRow.state)
+        .where(RunRow.heartbeat_at < cutoff, RunRow.state.in_(ACTIVE_STATES))
+        .order_by(RunRow.heartbeat_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+    return _time_out_runs(
+        session,
+        {row.id: row.state for row in candidates},
+        {row.id: {"reason": "stale_heartbeat"} for row in candidates},
+        events=events,
+    )
+
+
+def enforce_budgets(
+    session: Session,
+    token_counts: Mapping[str, int],
+    events: RunEventBuffer | None = None,
+) -> list[tuple[str, str, str]]:
+    """Time out every run over its runtime or token budget with a fixed number of queries.
+
+    Runtime overruns come from one range scan on ``ix_runs_state_deadline``;
+    token overruns from one query comparing the reported ``token_counts``
+    against ``max_tokens`` in SQL. Both sets are timed out together (see
+    :func:`time_out_stale_runs`), and the reports for runs within budget are
+    recorded with one UPDATE. Returns ``(run_id, ticket_id, lease_token)`` for
+    every run timed out.
+    """
+
+    now = datetime.now(UTC)
+    previous: dict[str, RunState] = {}
+    payloads: dict[str, dict[str, Any]] = {}
+    for row in session.execute(
+        select(RunRow.id, RunRow.state)
+        .where(RunRow.state.in_(TIMEOUT_STATES), RunRow.deadline_at < now)
+        .with_for_update(skip_locked=True)
+    ):
+        previous[row.id] = row.state
+        payloads[row.id] = {"reason": "max_minutes", "token_count": token_counts.get(row.id)}
+
+    if token_counts:
+        reported = case(dict(token_counts), value=RunRow.id)
+        for row in session.execute(
+            select(RunRow.id, RunRow.state)
+            .where(
+                RunRow.id.in_(list(token_counts)),
+                RunRow.state.in_(TIMEOUT_STATES),
+                reported > RunRow.max_tokens,
+            )
+            .with_for_update(skip_locked=True)
+        ):
+            previous[row.id] = row.state
+            payloads.setdefault(row.id, {"reason": "max_tokens", "token_count": token_counts[row.id]})
+
+    timed_out = _time_out_runs(
+        session,
+        previous,
+        payloads,
+        {run_id: f"Budget exceeded: {payload['reason']}" for run_id, payload in payloads.items()},
+        events,
+    )
+
+    within_budget = {
+        run_id: count for run_id, count in token_counts.items() if run_id not in payloads
+    }
+    if within_budget:
+        recorded = session.execute(
+            update(RunRow)
+            .where(RunRow.id.in_(list(within_budget)), RunRow.state.in_(TIMEOUT_STATES))
+            .values(token_count=case(within_budget, value=RunRow.id), heartbeat_at=now)
+            .returning(RunRow.id, RunRow.ticket_id)
+        ).all()
+        for run_id, ticket_id in recorded:
+            add_event(
+                session,
+                run_id,
+                ticket_id,
+                "budget_check",
+                {"token_count": within_budget[run_id]},
+                events,
+            )
+    return timed_out
+
+
+def sweep_budgets(
+    session: Session,
+    usage: Mapping[str, RunUsage],
+    token_counts: Mapping[str, int],
+    events: RunEventBuffer | None = None,
+) -> list[tuple[str, str, str]]:
+    """Write ``usage`` from the hot counters, then :func:`enforce_budgets`."""
+
+    apply_run_usage(session, usage, events)
+    return enforce_budgets(session, token_counts, events)
+
+
+def active_run(session: Session, run_id: str) -> Run | None:
+    """Return the run if it can still time out, e.g. to re-seed its hot counters."""
+
+    run_row = session.get(RunRow, run_id)
+    if run_row is None or run_row.state not in TIMEOUT_STATES:
+        return None
+    return to_run(run_row)
+
+
+def apply_run_usage(
+    session: Session,
+    usage: Mapping[str, RunUsage],
+    events: RunEventBuffer | None = None,
+) -> list[str]:
+    """Write aggregated hot-counter values to ``runs`` with one UPDATE.
+
+    Only runs that are still active are updated, and each gets one
+    ``budget_check`` event carrying its flushed total. Returns the ids written.
+    """
+
+    if not usage:
+        return []
+
+    recorded = session.execute(
+        update(RunRow)
+        .where(RunRow.id.in_(list(usage)), RunRow.state.in_(TIMEOUT_STATES))
+        .values(
+            token_count=case(
+                {run_id: item.token_count for run_id, item in usage.items()}, value=RunRow.id
+            ),
+            heartbeat_at=case(
+                {run_id: item.heartbeat_at for run_id, item in usage.items()}, value=RunRow.id
+            ),
+        )
+        .returning(RunRow.id, RunRow.ticket_id)
+    ).all()
+    for run_id, ticket_id in recorded:
+        add_event(
+            session,
+            run_id,
+            ticket_id,
+            "budget_check",
+            {"token_count": usage[run_id].token_count},
+            events,
+        )
+    return [run_id for run_id, _ in recorded]
+
+
+def add_event(
+    session: Session,
+    run_id: str,
+    ticket_id: str,
+    event_type: str,
+    payload: dict[str, Any],
+    events: RunEventBuffer | None = None,
+) -> None:
+    """Stage a run event, or queue it on ``events`` when its type is buffered.
+
+    A synchronous event for a run with queued events drains the buffer into
+    ``session`` first so the ledger keeps per-run order.
+    """
+
+    run_event = {
+        "run_id": run_id,
+        "ticket_id": ticket_id,
+        "event_type": event_type,
+        "payload": payload,
+        "created_at": datetime.now(UTC),
+    }
+    if events is not None:
+        if events.is_buffered(event_type):
+            events.append(run_event)
+            return
+        if events.has_pending([run_id]):
+            events.drain_into(session)
+    session.add(RunEventRow(**run_event))
+
+
+def _time_out_runs(
+    session: Session,
+    previous: dict[str, RunState],
+    payloads: dict[str, dict[str, Any]],
+    error_messages: dict[str, str] | None = None,
+    events: RunEventBuffer | None = None,
+) -> list[tuple[str, str, str]]:
+    """Move runs to TIMED_OUT with one UPDATE ... RETURNING and one event INSERT.
+
+    The UPDATE is guarded on the state each run was read in, so a run that
+    moved on concurrently is left alone.
+    """
+
+    if not previous:
+        return []
+
+    now = datetime.now(UTC)
+    values: dict[str, Any] = {
+        "state": RunState.TIMED_OUT,
+        "version": RunRow.version + 1,
+        "heartbeat_at": now,
+        "ended_at": now,
+    }
+    if error_messages:
+        values["error_message"] = case(error_messages, value=RunRow.id)
+    timed_out = session.execute(
+        update(RunRow)
+        .where(tuple_(RunRow.id, RunRow.state).in_(list(previous.items())))
+        .values(**values)
+        .returning(RunRow.id, RunRow.ticket_id, RunRow.lease_token)
+    ).all()
+    if not timed_out:
+        return []
+
+    if events is not None and events.has_pending(row.id for row in timed_out):
+        events.drain_into(session)
+    session.execute(
+        insert(RunEventRow),
+        [
+            {
+                "run_id": row.id,
+                "ticket_id": row.ticket_id,
+                "event_type": "state_transition",
+                "payload": {
+                    "from": previous[row.id].value,
+                    "to": RunState.TIMED_OUT.value,
+                    **payloads[row.id],
+                },
+                "created_at": now,
+            }
+            for row in timed_out
+        ],
+    )
+    return [(row.id, row.ticket_id, row.lease_token) for row in timed_out]
+
+
+def _update_state(
+    session: Session,
+    run_id: str,
+    state: RunState,
+    version: int,
+    new_state: RunState,
+    token_delta: int,
+) -> RunRow | None:
+    now = datetime.now(UTC)
+    values: dict[str, Any] = {
+        "state": new_state,
+        "version": RunRow.version + 1,
+        "token_count": RunRow.token_count + token_delta,
+        "heartbeat_at": now,
+    }
+    if new_state in TERMINAL_STATES:
+        values["ended_at"] = now
+    return session.execute(
+        update(RunRow)
+        .where(
+            RunRow.id == run_id,
+            RunRow.state == state,
+            RunRow.version == version,
+            RunRow.state.in_(SOURCE_STATES[new_state]),
+        )
+        .values(**values)
+        .returning(RunRow)
+    ).scalar_one_or_none()
+
+
+def _stage_transition(
+    session: Session,
+    run_row: RunRow,
+    previous: RunState,
+    new_state: RunState,
+    token_delta: int,
+    payload: dict[str, Any] | None,
+    events: RunEventBuffer | None,
+) -> None:
+    add_event(
+        session,
+        run_row.id,
+        run_row.ticket_id,
+        "state_transition",
+        {
+            "from": previous.value,
+            "to": new_state.value,
+            **({"token_delta": token_delta} if token_delta else {}),
+            **(payload or {}),
+        },
+        events,
+    )
+
+
+def _exceeded_limit(
+    now: datetime, deadline_at: datetime, max_tokens: int, token_count: int | None
+) -> str | None:
+    if now > as_utc(deadline_at):
+        return "max_minutes"
+    if token_count is not None and token_count > max_tokens:
+        return "max_tokens"
+    return None
+
+
+def _stage_budget_check(
+    session: Session, run_row: RunRow, token_count: int | None, events: RunEventBuffer | None
+) -> None:
+    add_event(
+        session,
+        run_row.id,
+        run_row.ticket_id,
+        "budget_check",
+        {"token_count": token_count},
+        events,
+    )
+
+
+def as_utc(value: datetime) -> datetime:
+    """Treat naive timestamps (as returned by SQLite) as UTC."""
+
+    return value if value.tzinfo is not None else value.replace(tzinfo=UTC)
+
+
+def to_run(row: RunRow) -> Run:
+    """Convert a persisted run row to the domain model."""
+
+    return Run(
+        run_id=row.id,
+        ticket_id=row.ticket_id,
+        harness=row.harness,
+        state=row.state,
+        version=row.version,
+        sandbox_id=row.sandbox_id,
+        lease_token=row.lease_token,
+        budget=RunBudget(max_minutes=row.max_minutes, max_tokens=row.max_tokens),
+        token_count=row.token_count,
+        started_at=row.started_at,
+        heartbeat_at=row.heartbeat_at,
+        ended_at=row.ended_at,
+        error_message=row.error_message,
+    )
@@ -0,0 +1,257 @@
+"""Run state projection folded from the run_events ledger."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from pydantic import BaseModel
+from sqlalchemy import case, literal, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from software_factory.core.models import RunState
+from software_factory.core.supervisor.event_archive import SegmentStore, read_run_events
+from software_factory.core.supervisor.operations import TERMINAL_STATES, as_utc
+from software_factory.db.models import ProjectionCheckpointRow, RunEventRow, RunRow, RunSnapshotRow
+
+_EVENT_COLUMNS = (
+    RunEventRow.id,
+    RunEventRow.run_id,
+    RunEventRow.ticket_id,
+    RunEventRow.event_type,
+    RunEventRow.payload,
+    RunEventRow.created_at,
+)
+
+
+class RunProjection(BaseModel):
+    """Run state as recorded by its events up to ``last_event_id``."""
+
+    run_id: str
+    ticket_id: str
+    state: RunState = RunState.CLAIMED
+    version: int = 1
+    harness: str | None = None
+    owner: str | None = None
+    token_count: int = 0
+    claimed_at: datetime | None = None
+    heartbeat_at: datetime | None = None
+    ended_at: datetime | None = None
+    last_event_id: int = 0
+
+
+def apply_event(projection: RunProjection | None, event: Mapping[str, Any]) -> RunProjection:
+    """Fold one ``run_events`` row, given as a column mapping, into ``projection``.
+
+    Events at or below ``last_event_id`` are ignored, so replaying an
+    overlapping range is harmless. Unknown event types only advance the
+    high-water mark.
+    """
+
+    if projection is None:
+        projection = RunProjection(run_id=event["run_id"], ticket_id=event["ticket_id"])
+    if event["id"] <= projection.last_event_id:
+        return projection
+
+    payload = event["payload"] or {}
+    at = as_utc(event["created_at"])
+    changes: dict[str, Any] = {"last_event_id": event["id"]}
+    match event["event_type"]:
+        case "run_claimed":
+            changes.update(
+                state=RunState.CLAIMED,
+                harness=payload.get("harness"),
+                owner=payload.get("owner"),
+                claimed_at=at,
+                heartbeat_at=at,
+            )
+        case "state_transition":
+            state = RunState(payload["to"])
+            changes.update(
+                state=state,
+                version=projection.version + 1,
+                token_count=projection.token_count + payload.get("token_delta", 0),
+                heartbeat_at=at,
+            )
+            if state in TERMINAL_STATES:
+                changes["ended_at"] = at
+        case "budget_check":
+            changes.update(token_count=payload["token_count"], heartbeat_at=at)
+    return projection.model_copy(update=changes)
+
+
+def fold_events(
+    events: Iterable[Mapping[str, Any]], projection: RunProjection | None = None
+) -> RunProjection | None:
+    """Fold events of one run, in ledger order, onto ``projection``."""
+
+    for event in events:
+        projection = apply_event(projection, event)
+    return projection
+
+
+class RunProjector:
+    """Maintain run projections as snapshots with incremental catch-up.
+
+    :meth:`catch_up` consumes ``run_events`` past the checkpoint in id order
+    and saves the updated projection of every run it touched as that run's
+    snapshot, advancing the checkpoint in the same transaction. :meth:`project`
+    starts from a run's latest snapshot and replays only the newer events.
+
+    Ids are assigned before commit, so a writer can commit an id lower than
+    one already visible; events younger than ``settle_seconds`` are left for
+    the next pass so those late commits are not skipped.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker[Session],
+        store: SegmentStore | None = None,
+        name: str = "runs",
+        settle_seconds: float = 5.0,
+    ):
+        self.session_factory = session_factory
+        self.store = store
+        self.name = name
+        self.settle_seconds = settle_seconds
+
+    def catch_up(self, batch_size: int = 1000, now: datetime | None = None) -> int:
+        """Consume events past the high-water mark; returns how many were folded."""
+
+        settled = (now or datetime.now(UTC)) - timedelta(seconds=self.settle_seconds)
+        consumed = 0
+        while True:
+            with self.session_factory() as session:
+                checkpoint = session.get(ProjectionCheckpointRow, self.name)
+                high_water = checkpoint.last_event_id if checkpoint is not None else 0
+                events = [
+                    dict(row._mapping)
+                    for row in session.execute(
+                        select(*_EVENT_COLUMNS)
+                        .where(RunEventRow.id > high_water, RunEventRow.created_at < settled)
+                        .order_by(RunEventRow.id)
+                        .limit(batch_size)
+                    )
+                ]
+                if not events:
+                    return consumed
+
+                snapshots = {
+                    row.run_id: row
+                    for row in session.execute(
+                        select(RunSnapshotRow).where(
+                            RunSnapshotRow.run_id.in_({event["run_id"] for event in events})
+                        )
+                    ).scalars()
+                }
+                projections = {
+                    run_id: RunProjection.model_validate(row.data)
+                    for run_id, row in snapshots.items()
+                }
+                for event in events:
+                    projections[event["run_id"]] = apply_event(
+                        projections.get(event["run_id"]), event
+                    )
+                for run_id, projection in projections.items():
+                    _save_snapshot(session, snapshots.get(run_id), projection)
+
+                if checkpoint is None:
+                    checkpoint = ProjectionCheckpointRow(name=self.name, last_event_id=0)
+                    session.add(checkpoint)
+                checkpoint.last_event_id = events[-1]["id"]
+                session.commit()
+            consumed += len(events)
+            if len(events) < batch_size:
+                return consumed
+
+    def project(self, run_id: str) -> RunProjection | None:
+        """Return a run's current projection from its snapshot plus newer events.
+
+        With a segment store, archived events are included, so runs whose
+        ledger was compacted can still be projected.
+        """
+
+        with self.session_factory() as session:
+            snapshot = session.get(RunSnapshotRow, run_id)
+            projection = (
+                RunProjection.model_validate(snapshot.data) if snapshot is not None else None
+            )
+            after = projection.last_event_id if projection is not None else 0
+            events: list[Mapping[str, Any]]
+            if self.store is not None:
+                events = [
+                    event
+                    for event in read_run_events(session, self.store, run_id)
+                    if event["id"] > after
+                ]
+            else:
+                events = [
+                    dict(row._mapping)
+                    for row in session.execute(
+                        select(*_EVENT_COLUMNS)
+                        .where(RunEventRow.run_id == run_id, RunEventRow.id > after)
+                        .order_by(RunEventRow.id)
+                    )
+                ]
+            return fold_events(events, projection)
+
+    def restore_runs(self, run_ids: list[str]) -> int:
+        """Overwrite ``runs`` state columns from projections, for disaster recovery.
+
+        Returns the number of runs written.
+        """
+
+        projections = [
+            projection
+            for projection in (self.project(run_id) for run_id in run_ids)
+            if projection is not None
+        ]
+        if not projections:
+            return 0
+
+        with self.session_factory() as session:
+            by_id = {projection.run_id: projection for projection in projections}
+            restored = session.execute(
+                update(RunRow)
+                .where(RunRow.id.in_(list(by_id)))
+                .values(
+                    state=case(
+                        {
+                            run_id: literal(p.state, RunRow.state.type)
+                            for run_id, p in by_id.items()
+                        },
+                        value=RunRow.id,
+                    ),
+                    version=case({run_id: p.version for run_id, p in by_id.items()}, value=RunRow.id),
+                    token_count=case(
+                        {run_id: p.token_count for run_id, p in by_id.items()}, value=RunRow.id
+                    ),
+                    heartbeat_at=case(
+                        {run_id: p.heartbeat_at for run_id, p in by_id.items()},
+                        value=RunRow.id,
+                        else_=RunRow.heartbeat_at,
+                    ),
+                    ended_at=case(
+                        {run_id: p.ended_at for run_id, p in by_id.items()}, value=RunRow.id
+                    ),
+                )
+                .returning(RunRow.id)
+            ).all()
+            session.commit()
+        return len(restored)
+
+
+def _save_snapshot(
+    session: Session, snapshot: RunSnapshotRow | None, projection: RunProjection
+) -> None:
+    data = projection.model_dump(mode="json")
+    if snapshot is None:
+        session.add(
+            RunSnapshotRow(
+                run_id=projection.run_id, last_event_id=projection.last_event_id, data=data
+            )
+        )
+    else:
+        snapshot.last_event_id = projection.last_event_id
+        snapshot.data = data
@@ -0,0 +1,91 @@
+"""In-process write-through cache of active runs."""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from software_factory.core.models import Run, RunState
+from software_factory.db.models import RunRow
+
+
+@dataclass(frozen=True)
+class CachedRun:
+    """The fields of an active run that transitions and budget checks need."""
+
+    run_id: str
+    ticket_id: str
+    state: RunState
+    version: int
+    lease_token: str
+    max_tokens: int
+    deadline_at: datetime
+
+    @classmethod
+    def from_run(cls, run: Run) -> CachedRun:
+        return cls(
+            run_id=run.run_id,
+            ticket_id=run.ticket_id,
+            state=run.state,
+            version=run.version,
+            lease_token=run.lease_token,
+            max_tokens=run.budget.max_tokens,
+            deadline_at=run.started_at + timedelta(minutes=run.budget.max_minutes),
+        )
+
+    @classmethod
+    def from_row(cls, row: RunRow) -> CachedRun:
+        return cls(
+            run_id=row.id,
+            ticket_id=row.ticket_id,
+            state=row.state,
+            version=row.version,
+            lease_token=row.lease_token,
+            max_tokens=row.max_tokens,
+            deadline_at=row.deadline_at,
+        )
+
+
+class ActiveRunCache:
+    """LRU of active runs, bounded to ``max_size`` entries.
+
+    Entries are never trusted on their own: every write that uses one is
+    guarded on its ``version``, so a run changed by another replica makes the
+    write match no row, and the caller evicts the entry and re-reads.
+    """
+
+    def __init__(self, max_size: int = 10_000):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._runs: OrderedDict[str, CachedRun] = OrderedDict()
+
+    def get(self, run_id: str) -> CachedRun | None:
+        """Return the cached run and mark it most recently used."""
+
+        with self._lock:
+            cached = self._runs.get(run_id)
+            if cached is not None:
+                self._runs.move_to_end(run_id)
+            return cached
+
+    def put(self, cached: CachedRun) -> None:
+        """Cache a run, evicting the least recently used entry when full."""
+
+        with self._lock:
+            self._runs[cached.run_id] = cached
+            self._runs.move_to_end(cached.run_id)
+            while len(self._runs) > self.max_size:
+                self._runs.popitem(last=False)
+
+    def evict(self, run_ids: list[str]) -> None:
+        """Drop runs, e.g. after a terminal transition or a stale write."""
+
+        with self._lock:
+            for run_id in run_ids:
+                self._runs.pop(run_id, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._runs)
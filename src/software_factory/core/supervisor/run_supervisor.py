@@ -2,45 +2,28 @@
 
 from __future__ import annotations
 
-from datetime import UTC, datetime, timedelta
+import logging
+import threading
+from collections.abc import Mapping
 from typing import Any
-from uuid import uuid4
 
-from sqlalchemy import select
 from sqlalchemy.orm import Session, sessionmaker
 
-from software_factory.config import get_settings
 from software_factory.core.backlog.interface import BacklogInterface
 from software_factory.core.models import Run, RunBudget, RunState, TicketStatus
-from software_factory.db.models import RunEventRow, RunRow, TicketRow
-
-TERMINAL_STATES: set[RunState] = {
-    RunState.SUCCEEDED,
-    RunState.FAILED,
-    RunState.TIMED_OUT,
-    RunState.CANCELED,
-}
-
-ALLOWED_TRANSITIONS: dict[RunState, set[RunState]] = {
-    RunState.CLAIMED: {RunState.RUNNING, RunState.CANCELED, RunState.TIMED_OUT, RunState.FAILED},
-    RunState.RUNNING: {
-        RunState.BLOCKED,
-        RunState.SUCCEEDED,
-        RunState.FAILED,
-        RunState.TIMED_OUT,
-        RunState.CANCELED,
-        RunState.AWAITING_APPROVAL,
-    },
-    RunState.BLOCKED: {RunState.RUNNING, RunState.CANCELED, RunState.TIMED_OUT, RunState.FAILED},
-    RunState.AWAITING_APPROVAL: {RunState.RUNNING, RunState.CANCELED, RunState.TIMED_OUT},
-    RunState.SUCCEEDED: set(),
-    RunState.FAILED: set(),
-    RunState.TIMED_OUT: set(),
-    RunState.CANCELED: set(),
-}
-
-
-class RunSupervisor:
+from software_factory.core.supervisor import operations
+from software_factory.core.supervisor.base import SupervisorBase
+from software_factory.core.supervisor.event_buffer import RunEventBuffer
+from software_factory.core.supervisor.hot_counters import CounterReport, RunCounters, RunUsage
+from software_factory.core.supervisor.operations import ALLOWED_TRANSITIONS, TERMINAL_STATES
+from software_factory.core.supervisor.run_cache import ActiveRunCache
+
+__all__ = ["ALLOWED_TRANSITIONS", "TERMINAL_STATES", "RunSupervisor"]
+
+logger = logging.getLogger(__name__)
+
+
+class RunSupervisor(SupervisorBase):
     """Dispatch and lifecycle management for ticket runs."""
 
     def __init__(
@@ -48,12 +31,16 @@ class RunSupervisor:
         backlog: BacklogInterface,
         session_factory: sessionmaker[Session],
         heartbeat_timeout_seconds: int | None = None,
+        events: RunEventBuffer | None = None,
+        cache: ActiveRunCache | None = None,
+        counters: RunCounters | None = None,
     ):
+        super().__init__(heartbeat_timeout_seconds, events, cache)
         self.backlog = backlog
         self.session_factory = session_factory
-        self.heartbeat_timeout_seconds = (
-            heartbeat_timeout_seconds or get_settings().run_heartbeat_timeout_seconds
-        )
+        self.counters = counters
+        self._flusher: threading.Thread | None = None
+        self._flusher_stop = threading.Event()
 
     def dispatch(self, ticket_id: str, owner: str, harness: str, budget: RunBudget) -> Run | None:
         """Claim a ticket and create a new run."""
@@ -61,45 +48,28 @@ class RunSupervisor:
         lease = self.backlog.claim_ticket(ticket_id=ticket_id, owner=owner)
         if lease is None:
             return None
+        return self._start(operations.start_runs([lease], {ticket_id: harness}, budget), owner)[0]
 
-        now = datetime.now(UTC)
-        run = Run(
-            run_id=str(uuid4()),
-            ticket_id=ticket_id,
-            harness=harness,
-            state=RunState.CLAIMED,
-            lease_token=lease.token,
-            budget=budget,
-            started_at=now,
-            heartbeat_at=now,
-        )
+    def dispatch_many(
+        self, assignments: list[tuple[str, str]], owner: str, budget: RunBudget
+    ) -> list[Run]:
+        """Claim ``(ticket_id, harness)`` assignments in one batch and create their runs.
 
-        with self.session_factory() as session:
-            session.add(
-                RunRow(
-                    id=run.run_id,
-                    ticket_id=run.ticket_id,
-                    harness=run.harness,
-                    state=run.state,
-                    lease_token=run.lease_token,
-                    max_minutes=run.budget.max_minutes,
-                    max_tokens=run.budget.max_tokens,
-                    token_count=0,
-                    started_at=run.started_at,
-                    heartbeat_at=run.heartbeat_at,
-                )
-            )
-            session.add(
-                RunEventRow(
-                    run_id=run.run_id,
-                    ticket_id=run.ticket_id,
-                    event_type="run_claimed",
-                    payload={"owner": owner, "harness": harness},
-                )
-            )
-            session.commit()
+        Tickets that are no longer ready are skipped; all new runs are recorded
+        in one transaction.
+        """
 
-        return run
+        harnesses = dict(assignments)
+        leases = self.backlog.claim_tickets(list(harnesses), owner)
+        if not leases:
+            return []
+        return self._start(operations.start_runs(leases, harnesses, budget), owner)
+
+    def active_run_counts(self) -> tuple[dict[str, int], dict[str, int]]:
+        """Return active run counts keyed by harness and by repo."""
+
+        with self.session_factory() as session:
+            return operations.active_run_counts(session)
 
     def monitor_run(
         self,
@@ -107,127 +77,274 @@ class RunSupervisor:
         new_state: RunState,
         token_delta: int = 0,
         payload: dict[str, Any] | None = None,
+        expected_version: int | None = None,
     ) -> Run | None:
-        """Transition run state and record a run event."""
-
-        now = datetime.now(UTC)
-        payload = payload or {}
-
+        """Transition run state and record a run event.
+
+        Pass ``expected_version`` to make the transition conditional on the run
+        not having changed state since the caller last read it.
+
+        Terminal transitions release the ticket in the same transaction as the
+        run update when the backlog is SQL-backed, so run, event, ticket status,
+        lease and attempt counter commit together. They also write the run's
+        hot counters, if any, in that transaction and then drop them.
+
+        With hot counters, ``token_delta`` of a tracked run is added in Redis
+        and the resulting total is written in the same transaction, so Redis
+        stays the source of truth for its token count.
+        """
+
+        terminal = new_state in TERMINAL_STATES
+        usage: dict[str, RunUsage] = {}
+        if self.counters is not None and (terminal or token_delta):
+            if token_delta and self.counters.report(run_id, token_delta) is not None:
+                token_delta = 0
+            usage = self.counters.usage([run_id])
         with self.session_factory() as session:
-            run_row = session.execute(select(RunRow).where(RunRow.id == run_id)).scalar_one_or_none()
+            run_row = operations.apply_transition(
+                session,
+                run_id,
+                new_state,
+                token_delta,
+                payload,
+                self.events,
+                expected_version,
+                self._cached(run_id),
+                usage,
+            )
             if run_row is None:
+                self._forget([run_id])
                 return None
 
-            current_state = run_row.state
-            if new_state not in ALLOWED_TRANSITIONS[current_state]:
-                return None
-
-            run_row.state = new_state
-            run_row.token_count += token_delta
-            run_row.heartbeat_at = now
-            if new_state in TERMINAL_STATES:
-                run_row.ended_at = now
-
-            session.add(
-                RunEventRow(
-                    run_id=run_row.id,
-                    ticket_id=run_row.ticket_id,
-                    event_type="state_transition",
-                    payload={
-                        "from": current_state.value,
-                        "to": new_state.value,
-                        **payload,
-                    },
+            ticket_status = operations.TERMINAL_TICKET_STATUS.get(new_state)
+            if ticket_status is not None:
+                self.backlog.release_in_session(
+                    session, run_row.ticket_id, run_row.lease_token, ticket_status, new_state.value
                 )
-            )
-
-            if new_state == RunState.SUCCEEDED:
-                self.backlog.complete_ticket(run_row.ticket_id, run_row.lease_token)
-                self._update_ticket_status(session, run_row.ticket_id, TicketStatus.COMPLETED)
-            elif new_state in {RunState.FAILED, RunState.TIMED_OUT, RunState.CANCELED}:
-                self.backlog.fail_ticket(run_row.ticket_id, run_row.lease_token, reason=new_state.value)
-                self._update_ticket_status(session, run_row.ticket_id, TicketStatus.FAILED)
 
             session.commit()
-            return self._to_model(run_row)
+
+        self._refresh(run_row)
+        if terminal and self.counters is not None:
+            self.counters.forget([run_id])
+        self._maybe_flush_events()
+        return operations.to_run(run_row)
 
     def enforce_limits(self, run_id: str, token_count: int | None = None) -> Run | None:
-        """Apply budget constraints to a run and timeout if limits are exceeded."""
+        """Apply budget constraints to a run and timeout if limits are exceeded.
+
+        With hot counters, a reported ``token_count`` of a tracked run becomes
+        its total in Redis and is checked there, so the report writes nothing
+        to the database; later :meth:`record_usage` deltas build on it.
+        """
+
+        if self.counters is not None and token_count is not None:
+            report = self._count(run_id, token_count=token_count)
+            if report is not None:
+                if report.exceeded is not None:
+                    return self.monitor_run(
+                        run_id,
+                        RunState.TIMED_OUT,
+                        payload={"reason": report.exceeded, "token_count": token_count},
+                    )
+                with self.session_factory() as session:
+                    run = operations.active_run(session, run_id)
+                return run.model_copy(update={"token_count": report.token_count}) if run else None
 
-        now = datetime.now(UTC)
         with self.session_factory() as session:
-            run_row = session.execute(select(RunRow).where(RunRow.id == run_id)).scalar_one_or_none()
+            run_row, reason = operations.check_budget(
+                session, run_id, token_count, self.events, self._cached(run_id)
+            )
             if run_row is None:
+                self._forget([run_id])
                 return None
+            session.commit()
 
-            runtime_exceeded = now > run_row.started_at + timedelta(minutes=run_row.max_minutes)
-            token_exceeded = token_count is not None and token_count > run_row.max_tokens
-
-            if runtime_exceeded or token_exceeded:
-                reason = "max_minutes" if runtime_exceeded else "max_tokens"
-                run_row.error_message = f"Budget exceeded: {reason}"
-                session.commit()
-                return self.monitor_run(
-                    run_id,
-                    RunState.TIMED_OUT,
-                    payload={"reason": reason, "token_count": token_count},
+        self._refresh(run_row)
+        self._maybe_flush_events()
+        if reason is not None:
+            return self.monitor_run(
+                run_id,
+                RunState.TIMED_OUT,
+                payload={"reason": reason, "token_count": token_count},
+            )
+        return operations.to_run(run_row)
+
+    def record_usage(self, run_id: str, token_delta: int = 0) -> CounterReport | None:
+        """Count reported tokens and a heartbeat in Redis, timing the run out on overrun.
+
+        The report costs one Lua script call and no database write; the totals
+        reach ``runs`` on :meth:`flush_counters` or the run's terminal
+        transition. A run over its token or runtime budget is moved to
+        TIMED_OUT before this returns. Runs missing from Redis (e.g. after a
+        Redis restart) are re-seeded from ``runs`` first. Returns None when the
+        run is unknown or no longer active, or no counters are configured.
+        """
+
+        report = self._count(run_id, token_delta)
+        if report is not None and report.exceeded is not None:
+            self.monitor_run(
+                run_id,
+                RunState.TIMED_OUT,
+                payload={"reason": report.exceeded, "token_count": report.token_count},
+            )
+        return report
+
+    def enforce_all_limits(self, token_counts: Mapping[str, int] | None = None) -> list[str]:
+        """Time out every run over its runtime or token budget in one transaction.
+
+        ``token_counts`` maps run ids to their latest reported token usage. The
+        sweep costs a constant number of queries regardless of fleet size and
+        returns the ids of the runs it timed out. Pending hot counters are
+        written in the same transaction first.
+        """
+
+        usage = self.counters.collect() if self.counters is not None else {}
+        try:
+            with self.session_factory() as session:
+                timed_out = operations.sweep_budgets(
+                    session, usage, dict(token_counts or {}), self.events
                 )
-
-            if token_count is not None:
-                run_row.token_count = token_count
-                run_row.heartbeat_at = now
-                session.add(
-                    RunEventRow(
-                        run_id=run_row.id,
-                        ticket_id=run_row.ticket_id,
-                        event_type="budget_check",
-                        payload={"token_count": token_count},
-                    )
+                self.backlog.release_many_in_session(
+                    session,
+                    [(ticket_id, lease_token) for _, ticket_id, lease_token in timed_out],
+                    TicketStatus.FAILED,
+                    RunState.TIMED_OUT.value,
                 )
                 session.commit()
+        except Exception:
+            if self.counters is not None:
+                self.counters.mark_dirty(list(usage))
+            raise
+
+        self._forget([run_id for run_id, _, _ in timed_out])
+        if self.counters is not None:
+            self.counters.forget([run_id for run_id, _, _ in timed_out])
+        self._maybe_flush_events()
+        return [run_id for run_id, _, _ in timed_out]
+
+    def recover_stale_runs(self, batch_size: int = 500) -> list[str]:
+        """Mark runs timed_out if heartbeat is stale beyond configured timeout.
+
+        Runs are recovered in set-based batches, one transaction each: the run
+        updates, their events and the ticket releases commit together. Hot
+        counters are flushed first so heartbeats held in Redis count.
+        """
+
+        self.flush_counters()
+        cutoff = self._stale_cutoff()
+        recovered: list[str] = []
 
-            return self._to_model(run_row)
+        while True:
+            with self.session_factory() as session:
+                timed_out = operations.time_out_stale_runs(
+                    session, cutoff, batch_size, self.events
+                )
+                self.backlog.release_many_in_session(
+                    session,
+                    [(ticket_id, lease_token) for _, ticket_id, lease_token in timed_out],
+                    TicketStatus.FAILED,
+                    RunState.TIMED_OUT.value,
+                )
+                session.commit()
+            self._forget([run_id for run_id, _, _ in timed_out])
+            if self.counters is not None:
+                self.counters.forget([run_id for run_id, _, _ in timed_out])
+            recovered.extend(run_id for run_id, _, _ in timed_out)
+            if len(timed_out) < batch_size:
+                return recovered
+
+    def flush_counters(self) -> int:
+        """Write the hot counters of every run reported since the last flush.
+
+        All dirty runs are written with one UPDATE; if the transaction fails
+        they stay dirty for the next flush. Returns how many runs were written.
+        """
+
+        if self.counters is None:
+            return 0
+        usage = self.counters.collect()
+        if not usage:
+            return 0
+        try:
+            with self.session_factory() as session:
+                written = operations.apply_run_usage(session, usage, self.events)
+                session.commit()
+        except Exception:
+            self.counters.mark_dirty(list(usage))
+            raise
 
-    def recover_stale_runs(self) -> list[str]:
-        """Mark runs timed_out if heartbeat is stale beyond configured timeout."""
+        self.counters.forget(sorted(set(usage) - set(written)))
+        self._maybe_flush_events()
+        return len(written)
 
-        now = datetime.now(UTC)
-        cutoff = now - timedelta(seconds=self.heartbeat_timeout_seconds)
-        recovered: list[str] = []
+    def flush_events(self) -> int:
+        """Write every buffered run event now with one multi-row INSERT."""
 
         with self.session_factory() as session:
-            stale_runs = session.execute(
-                select(RunRow).where(
-                    RunRow.state.in_([RunState.CLAIMED, RunState.RUNNING, RunState.BLOCKED]),
-                    RunRow.heartbeat_at < cutoff,
-                )
-            ).scalars()
-            stale_ids = [row.id for row in stale_runs]
-
-        for run_id in stale_ids:
-            result = self.monitor_run(run_id, RunState.TIMED_OUT, payload={"reason": "stale_heartbeat"})
-            if result is not None:
-                recovered.append(run_id)
-
-        return recovered
-
-    def _to_model(self, row: RunRow) -> Run:
-        return Run(
-            run_id=row.id,
-            ticket_id=row.ticket_id,
-            harness=row.harness,
-            state=row.state,
-            sandbox_id=row.sandbox_id,
-            lease_token=row.lease_token,
-            budget=RunBudget(max_minutes=row.max_minutes, max_tokens=row.max_tokens),
-            token_count=row.token_count,
-            started_at=row.started_at,
-            heartbeat_at=row.heartbeat_at,
-            ended_at=row.ended_at,
-            error_message=row.error_message,
+            flushed = self.events.drain_into(session)
+            session.commit()
+        return flushed
+
+    def start_event_flusher(self) -> None:
+        """Flush buffered run events from a daemon thread once they reach the time threshold.
+
+        Without it the threshold is only checked when the supervisor is
+        called. The thread stops on :meth:`close`.
+        """
+
+        if self._flusher is not None:
+            return
+        self._flusher_stop.clear()
+        self._flusher = threading.Thread(
+            target=self._flush_events_periodically, name="run-event-flusher", daemon=True
         )
+        self._flusher.start()
+
+    def close(self) -> None:
+        """Flush hot counters and buffered run events before shutdown."""
+
+        if self._flusher is not None:
+            self._flusher_stop.set()
+            self._flusher.join()
+            self._flusher = None
+        self.flush_counters()
+        self.flush_events()
+        self.events.close()
+
+    def _count(
+        self, run_id: str, token_delta: int = 0, token_count: int | None = None
+    ) -> CounterReport | None:
+        if self.counters is None:
+            return None
+        report = self.counters.report(run_id, token_delta, token_count=token_count)
+        if report is None:
+            with self.session_factory() as session:
+                run = operations.active_run(session, run_id)
+            if run is None:
+                return None
+            self.counters.track([run])
+            report = self.counters.report(run_id, token_delta, token_count=token_count)
+        return report
+
+    def _start(self, runs: list[Run], owner: str) -> list[Run]:
+        with self.session_factory() as session:
+            operations.record_dispatches(session, runs, owner, self.events)
+            session.commit()
 
-    def _update_ticket_status(self, session: Session, ticket_id: str, status: TicketStatus) -> None:
-        ticket_row = session.execute(select(TicketRow).where(TicketRow.id == ticket_id)).scalar_one_or_none()
-        if ticket_row is not None:
-            ticket_row.status = status
+        self._remember(runs)
+        if self.counters is not None:
+            self.counters.track(runs)
+        self._maybe_flush_events()
+        return runs
+
+    def _flush_events_periodically(self) -> None:
+        while not self._flusher_stop.wait(self.events.seconds_until_flush()):
+            try:
+                self._maybe_flush_events()
+            except Exception:
+                logger.exception("periodic run event flush failed")
+
+    def _maybe_flush_events(self) -> None:
+        if self.events.should_flush():
+            self.flush_events()
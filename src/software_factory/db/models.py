@@ -41,6 +41,8 @@ class TicketRow(Base):
     source: Mapped[str] = mapped_column(String(64), nullable=False)
     type: Mapped[str] = mapped_column(String(64), nullable=False)
     priority: Mapped[str] = mapped_column(String(32), nullable=False)
+    priority_rank: Mapped[int] = mapped_column(Integer, nullable=False)
+    priority_due_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     repo: Mapped[str] = mapped_column(String(255), nullable=False)
     context: Mapped[dict] = mapped_column(JSON, default=dict)
     acceptance_criteria: Mapped[list] = mapped_column(JSON, default=list)
@@ -51,6 +53,7 @@ class TicketRow(Base):
     lease_owner: Mapped[str | None] = mapped_column(String(255), nullable=True)
     lease_token: Mapped[str | None] = mapped_column(String(64), nullable=True)
     lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    active_lease_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
     last_failure_reason: Mapped[str | None] = mapped_column(Text, nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, nullable=False)
@@ -59,6 +62,17 @@ class TicketRow(Base):
     )
 
 
+class TicketOutboxRow(Base):
+    """Ticket that became READY and still has to be published to the ready queue."""
+
+    __tablename__ = "ticket_outbox"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    ticket_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    idempotency_key: Mapped[str] = mapped_column(String(255), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, nullable=False)
+
+
 class RunRow(Base):
     """Persisted run record."""
 
@@ -68,6 +82,7 @@ class RunRow(Base):
     ticket_id: Mapped[str] = mapped_column(ForeignKey("tickets.id"), nullable=False, index=True)
     harness: Mapped[str] = mapped_column(String(64), nullable=False)
     state: Mapped[RunState] = mapped_column(RUN_STATE_ENUM, nullable=False)
+    version: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
     sandbox_id: Mapped[str | None] = mapped_column(String(128), nullable=True)
     lease_token: Mapped[str] = mapped_column(String(64), nullable=False)
 
@@ -76,6 +91,7 @@ class RunRow(Base):
     token_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
 
     started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, nullable=False)
+    deadline_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     heartbeat_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, nullable=False)
     ended_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -94,6 +110,45 @@ class RunEventRow(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, nullable=False)
 
 
+class RunEventSegmentRow(Base):
+    """Index from a run to the archived segment holding its compacted events."""
+
+    __tablename__ = "run_event_segments"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    run_id: Mapped[str] = mapped_column(String(64), index=True, nullable=False)
+    segment: Mapped[str] = mapped_column(String(255), nullable=False)
+    offset: Mapped[int] = mapped_column(Integer, nullable=False)
+    length: Mapped[int] = mapped_column(Integer, nullable=False)
+    event_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, nullable=False)
+
+
+class RunSnapshotRow(Base):
+    """Run state folded from the event ledger up to ``last_event_id``."""
+
+    __tablename__ = "run_snapshots"
+
+    run_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    last_event_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    data: Mapped[dict] = mapped_column(JSON, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, onupdate=utcnow, nullable=False
+    )
+
+
+class ProjectionCheckpointRow(Base):
+    """High-water mark of the run_events id a projection has consumed."""
+
+    __tablename__ = "projection_checkpoints"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    last_event_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=utcnow, onupdate=utcnow, nullable=False
+    )
+
+
 class LeaseRow(Base):
     """Lease history table for auditability."""
 
@@ -108,6 +163,44 @@ class LeaseRow(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, nullable=False)
 
 
+class LeaseArchiveRow(Base):
+    """Compacted history of released leases moved out of the hot lease table."""
+
+    __tablename__ = "lease_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    ticket_id: Mapped[str] = mapped_column(String(64), index=True, nullable=False)
+    owner: Mapped[str] = mapped_column(String(255), nullable=False)
+    token: Mapped[str] = mapped_column(String(64), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    released_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class QueueItemRow(Base):
+    """Ready-queue entry for deployments without Redis."""
+
+    __tablename__ = "queue_items"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    queue: Mapped[str] = mapped_column(String(64), nullable=False)
+    ticket_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    priority_rank: Mapped[int] = mapped_column(Integer, nullable=False)
+    enqueued_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, nullable=False)
+
+
+class QueueDeadLetterRow(Base):
+    """Queue entries given up on, with the reason."""
+
+    __tablename__ = "queue_dead_letters"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    queue: Mapped[str] = mapped_column(String(64), index=True, nullable=False)
+    ticket_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    reason: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, nullable=False)
+
+
 class ArtifactRow(Base):
     """Artifact metadata for each run."""
 
@@ -124,5 +217,21 @@ class ArtifactRow(Base):
 
 Index("ix_tickets_ready_status", TicketRow.status)
 Index("ix_tickets_lease_expiry", TicketRow.lease_expires_at)
+Index(
+    "ix_tickets_status_priority_created",
+    TicketRow.status,
+    TicketRow.priority_rank,
+    TicketRow.created_at,
+)
+Index(
+    "ix_tickets_status_priority_due",
+    TicketRow.status,
+    TicketRow.priority_due_at,
+    TicketRow.created_at,
+)
+Index("ix_tickets_created_id", TicketRow.created_at, TicketRow.id)
+Index("ix_leases_released_at", LeaseRow.released_at)
 Index("ix_runs_state", RunRow.state)
 Index("ix_runs_heartbeat", RunRow.heartbeat_at)
+Index("ix_runs_state_deadline", RunRow.state, RunRow.deadline_at)
+Index("ix_queue_items_queue_priority", QueueItemRow.queue, QueueItemRow.priority_rank, QueueItemRow.id)
@@ -2,12 +2,23 @@
 
 from __future__ import annotations
 
-from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
+from sqlalchemy import create_engine, make_url
+from sqlalchemy.engine import URL, Engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
 
 from software_factory.config import get_settings
 
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
 
 def create_engine_from_settings() -> Engine:
     """Build a SQLAlchemy engine from configured settings."""
@@ -22,3 +33,30 @@ def create_session_factory(engine: Engine | None = None) -> sessionmaker[Session
     if engine is None:
         engine = create_engine_from_settings()
     return sessionmaker(bind=engine, expire_on_commit=False, future=True)
+
+
+def to_async_database_url(database_url: str) -> URL:
+    """Swap a sync driver URL for its asyncio driver (asyncpg, aiosqlite)."""
+
+    url = make_url(database_url)
+    async_driver = _ASYNC_DRIVERS.get(url.get_backend_name())
+    if async_driver is None:
+        return url
+    return url.set(drivername=async_driver)
+
+
+def create_async_engine_from_settings() -> AsyncEngine:
+    """Build an asyncio SQLAlchemy engine from configured settings."""
+
+    settings = get_settings()
+    return create_async_engine(
+        settings.async_database_url or to_async_database_url(settings.database_url)
+    )
+
+
+def create_async_session_factory(engine: AsyncEngine | None = None) -> async_sessionmaker[AsyncSession]:
+    """Create a configured asyncio session factory."""
+
+    if engine is None:
+        engine = create_async_engine_from_settings()
+    return async_sessionmaker(bind=engine, expire_on_commit=False)
@@ -2,18 +2,21 @@
 
 from __future__ import annotations
 
+import json
+from typing import Any, cast
+
 from fastapi import FastAPI
 from redis import Redis
 from sqlalchemy import text
 
 from software_factory.config import get_settings
 from software_factory.db.session import create_engine_from_settings
+from software_factory.services.manager.control import PAUSED_KEY, TICK_STATS_KEY
 
 app = FastAPI(title="Software Factory Manager", version="0.1.0")
 
 _engine = create_engine_from_settings()
 _redis = Redis.from_url(get_settings().redis_url)
-_control_state = {"paused": False}
 
 
 @app.get("/health")
@@ -37,14 +40,14 @@ def ready() -> dict[str, str]:
 def control_status() -> dict[str, bool]:
     """Return current control-plane pause status."""
 
-    return {"paused": _control_state["paused"]}
+    return {"paused": bool(_redis.exists(PAUSED_KEY))}
 
 
 @app.post("/control/pause")
 def pause() -> dict[str, bool]:
     """Pause new dispatches."""
 
-    _control_state["paused"] = True
+    _redis.set(PAUSED_KEY, "1")
     return {"paused": True}
 
 
@@ -52,5 +55,13 @@ def pause() -> dict[str, bool]:
 def resume() -> dict[str, bool]:
     """Resume new dispatches."""
 
-    _control_state["paused"] = False
+    _redis.delete(PAUSED_KEY)
     return {"paused": False}
+
+
+@app.get("/control/stats")
+def control_stats() -> dict[str, Any]:
+    """Return the dispatch loop's latest tick-latency stats."""
+
+    raw = cast(bytes | None, _redis.get(TICK_STATS_KEY))
+    return json.loads(raw) if raw else {}
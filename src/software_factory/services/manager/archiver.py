@@ -0,0 +1,57 @@
+"""Periodic cold-storage archival entrypoint for run events and released leases."""
+
+from __future__ import annotations
+
+import logging
+import threading
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from software_factory.config import get_settings
+from software_factory.core.backlog.retention import archive_released_leases
+from software_factory.core.supervisor import LocalSegmentStore, SegmentStore, archive_run_events
+from software_factory.db.session import create_session_factory
+from software_factory.services.manager.periodic import run_periodically
+
+logger = logging.getLogger(__name__)
+
+
+def run_archiver(
+    session_factory: sessionmaker[Session],
+    store: SegmentStore,
+    interval_seconds: float,
+    stop: threading.Event | None = None,
+    max_backoff_seconds: float = 300.0,
+) -> None:
+    """Archive old run events and released leases every ``interval_seconds`` until ``stop`` is set.
+
+    Age thresholds come from settings (``RUN_EVENT_ARCHIVE_AFTER_DAYS`` and
+    ``LEASE_RETENTION_DAYS``).
+    Failed passes back off as in :func:`run_periodically`.
+    """
+
+    def archive() -> None:
+        runs = archive_run_events(session_factory, store)
+        if runs:
+            logger.info("archived run events of %d runs", runs)
+        leases = archive_released_leases(session_factory)
+        if leases:
+            logger.info("archived %d released leases", leases)
+
+    run_periodically("archiver", archive, interval_seconds, stop, max_backoff_seconds)
+
+
+def main() -> None:
+    """Run the archiver against the configured database and segment store."""
+
+    settings = get_settings()
+    logging.basicConfig(level=settings.log_level)
+    run_archiver(
+        create_session_factory(),
+        LocalSegmentStore(settings.run_event_archive_path),
+        settings.archive_interval_seconds,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""Control-plane state shared by the manager API and the dispatch loop via Redis."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from redis.asyncio import Redis
+
+PAUSED_KEY = "software_factory:control:paused"
+TICK_STATS_KEY = "software_factory:manager:tick_stats"
+
+
+async def is_paused(redis: Redis) -> bool:
+    """Return whether dispatch has been paused through the manager API."""
+
+    return bool(await redis.exists(PAUSED_KEY))
+
+
+async def publish_tick_stats(redis: Redis, stats: dict[str, dict[str, Any]]) -> None:
+    """Store the latest tick-latency snapshot for ``GET /control/stats``."""
+
+    await redis.set(TICK_STATS_KEY, json.dumps(stats))
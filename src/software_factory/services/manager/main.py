@@ -0,0 +1,67 @@
+"""Manager dispatch loop entrypoint."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import signal
+import socket
+
+from redis.asyncio import Redis
+
+from software_factory.config import Settings, get_settings
+from software_factory.core.backlog import AsyncSQLAlchemyBacklog
+from software_factory.core.models import RunBudget
+from software_factory.core.supervisor import (
+    ActiveRunCache,
+    AsyncRunCounters,
+    AsyncRunSupervisor,
+)
+from software_factory.db.session import create_async_session_factory
+from software_factory.services.manager.control import is_paused, publish_tick_stats
+from software_factory.services.manager.scheduler import DispatchLoop
+
+
+async def serve(settings: Settings) -> None:
+    """Run the dispatch loop until SIGINT or SIGTERM."""
+
+    session_factory = create_async_session_factory()
+    backlog = AsyncSQLAlchemyBacklog(session_factory)
+    redis = Redis.from_url(settings.redis_url)
+    loop = DispatchLoop(
+        backlog=backlog,
+        supervisor=AsyncRunSupervisor(
+            backlog,
+            session_factory,
+            cache=ActiveRunCache(settings.run_cache_size),
+            counters=AsyncRunCounters(redis),
+        ),
+        harnesses=settings.enabled_harnesses,
+        harness_slots=settings.harness_max_concurrency,
+        repo_cap=settings.repo_max_concurrency,
+        owner=f"manager-{socket.gethostname()}-{os.getpid()}",
+        budget=RunBudget(max_minutes=settings.max_run_minutes, max_tokens=settings.max_run_tokens),
+        interval_seconds=settings.dispatch_interval_seconds,
+        batch_size=settings.dispatch_batch_size,
+        is_paused=lambda: is_paused(redis),
+        publish_stats=lambda stats: publish_tick_stats(redis, stats),
+    )
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        asyncio.get_running_loop().add_signal_handler(signum, loop.stop)
+    try:
+        await loop.run()
+    finally:
+        await redis.aclose()
+
+
+def main() -> None:
+    """Run the manager dispatch loop against the configured database and Redis."""
+
+    settings = get_settings()
+    logging.basicConfig(level=settings.log_level)
+    asyncio.run(serve(settings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Shared loop for the manager's periodic maintenance entrypoints."""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+
+def run_periodically(
+    name: str,
+    task: Callable[[], object],
+    interval_seconds: float,
+    stop: threading.Event | None = None,
+    max_backoff_seconds: float = 300.0,
+) -> None:
+    """Call ``task`` every ``interval_seconds`` until ``stop`` is set.
+
+    A failed pass is logged and the wait doubles (capped at
+    ``max_backoff_seconds``, with +/-20% jitter) until a pass succeeds again.
+    """
+
+    stop = stop or threading.Event()
+    failures = 0
+    while not stop.is_set():
+        try:
+            task()
+            failures = 0
+        except Exception:
+            failures += 1
+            logger.exception("%s pass failed (%d in a row)", name, failures)
+        delay = min(max_backoff_seconds, interval_seconds * 2**failures)
+        stop.wait(delay * random.uniform(0.8, 1.2) if failures else delay)
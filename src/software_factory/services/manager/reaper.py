@@ -0,0 +1,50 @@
+"""Periodic expired-lease reaper entrypoint."""
+
+from __future__ import annotations
+
+import logging
+import threading
+
+from software_factory.config import get_settings
+from software_factory.core.backlog import BacklogInterface, SQLAlchemyBacklog
+from software_factory.db.session import create_session_factory
+from software_factory.services.manager.periodic import run_periodically
+
+logger = logging.getLogger(__name__)
+
+
+def run_reaper(
+    backlog: BacklogInterface,
+    interval_seconds: float,
+    batch_size: int = 500,
+    stop: threading.Event | None = None,
+    max_backoff_seconds: float = 300.0,
+) -> None:
+    """Reap expired leases every ``interval_seconds`` until ``stop`` is set.
+
+    A failed pass is logged and the wait doubles (capped at
+    ``max_backoff_seconds``) until a pass succeeds again.
+    """
+
+    def reap() -> None:
+        result = backlog.reap_expired_leases(batch_size=batch_size)
+        if result.requeued or result.failed:
+            logger.info(
+                "reaped expired leases: %d requeued, %d failed",
+                len(result.requeued),
+                len(result.failed),
+            )
+
+    run_periodically("reaper", reap, interval_seconds, stop, max_backoff_seconds)
+
+
+def main() -> None:
+    """Run the reaper against the configured database."""
+
+    settings = get_settings()
+    logging.basicConfig(level=settings.log_level)
+    run_reaper(SQLAlchemyBacklog(create_session_factory()), settings.lease_reap_interval_seconds)
+
+
+if __name__ == "__main__":
+    main()
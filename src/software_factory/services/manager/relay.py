@@ -0,0 +1,49 @@
+"""Periodic ticket outbox relay entrypoint."""
+
+from __future__ import annotations
+
+import logging
+import threading
+
+from redis import Redis
+
+from software_factory.config import get_settings
+from software_factory.core.queue import OutboxRelay, PriorityRedisQueue
+from software_factory.db.session import create_session_factory
+from software_factory.services.manager.periodic import run_periodically
+
+logger = logging.getLogger(__name__)
+
+
+def run_outbox_relay(
+    relay: OutboxRelay,
+    interval_seconds: float,
+    stop: threading.Event | None = None,
+    max_backoff_seconds: float = 300.0,
+) -> None:
+    """Drain the ticket outbox every ``interval_seconds`` until ``stop`` is set.
+
+    Failed passes back off as in :func:`run_periodically`.
+    """
+
+    def relay_pending() -> None:
+        relayed = relay.drain()
+        if relayed:
+            logger.info("relayed %d outbox rows", relayed)
+
+    run_periodically("outbox relay", relay_pending, interval_seconds, stop, max_backoff_seconds)
+
+
+def main() -> None:
+    """Relay the configured database's ticket outbox to the Redis ready queue."""
+
+    settings = get_settings()
+    logging.basicConfig(level=settings.log_level)
+    queue = PriorityRedisQueue(Redis.from_url(settings.redis_url))
+    run_outbox_relay(
+        OutboxRelay(create_session_factory(), queue), settings.outbox_relay_interval_seconds
+    )
+
+
+if __name__ == "__main__":
+    main()
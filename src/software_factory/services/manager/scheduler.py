@@ -0,0 +1,207 @@
+"""Capacity-aware asyncio dispatch loop for the manager."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from software_factory.core.backlog.interface import AsyncBacklogInterface
+from software_factory.core.models import Run, RunBudget, Ticket
+from software_factory.core.supervisor.async_run_supervisor import AsyncRunSupervisor
+
+logger = logging.getLogger(__name__)
+
+# Ready tickets fetched per free slot, so tickets in capped repos can be skipped.
+_READY_OVERFETCH = 4
+
+
+class TickStats:
+    """Latency of the most recent ticks of one loop, in milliseconds."""
+
+    def __init__(self, window: int = 512):
+        self.ticks = 0
+        self.errors = 0
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float, ok: bool) -> None:
+        """Record one tick's wall-clock duration."""
+
+        self.ticks += 1
+        if not ok:
+            self.errors += 1
+        self._samples.append(seconds * 1000)
+
+    def snapshot(self) -> dict[str, float]:
+        """Return tick counts and latency percentiles over the sample window."""
+
+        samples = sorted(self._samples)
+        if not samples:
+            return {"ticks": self.ticks, "errors": self.errors}
+        return {
+            "ticks": self.ticks,
+            "errors": self.errors,
+            "last_ms": self._samples[-1],
+            "mean_ms": sum(samples) / len(samples),
+            "p50_ms": samples[len(samples) // 2],
+            "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+            "max_ms": samples[-1],
+        }
+
+
+def select_dispatch_batch(
+    ready: list[Ticket],
+    free_slots: dict[str, int],
+    active_by_repo: dict[str, int],
+    repo_cap: int,
+    limit: int,
+) -> list[tuple[str, str]]:
+    """Assign ready tickets, in order, to the harness with the most free slots.
+
+    Tickets whose repo already has ``repo_cap`` active or newly assigned runs
+    are skipped. Returns ``(ticket_id, harness)`` pairs.
+    """
+
+    free = dict(free_slots)
+    per_repo = dict(active_by_repo)
+    batch: list[tuple[str, str]] = []
+    for ticket in ready:
+        if len(batch) >= limit or not free:
+            break
+        harness = max(free, key=lambda name: free[name])
+        if free[harness] <= 0:
+            break
+        if per_repo.get(ticket.repo, 0) >= repo_cap:
+            continue
+        batch.append((ticket.id, harness))
+        free[harness] -= 1
+        per_repo[ticket.repo] = per_repo.get(ticket.repo, 0) + 1
+    return batch
+
+
+class DispatchLoop:
+    """Overlapping dispatch, monitoring and recovery loops.
+
+    Each loop ticks every ``interval_seconds`` with +/-20% jitter so replicas do
+    not synchronise, and backs off exponentially (up to
+    ``max_backoff_seconds``) while its tick keeps failing. Dispatch is skipped
+    while ``is_paused`` reports true; monitoring and recovery keep running.
+    """
+
+    def __init__(
+        self,
+        backlog: AsyncBacklogInterface,
+        supervisor: AsyncRunSupervisor,
+        harnesses: list[str],
+        harness_slots: int,
+        repo_cap: int,
+        owner: str,
+        budget: RunBudget,
+        interval_seconds: float = 15.0,
+        batch_size: int = 50,
+        max_backoff_seconds: float = 300.0,
+        is_paused: Callable[[], Awaitable[bool]] | None = None,
+        publish_stats: Callable[[dict[str, dict[str, Any]]], Awaitable[None]] | None = None,
+    ):
+        self.backlog = backlog
+        self.supervisor = supervisor
+        self.harnesses = harnesses
+        self.harness_slots = harness_slots
+        self.repo_cap = repo_cap
+        self.owner = owner
+        self.budget = budget
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.max_backoff_seconds = max_backoff_seconds
+        self.is_paused = is_paused
+        self.publish_stats = publish_stats
+        self.stats = {name: TickStats() for name in ("dispatch", "monitor", "recovery")}
+        self._stop = asyncio.Event()
+
+    async def dispatch_tick(self) -> list[Run]:
+        """Fill free harness slots from the ready pool with one batched claim."""
+
+        if self.is_paused is not None and await self.is_paused():
+            return []
+
+        active_by_harness, active_by_repo = await self.supervisor.active_run_counts()
+        free = {
+            harness: self.harness_slots - active_by_harness.get(harness, 0)
+            for harness in self.harnesses
+        }
+        capacity = min(self.batch_size, sum(max(0, slots) for slots in free.values()))
+        if capacity <= 0:
+            return []
+
+        ready = await self.backlog.fetch_ready(limit=capacity * _READY_OVERFETCH)
+        batch = select_dispatch_batch(ready, free, active_by_repo, self.repo_cap, capacity)
+        if not batch:
+            return []
+        return await self.supervisor.dispatch_many(batch, self.owner, self.budget)
+
+    async def monitor_tick(self) -> None:
+        """Flush hot counters and time out runs over budget."""
+
+        await self.supervisor.enforce_all_limits()
+
+    async def recovery_tick(self) -> None:
+        """Time out runs whose heartbeat went stale."""
+
+        await self.supervisor.recover_stale_runs()
+
+    async def run(self) -> None:
+        """Run all loops and the run event flusher until :meth:`stop`, then flush buffered events."""
+
+        ticks: dict[str, Callable[[], Awaitable[object]]] = {
+            "dispatch": self.dispatch_tick,
+            "monitor": self.monitor_tick,
+            "recovery": self.recovery_tick,
+        }
+        self.supervisor.start_event_flusher()
+        try:
+            async with asyncio.TaskGroup() as group:
+                for name, tick in ticks.items():
+                    group.create_task(self._every(name, tick))
+        finally:
+            await self.supervisor.close()
+
+    def stop(self) -> None:
+        """Ask every loop to exit after its current tick."""
+
+        self._stop.set()
+
+    def stats_snapshot(self) -> dict[str, dict[str, Any]]:
+        """Return tick-latency stats for every loop."""
+
+        return {name: stats.snapshot() for name, stats in self.stats.items()}
+
+    async def _every(self, name: str, tick: Callable[[], Awaitable[object]]) -> None:
+        failures = 0
+        while not self._stop.is_set():
+            started = time.perf_counter()
+            try:
+                await tick()
+                failures = 0
+            except Exception:
+                failures += 1
+                logger.exception("%s tick failed (%d in a row)", name, failures)
+            self.stats[name].record(time.perf_counter() - started, ok=failures == 0)
+            await self._publish_stats()
+
+            delay = min(self.max_backoff_seconds, self.interval_seconds * 2**failures)
+            try:
+                await asyncio.wait_for(self._stop.wait(), delay * random.uniform(0.8, 1.2))
+            except TimeoutError:
+                pass
+
+    async def _publish_stats(self) -> None:
+        if self.publish_stats is None:
+            return
+        try:
+            await self.publish_stats(self.stats_snapshot())
+        except Exception:
+            logger.exception("publishing tick stats failed")
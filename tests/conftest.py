@@ -6,7 +6,9 @@ from pathlib import Path
 
 import pytest
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
 
 from software_factory.core.backlog.sqlalchemy_backlog import SQLAlchemyBacklog
 from software_factory.db.base import Base
@@ -26,6 +28,16 @@ def session_factory(tmp_path: Path) -> sessionmaker[Session]:
     return sessionmaker(bind=engine, expire_on_commit=False, future=True)
 
 
+@pytest.fixture()
+def async_session_factory(
+    tmp_path: Path, session_factory: sessionmaker[Session]
+) -> async_sessionmaker[AsyncSession]:
+    """Provide an aiosqlite session factory over the same database as ``session_factory``."""
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}", poolclass=NullPool)
+    return async_sessionmaker(bind=engine, expire_on_commit=False)
+
+
 @pytest.fixture()
 def backlog(session_factory: sessionmaker[Session]) -> SQLAlchemyBacklog:
     """Provide SQLAlchemy backlog implementation."""
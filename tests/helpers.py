@@ -2,19 +2,38 @@
 
 from __future__ import annotations
 
-from software_factory.core.models import Ticket, TicketPriority
+from software_factory.core.models import Run, RunBudget, Ticket, TicketPriority
+from software_factory.core.supervisor.run_supervisor import RunSupervisor
 
 
-def make_ticket(ticket_id: str = "ENG-1001", idempotency_key: str = "ticket-key-1") -> Ticket:
+def make_ticket(
+    ticket_id: str = "ENG-1001",
+    idempotency_key: str = "ticket-key-1",
+    priority: TicketPriority = TicketPriority.HIGH,
+) -> Ticket:
     """Construct a test ticket."""
 
     return Ticket(
         id=ticket_id,
         source="sentry",
         type="bug",
-        priority=TicketPriority.HIGH,
+        priority=priority,
         repo="example/repo",
         context={"error": "TypeError"},
         acceptance_criteria=["tests pass"],
         idempotency_key=idempotency_key,
     )
+
+
+def dispatch_run(supervisor: RunSupervisor, ticket_id: str, max_tokens: int = 1000) -> Run:
+    """Create a ticket keyed by ``ticket_id`` and dispatch a run for it."""
+
+    created = supervisor.backlog.create_ticket(make_ticket(ticket_id=ticket_id, idempotency_key=ticket_id))
+    run = supervisor.dispatch(
+        ticket_id=created.id,
+        owner="runner-1",
+        harness="codex",
+        budget=RunBudget(max_minutes=10, max_tokens=max_tokens),
+    )
+    assert run is not None
+    return run
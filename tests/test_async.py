@@ -0,0 +1,99 @@
+"""Asyncio backlog and supervisor tests."""
+
+from __future__ import annotations
+
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from software_factory.core.backlog.async_sqlalchemy_backlog import AsyncSQLAlchemyBacklog
+from software_factory.core.models import RunBudget, RunState, TicketPriority, TicketStatus
+from software_factory.core.supervisor.async_run_supervisor import AsyncRunSupervisor
+from software_factory.db.models import TicketRow
+from tests.helpers import make_ticket
+
+
+def test_async_backlog_lease_lifecycle(async_session_factory: async_sessionmaker[AsyncSession]) -> None:
+    backlog = AsyncSQLAlchemyBacklog(session_factory=async_session_factory, lease_ttl_seconds=30)
+
+    async def _scenario() -> None:
+        first = await backlog.create_ticket(make_ticket("ENG-A1", "async-key"))
+        again = await backlog.create_ticket(make_ticket("ENG-A2", "async-key"))
+        assert again.id == first.id
+
+        await backlog.create_tickets(
+            [make_ticket("ENG-A3", "async-low", TicketPriority.LOW), make_ticket("ENG-A4", "async-high")]
+        )
+        assert [ticket.id for ticket in await backlog.fetch_ready()] == ["ENG-A1", "ENG-A4", "ENG-A3"]
+
+        leases = await backlog.claim_next("worker-a", n=2)
+        assert [lease.ticket_id for lease in leases] == ["ENG-A1", "ENG-A4"]
+        assert await backlog.claim_ticket("ENG-A1", "worker-b") is None
+
+        result = await backlog.heartbeat_many([(lease.ticket_id, lease.token) for lease in leases])
+        assert len(result.renewed) == 2
+
+        streamed = [ticket.id async for ticket in backlog.iter_tickets(batch_size=2)]
+        assert streamed == ["ENG-A1", "ENG-A3", "ENG-A4"]
+
+        completed = await backlog.complete_ticket("ENG-A1", leases[0].token)
+        assert completed is not None
+        assert completed.status == TicketStatus.COMPLETED
+        failed = await backlog.fail_ticket("ENG-A4", leases[1].token, reason="test")
+        assert failed is not None
+        assert failed.attempts == 1
+
+    asyncio.run(_scenario())
+
+
+def test_async_concurrent_claims_are_disjoint(
+    async_session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    backlog = AsyncSQLAlchemyBacklog(session_factory=async_session_factory, lease_ttl_seconds=30)
+
+    async def _scenario() -> list[str]:
+        await backlog.create_tickets([make_ticket(f"ENG-B{i:02d}", f"async-claim-{i}") for i in range(20)])
+        batches = await asyncio.gather(*(backlog.claim_next(f"worker-{i}", n=4) for i in range(8)))
+        return [lease.ticket_id for batch in batches for lease in batch]
+
+    claimed = asyncio.run(_scenario())
+
+    assert len(claimed) == len(set(claimed))
+
+
+def test_async_supervisor_completes_ticket(
+    session_factory: sessionmaker[Session],
+    async_session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    backlog = AsyncSQLAlchemyBacklog(session_factory=async_session_factory, lease_ttl_seconds=30)
+    supervisor = AsyncRunSupervisor(
+        backlog=backlog, session_factory=async_session_factory, heartbeat_timeout_seconds=1
+    )
+
+    async def _scenario() -> None:
+        created = await backlog.create_ticket(make_ticket("ENG-C1", "async-run-key"))
+        run = await supervisor.dispatch(
+            ticket_id=created.id,
+            owner="runner-1",
+            harness="codex",
+            budget=RunBudget(max_minutes=10, max_tokens=1000),
+        )
+        assert run is not None
+        assert await supervisor.monitor_run(run.run_id, RunState.SUCCEEDED) is None
+        assert await supervisor.monitor_run(run.run_id, RunState.RUNNING) is not None
+
+        checked = await supervisor.enforce_limits(run.run_id, token_count=10)
+        assert checked is not None
+        assert checked.token_count == 10
+
+        success = await supervisor.monitor_run(run.run_id, RunState.SUCCEEDED)
+        assert success is not None
+        assert success.state == RunState.SUCCEEDED
+
+    asyncio.run(_scenario())
+
+    with session_factory() as session:
+        ticket = session.execute(select(TicketRow).where(TicketRow.id == "ENG-C1")).scalar_one()
+        assert ticket.status == TicketStatus.COMPLETED
@@ -4,11 +4,18 @@ from __future__ import annotations
 
 import concurrent.futures
 import time
+from datetime import UTC, datetime, timedelta
+from typing import Any
 
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, sessionmaker
 
+from software_factory.core.backlog import operations
 from software_factory.core.backlog.sqlalchemy_backlog import SQLAlchemyBacklog
-from software_factory.core.models import TicketStatus
+from software_factory.core.models import Ticket, TicketPriority, TicketStatus
+from software_factory.db.models import LeaseRow, TicketRow
 from tests.helpers import make_ticket
 
 
@@ -20,6 +27,28 @@ def test_create_ticket_is_idempotent(backlog: SQLAlchemyBacklog) -> None:
     assert first.idempotency_key == second.idempotency_key
 
 
+def test_create_ticket_commits_after_integrity_retry(
+    backlog: SQLAlchemyBacklog,
+    session_factory: sessionmaker[Session],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    create_tickets = operations.create_tickets
+    calls: list[int] = []
+
+    def flaky_create_tickets(*args: Any) -> list[Ticket]:
+        calls.append(1)
+        if len(calls) == 1:
+            raise IntegrityError("INSERT", {}, Exception("concurrent insert"))
+        return create_tickets(*args)
+
+    monkeypatch.setattr(operations, "create_tickets", flaky_create_tickets)
+    created = backlog.create_ticket(make_ticket(ticket_id="ENG-3", idempotency_key="retry-key"))
+
+    assert len(calls) == 2
+    with session_factory() as session:
+        assert session.get(TicketRow, created.id) is not None
+
+
 def test_claim_ticket_allows_only_one_winner(backlog: SQLAlchemyBacklog) -> None:
     created = backlog.create_ticket(make_ticket(ticket_id="ENG-10", idempotency_key="claim-key"))
 
@@ -67,3 +96,203 @@ def test_failed_ticket_increments_attempts(session_factory: sessionmaker[Session
     assert failed is not None
     assert failed.status == TicketStatus.FAILED
     assert failed.attempts == 1
+
+
+def test_fetch_ready_orders_by_priority_then_age(backlog: SQLAlchemyBacklog) -> None:
+    backlog.create_ticket(make_ticket("ENG-30", "order-low", TicketPriority.LOW))
+    backlog.create_ticket(make_ticket("ENG-31", "order-critical", TicketPriority.CRITICAL))
+    backlog.create_ticket(make_ticket("ENG-32", "order-high-1", TicketPriority.HIGH))
+    backlog.create_ticket(make_ticket("ENG-33", "order-high-2", TicketPriority.HIGH))
+    claimed = backlog.create_ticket(make_ticket("ENG-34", "order-claimed", TicketPriority.CRITICAL))
+    assert backlog.claim_ticket(claimed.id, "worker-a") is not None
+
+    ready = backlog.fetch_ready(limit=3)
+
+    assert [ticket.id for ticket in ready] == ["ENG-31", "ENG-32", "ENG-33"]
+
+
+def test_claim_next_leases_highest_priority_tickets(backlog: SQLAlchemyBacklog) -> None:
+    backlog.create_ticket(make_ticket("ENG-40", "next-low", TicketPriority.LOW))
+    backlog.create_ticket(make_ticket("ENG-41", "next-critical", TicketPriority.CRITICAL))
+    backlog.create_ticket(make_ticket("ENG-42", "next-medium", TicketPriority.MEDIUM))
+
+    leases = backlog.claim_next("worker-a", n=2)
+
+    assert [lease.ticket_id for lease in leases] == ["ENG-41", "ENG-42"]
+    assert len({lease.token for lease in leases}) == 2
+    assert [ticket.id for ticket in backlog.fetch_ready()] == ["ENG-40"]
+    assert backlog.complete_ticket("ENG-41", leases[0].token) is not None
+
+
+def test_claim_next_concurrent_claimers_get_disjoint_tickets(backlog: SQLAlchemyBacklog) -> None:
+    for i in range(30):
+        backlog.create_ticket(make_ticket(f"ENG-5{i:02d}", f"next-key-{i}"))
+
+    def _claim(owner: str) -> list[str]:
+        return [lease.ticket_id for lease in backlog.claim_next(owner, n=5)]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
+        results = list(executor.map(_claim, [f"worker-{i}" for i in range(10)]))
+
+    claimed = [ticket_id for batch in results for ticket_id in batch]
+    assert len(claimed) == len(set(claimed))
+    assert len(claimed) + len(backlog.fetch_ready(limit=100)) == 30
+
+
+def test_create_tickets_returns_canonical_tickets_in_input_order(backlog: SQLAlchemyBacklog) -> None:
+    existing = backlog.create_ticket(make_ticket("ENG-60", "bulk-existing"))
+
+    created = backlog.create_tickets(
+        [
+            make_ticket("ENG-61", "bulk-new-1"),
+            make_ticket("ENG-62", "bulk-existing"),
+            make_ticket("ENG-63", "bulk-new-2", TicketPriority.CRITICAL),
+            make_ticket("ENG-64", "bulk-new-1"),
+        ]
+    )
+
+    assert [ticket.id for ticket in created] == ["ENG-61", existing.id, "ENG-63", "ENG-61"]
+    assert [ticket.id for ticket in backlog.fetch_ready()] == ["ENG-63", "ENG-60", "ENG-61"]
+
+
+def test_create_tickets_chunks_large_batches(backlog: SQLAlchemyBacklog) -> None:
+    tickets = [make_ticket(f"ENG-7{i:03d}", f"chunk-key-{i}") for i in range(250)]
+
+    created = backlog.create_tickets(tickets, chunk_size=100)
+    again = backlog.create_tickets(tickets, chunk_size=100)
+
+    assert [ticket.id for ticket in created] == [ticket.id for ticket in tickets]
+    assert [ticket.id for ticket in again] == [ticket.id for ticket in tickets]
+    assert len(backlog.fetch_ready(limit=500)) == 250
+
+
+def test_heartbeat_many_reports_renewed_and_lost(session_factory: sessionmaker[Session]) -> None:
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=10)
+    backlog.create_tickets([make_ticket(f"ENG-8{i}", f"hb-key-{i}") for i in range(3)])
+    leases = backlog.claim_next("worker-a", n=3)
+    assert backlog.complete_ticket(leases[2].ticket_id, leases[2].token) is not None
+
+    result = backlog.heartbeat_many(
+        [
+            (leases[0].ticket_id, leases[0].token),
+            (leases[1].ticket_id, "stale-token"),
+            (leases[2].ticket_id, leases[2].token),
+        ]
+    )
+
+    assert [lease.ticket_id for lease in result.renewed] == [leases[0].ticket_id]
+    assert result.renewed[0].owner == "worker-a"
+    assert result.renewed[0].expires_at > leases[0].expires_at
+    assert result.lost == [leases[1].ticket_id, leases[2].ticket_id]
+
+
+def test_heartbeat_rejects_expired_lease(backlog: SQLAlchemyBacklog) -> None:
+    created = backlog.create_ticket(make_ticket(ticket_id="ENG-90", idempotency_key="hb-exp-key"))
+    lease = backlog.claim_ticket(created.id, "worker-a")
+    assert lease is not None
+
+    renewed = backlog.heartbeat(created.id, lease.token)
+    assert renewed is not None
+    assert renewed.owner == "worker-a"
+
+    time.sleep(1.1)
+    assert backlog.heartbeat(created.id, lease.token) is None
+
+
+def test_lease_rows_follow_active_lease_linkage(session_factory: sessionmaker[Session]) -> None:
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=10)
+    created = backlog.create_ticket(make_ticket(ticket_id="ENG-95", idempotency_key="link-key"))
+    lease = backlog.claim_ticket(created.id, "worker-a")
+    assert lease is not None
+
+    renewed = backlog.heartbeat(created.id, lease.token)
+    assert renewed is not None
+    assert backlog.complete_ticket(created.id, lease.token) is not None
+
+    with session_factory() as session:
+        ticket = session.execute(select(TicketRow).where(TicketRow.id == created.id)).scalar_one()
+        lease_row = session.execute(select(LeaseRow).where(LeaseRow.token == lease.token)).scalar_one()
+    assert ticket.active_lease_id is None
+    assert lease_row.expires_at.replace(tzinfo=UTC) == renewed.expires_at
+    assert lease_row.released_at is not None
+
+
+def test_priority_aging_lets_old_low_ticket_overtake(session_factory: sessionmaker[Session]) -> None:
+    aged = SQLAlchemyBacklog(session_factory=session_factory, priority_aging_minutes=60)
+    aged.create_ticket(make_ticket("ENG-L1", "aging-low", TicketPriority.LOW))
+    with session_factory() as session:
+        row = session.execute(select(TicketRow).where(TicketRow.id == "ENG-L1")).scalar_one()
+        row.created_at -= timedelta(hours=4)
+        row.priority_due_at -= timedelta(hours=4)
+        session.commit()
+    aged.create_ticket(make_ticket("ENG-L2", "aging-critical", TicketPriority.CRITICAL))
+
+    assert [ticket.id for ticket in aged.fetch_ready()] == ["ENG-L1", "ENG-L2"]
+    assert [lease.ticket_id for lease in aged.claim_next("worker-a", n=1)] == ["ENG-L1"]
+
+
+def test_ready_order_follows_stored_due_at_until_backfilled(
+    session_factory: sessionmaker[Session],
+) -> None:
+    aged = SQLAlchemyBacklog(session_factory=session_factory, priority_aging_minutes=60)
+    aged.create_ticket(make_ticket("ENG-B1", "backfill-low", TicketPriority.LOW))
+    with session_factory() as session:
+        row = session.execute(select(TicketRow).where(TicketRow.id == "ENG-B1")).scalar_one()
+        row.created_at -= timedelta(hours=4)
+        row.priority_due_at -= timedelta(hours=4)
+        session.commit()
+    strict = SQLAlchemyBacklog(session_factory=session_factory, priority_aging_minutes=0)
+    strict.create_ticket(make_ticket("ENG-B2", "backfill-critical", TicketPriority.CRITICAL))
+
+    assert [ticket.id for ticket in strict.fetch_ready()] == ["ENG-B1", "ENG-B2"]
+
+    with session_factory() as session:
+        after = operations.backfill_priority_due_at(session, 0, None, batch_size=1)
+        assert after == "ENG-B1"
+        assert operations.backfill_priority_due_at(session, 0, after, batch_size=1) == "ENG-B2"
+        assert operations.backfill_priority_due_at(session, 0, "ENG-B2", batch_size=1) is None
+        session.commit()
+
+    assert [ticket.id for ticket in aged.fetch_ready()] == ["ENG-B2", "ENG-B1"]
+
+
+def test_iter_tickets_pages_through_filtered_backlog(backlog: SQLAlchemyBacklog) -> None:
+    tickets = [make_ticket(f"ENG-P{i:02d}", f"page-key-{i}") for i in range(23)]
+    backlog.create_tickets(tickets[:10])
+    backlog.create_tickets(tickets[10:])
+    leases = backlog.claim_next("worker-a", n=3)
+
+    streamed = [ticket.id for ticket in backlog.iter_tickets(batch_size=5)]
+    ready = [ticket.id for ticket in backlog.iter_tickets(status=TicketStatus.READY, batch_size=4)]
+
+    assert streamed == [ticket.id for ticket in tickets]
+    assert len(ready) == 20
+    assert not {lease.ticket_id for lease in leases} & set(ready)
+    assert list(backlog.iter_tickets(repo="other/repo")) == []
+
+
+def test_reap_expired_leases_requeues_then_fails(session_factory: sessionmaker[Session]) -> None:
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=60, max_attempts=2)
+    backlog.create_tickets([make_ticket(f"ENG-X{i}", f"reap-key-{i}") for i in range(5)])
+    leases = backlog.claim_next("worker-a", n=4)
+    assert backlog.reap_expired_leases().requeued == []
+
+    later = datetime.now(UTC) + timedelta(minutes=5)
+    first = backlog.reap_expired_leases(now=later, batch_size=3)
+    assert sorted(first.requeued) == sorted(lease.ticket_id for lease in leases)
+    assert first.failed == []
+    assert len(backlog.fetch_ready()) == 5
+    assert backlog.heartbeat(leases[0].ticket_id, leases[0].token) is None
+
+    with session_factory() as session:
+        released = session.execute(select(LeaseRow.released_at)).scalars().all()
+        ticket = session.execute(select(TicketRow).where(TicketRow.id == "ENG-X0")).scalar_one()
+    assert all(value is not None for value in released)
+    assert ticket.attempts == 1
+    assert ticket.last_failure_reason == "lease_expired"
+    assert ticket.active_lease_id is None
+
+    backlog.claim_ticket("ENG-X0", "worker-b")
+    second = backlog.reap_expired_leases(now=later)
+    assert second.failed == ["ENG-X0"]
+    assert "ENG-X0" not in [ticket.id for ticket in backlog.fetch_ready()]
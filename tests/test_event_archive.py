@@ -0,0 +1,105 @@
+"""Run event archival tests."""
+
+from __future__ import annotations
+
+import threading
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from software_factory.core.backlog.sqlalchemy_backlog import SQLAlchemyBacklog
+from software_factory.core.models import Run, RunState
+from software_factory.core.supervisor.event_archive import (
+    LocalSegmentStore,
+    archive_run_events,
+    read_run_events,
+)
+from software_factory.core.supervisor.run_supervisor import RunSupervisor
+from software_factory.db.models import RunEventRow, RunEventSegmentRow, RunRow
+from software_factory.services.manager.archiver import run_archiver
+from tests.helpers import dispatch_run
+
+
+def _finished_run(supervisor: RunSupervisor, ticket_id: str) -> Run:
+    run = dispatch_run(supervisor, ticket_id)
+    supervisor.monitor_run(run.run_id, RunState.RUNNING)
+    supervisor.enforce_limits(run.run_id, token_count=10)
+    supervisor.monitor_run(run.run_id, RunState.SUCCEEDED)
+    return run
+
+
+def test_archive_moves_old_runs_and_reader_merges(
+    session_factory: sessionmaker[Session], tmp_path: Path
+) -> None:
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=30)
+    supervisor = RunSupervisor(backlog=backlog, session_factory=session_factory)
+    old = [_finished_run(supervisor, f"ENG-A{i}") for i in range(3)]
+    recent = _finished_run(supervisor, "ENG-A9")
+    store = LocalSegmentStore(tmp_path / "segments")
+
+    with session_factory() as session:
+        before = read_run_events(session, store, old[0].run_id)
+        session.execute(
+            update(RunRow)
+            .where(RunRow.id.in_([run.run_id for run in old]))
+            .values(ended_at=datetime.now(UTC) - timedelta(days=40))
+        )
+        session.commit()
+
+    assert archive_run_events(session_factory, store, archive_after_days=30, batch_size=2) == 3
+    assert archive_run_events(session_factory, store, archive_after_days=30) == 0
+
+    with session_factory() as session:
+        hot_runs = set(session.execute(select(RunEventRow.run_id)).scalars())
+        assert hot_runs == {recent.run_id}
+        segments = set(session.execute(select(RunEventSegmentRow.segment)).scalars())
+        assert len(segments) == 2
+
+        session.add(
+            RunEventRow(
+                run_id=old[0].run_id,
+                ticket_id=old[0].ticket_id,
+                event_type="audit_note",
+                payload={"note": "late"},
+            )
+        )
+        session.commit()
+
+        after = read_run_events(session, store, old[0].run_id)
+    assert [event["event_type"] for event in before] == [
+        "run_claimed",
+        "state_transition",
+        "budget_check",
+        "state_transition",
+    ]
+    assert after[:-1] == before
+    assert after[-1]["event_type"] == "audit_note"
+
+
+def test_archiver_runner_archives_finished_runs(
+    session_factory: sessionmaker[Session], tmp_path: Path
+) -> None:
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=30)
+    supervisor = RunSupervisor(backlog=backlog, session_factory=session_factory)
+    run = _finished_run(supervisor, "ENG-A20")
+    with session_factory() as session:
+        session.execute(
+            update(RunRow)
+            .where(RunRow.id == run.run_id)
+            .values(ended_at=datetime.now(UTC) - timedelta(days=400))
+        )
+        session.commit()
+    stop = threading.Event()
+
+    class StoppingStore(LocalSegmentStore):
+        def put(self, name: str, data: bytes) -> None:
+            super().put(name, data)
+            stop.set()
+
+    run_archiver(session_factory, StoppingStore(tmp_path / "segments"), 0.01, stop=stop)
+
+    with session_factory() as session:
+        assert session.execute(select(RunEventRow.run_id)).first() is None
+        assert session.execute(select(RunEventSegmentRow.run_id)).scalars().all() == [run.run_id]
@@ -0,0 +1,173 @@
+"""Buffered run event ledger tests."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from software_factory.core.backlog.async_sqlalchemy_backlog import AsyncSQLAlchemyBacklog
+from software_factory.core.backlog.sqlalchemy_backlog import SQLAlchemyBacklog
+from software_factory.core.models import RunBudget, RunState
+from software_factory.core.supervisor.async_run_supervisor import AsyncRunSupervisor
+from software_factory.core.supervisor.event_buffer import RunEventBuffer
+from software_factory.core.supervisor.run_supervisor import RunSupervisor
+from software_factory.db.models import RunEventRow
+from tests.helpers import dispatch_run, make_ticket
+
+
+def _event_types(session_factory: sessionmaker[Session], run_id: str) -> list[str]:
+    with session_factory() as session:
+        return list(
+            session.execute(
+                select(RunEventRow.event_type)
+                .where(RunEventRow.run_id == run_id)
+                .order_by(RunEventRow.id)
+            ).scalars()
+        )
+
+
+def test_buffered_events_keep_per_run_order(session_factory: sessionmaker[Session]) -> None:
+    events = RunEventBuffer({"budget_check"}, max_batch=100, flush_interval_seconds=3600)
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=30)
+    supervisor = RunSupervisor(backlog=backlog, session_factory=session_factory, events=events)
+    run = dispatch_run(supervisor, "ENG-E1")
+    other = dispatch_run(supervisor, "ENG-E2")
+
+    supervisor.enforce_limits(run.run_id, token_count=10)
+    supervisor.enforce_limits(other.run_id, token_count=20)
+    supervisor.enforce_limits(run.run_id, token_count=30)
+    assert len(events) == 3
+    assert _event_types(session_factory, run.run_id) == ["run_claimed"]
+
+    supervisor.monitor_run(run.run_id, RunState.RUNNING)
+
+    assert len(events) == 0
+    assert _event_types(session_factory, run.run_id) == [
+        "run_claimed",
+        "budget_check",
+        "budget_check",
+        "state_transition",
+    ]
+    assert _event_types(session_factory, other.run_id) == ["run_claimed", "budget_check"]
+
+
+def test_buffer_flushes_on_size_threshold(session_factory: sessionmaker[Session]) -> None:
+    events = RunEventBuffer({"budget_check"}, max_batch=2, flush_interval_seconds=3600)
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=30)
+    supervisor = RunSupervisor(backlog=backlog, session_factory=session_factory, events=events)
+    run = dispatch_run(supervisor, "ENG-E3")
+
+    supervisor.enforce_limits(run.run_id, token_count=10)
+    assert _event_types(session_factory, run.run_id) == ["run_claimed"]
+    supervisor.enforce_limits(run.run_id, token_count=20)
+    assert _event_types(session_factory, run.run_id) == ["run_claimed", "budget_check", "budget_check"]
+
+
+def test_event_flusher_honours_time_threshold(session_factory: sessionmaker[Session]) -> None:
+    events = RunEventBuffer({"budget_check"}, max_batch=100, flush_interval_seconds=0.5)
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=30)
+    supervisor = RunSupervisor(backlog=backlog, session_factory=session_factory, events=events)
+    run = dispatch_run(supervisor, "ENG-E7")
+    supervisor.enforce_limits(run.run_id, token_count=10)
+    assert len(events) == 1
+
+    supervisor.start_event_flusher()
+    deadline = time.monotonic() + 5
+    while len(events) and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    assert _event_types(session_factory, run.run_id) == ["run_claimed", "budget_check"]
+    supervisor.close()
+
+
+def test_async_event_flusher_honours_time_threshold(
+    session_factory: sessionmaker[Session],
+    async_session_factory: async_sessionmaker[AsyncSession],
+) -> None:
+    events = RunEventBuffer({"budget_check"}, max_batch=100, flush_interval_seconds=0.5)
+    backlog = AsyncSQLAlchemyBacklog(session_factory=async_session_factory, lease_ttl_seconds=30)
+    supervisor = AsyncRunSupervisor(backlog=backlog, session_factory=async_session_factory, events=events)
+
+    async def _scenario() -> str:
+        created = await backlog.create_ticket(make_ticket("ENG-E8", "ENG-E8"))
+        run = await supervisor.dispatch(
+            created.id, "runner-1", "codex", RunBudget(max_minutes=10, max_tokens=1000)
+        )
+        assert run is not None
+        await supervisor.enforce_limits(run.run_id, token_count=10)
+        assert len(events) == 1
+
+        supervisor.start_event_flusher()
+        deadline = time.monotonic() + 5
+        while len(events) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        assert len(events) == 0
+        await supervisor.close()
+        return run.run_id
+
+    run_id = asyncio.run(_scenario())
+
+    assert _event_types(session_factory, run_id) == ["run_claimed", "budget_check"]
+
+
+def test_rolled_back_drain_requeues_events(session_factory: sessionmaker[Session]) -> None:
+    events = RunEventBuffer({"budget_check"}, flush_interval_seconds=3600)
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=30)
+    supervisor = RunSupervisor(backlog=backlog, session_factory=session_factory, events=events)
+    run = dispatch_run(supervisor, "ENG-E4")
+    supervisor.enforce_limits(run.run_id, token_count=10)
+
+    with session_factory() as session:
+        assert events.drain_into(session) == 1
+        session.rollback()
+
+    assert len(events) == 1
+    assert supervisor.flush_events() == 1
+    assert _event_types(session_factory, run.run_id) == ["run_claimed", "budget_check"]
+
+
+def test_drain_in_abandoned_session_requeues_events(session_factory: sessionmaker[Session]) -> None:
+    events = RunEventBuffer({"budget_check"}, flush_interval_seconds=3600)
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=30)
+    supervisor = RunSupervisor(backlog=backlog, session_factory=session_factory, events=events)
+    run = dispatch_run(supervisor, "ENG-E6")
+    supervisor.enforce_limits(run.run_id, token_count=10)
+
+    with pytest.raises(RuntimeError), session_factory() as session:
+        assert events.drain_into(session) == 1
+        raise RuntimeError("caller failed before commit")
+
+    assert len(events) == 1
+    assert supervisor.flush_events() == 1
+    assert len(events) == 0
+    assert _event_types(session_factory, run.run_id) == ["run_claimed", "budget_check"]
+
+
+def test_wal_replays_unflushed_events(session_factory: sessionmaker[Session], tmp_path: Path) -> None:
+    wal = tmp_path / "events.wal"
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=30)
+    crashed = RunSupervisor(
+        backlog=backlog,
+        session_factory=session_factory,
+        events=RunEventBuffer({"budget_check"}, flush_interval_seconds=3600, wal_path=wal),
+    )
+    run = dispatch_run(crashed, "ENG-E5")
+    crashed.enforce_limits(run.run_id, token_count=10)
+    crashed.events.close()
+
+    restarted = RunSupervisor(
+        backlog=backlog,
+        session_factory=session_factory,
+        events=RunEventBuffer({"budget_check"}, flush_interval_seconds=3600, wal_path=wal),
+    )
+    assert len(restarted.events) == 1
+    restarted.close()
+
+    assert _event_types(session_factory, run.run_id) == ["run_claimed", "budget_check"]
+    assert wal.read_text() == ""
@@ -0,0 +1,118 @@
+"""Redis hot counter tests."""
+
+from __future__ import annotations
+
+import fakeredis
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from software_factory.core.backlog.sqlalchemy_backlog import SQLAlchemyBacklog
+from software_factory.core.models import RunState, TicketStatus
+from software_factory.core.supervisor.hot_counters import RunCounters
+from software_factory.core.supervisor.run_supervisor import RunSupervisor
+from software_factory.db.models import RunEventRow, RunRow, TicketRow
+from tests.helpers import dispatch_run
+
+
+def _supervisor(session_factory: sessionmaker[Session]) -> RunSupervisor:
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=30)
+    counters = RunCounters(fakeredis.FakeRedis())
+    return RunSupervisor(backlog=backlog, session_factory=session_factory, counters=counters)
+
+
+def _token_count(session_factory: sessionmaker[Session], run_id: str) -> int:
+    with session_factory() as session:
+        return session.execute(select(RunRow.token_count).where(RunRow.id == run_id)).scalar_one()
+
+
+def test_reports_stay_in_redis_until_flush(session_factory: sessionmaker[Session]) -> None:
+    supervisor = _supervisor(session_factory)
+    run = dispatch_run(supervisor, "ENG-H1")
+
+    for _ in range(5):
+        report = supervisor.record_usage(run.run_id, token_delta=40)
+    assert report is not None
+    assert report.token_count == 200
+    assert report.exceeded is None
+
+    assert _token_count(session_factory, run.run_id) == 0
+
+    assert supervisor.flush_counters() == 1
+    assert supervisor.flush_counters() == 0
+    assert _token_count(session_factory, run.run_id) == 200
+
+
+def test_overrun_times_out_immediately(session_factory: sessionmaker[Session]) -> None:
+    supervisor = _supervisor(session_factory)
+    run = dispatch_run(supervisor, "ENG-H2", max_tokens=100)
+
+    assert supervisor.record_usage(run.run_id, token_delta=60) is not None
+    report = supervisor.record_usage(run.run_id, token_delta=60)
+
+    assert report is not None
+    assert report.exceeded == "max_tokens"
+    with session_factory() as session:
+        run_row = session.get(RunRow, run.run_id)
+        assert run_row is not None
+        assert run_row.state == RunState.TIMED_OUT
+        assert run_row.token_count == 120
+        ticket = session.execute(select(TicketRow).where(TicketRow.id == "ENG-H2")).scalar_one()
+        assert ticket.status == TicketStatus.FAILED
+
+    assert supervisor.record_usage(run.run_id, token_delta=1) is None
+
+
+def test_untracked_run_is_reseeded_from_database(session_factory: sessionmaker[Session]) -> None:
+    supervisor = _supervisor(session_factory)
+    run = dispatch_run(supervisor, "ENG-H3")
+    supervisor.record_usage(run.run_id, token_delta=70)
+    supervisor.flush_counters()
+    assert supervisor.counters is not None
+    supervisor.counters.redis_client.flushall()
+
+    report = supervisor.record_usage(run.run_id, token_delta=5)
+
+    assert report is not None
+    assert report.token_count == 75
+
+
+def test_supervisor_token_writes_go_through_counters(session_factory: sessionmaker[Session]) -> None:
+    supervisor = _supervisor(session_factory)
+    run = dispatch_run(supervisor, "ENG-H4")
+
+    supervisor.monitor_run(run.run_id, RunState.RUNNING, token_delta=500)
+    assert _token_count(session_factory, run.run_id) == 500
+    report = supervisor.record_usage(run.run_id, token_delta=10)
+    assert report is not None
+    assert report.token_count == 510
+    supervisor.flush_counters()
+    assert _token_count(session_factory, run.run_id) == 510
+
+    checked = supervisor.enforce_limits(run.run_id, token_count=900)
+    assert checked is not None
+    assert checked.token_count == 900
+    assert _token_count(session_factory, run.run_id) == 510
+    with session_factory() as session:
+        budget_checks = session.execute(
+            select(func.count())
+            .select_from(RunEventRow)
+            .where(RunEventRow.run_id == run.run_id, RunEventRow.event_type == "budget_check")
+        ).scalar_one()
+    assert budget_checks == 1
+
+    report = supervisor.record_usage(run.run_id, token_delta=200)
+
+    assert report is not None
+    assert report.exceeded == "max_tokens"
+    assert _token_count(session_factory, run.run_id) == 1100
+
+
+def test_retracking_keeps_counted_tokens(session_factory: sessionmaker[Session]) -> None:
+    supervisor = _supervisor(session_factory)
+    run = dispatch_run(supervisor, "ENG-H5")
+    supervisor.record_usage(run.run_id, token_delta=30)
+    assert supervisor.counters is not None
+
+    supervisor.counters.track([run])
+
+    assert supervisor.counters.usage([run.run_id])[run.run_id].token_count == 30
@@ -0,0 +1,121 @@
+"""In-memory backlog tests."""
+
+from __future__ import annotations
+
+import concurrent.futures
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from software_factory.core.backlog.memory_backlog import InMemoryBacklog
+from software_factory.core.models import TicketPriority, TicketStatus
+from tests.helpers import make_ticket
+
+
+def test_memory_backlog_orders_and_claims_by_priority() -> None:
+    backlog = InMemoryBacklog(lease_ttl_seconds=30)
+    backlog.create_tickets(
+        [
+            make_ticket("ENG-M1", "mem-low", TicketPriority.LOW),
+            make_ticket("ENG-M2", "mem-critical", TicketPriority.CRITICAL),
+            make_ticket("ENG-M3", "mem-high-1"),
+            make_ticket("ENG-M4", "mem-high-2"),
+        ]
+    )
+    duplicate = backlog.create_ticket(make_ticket("ENG-M5", "mem-low"))
+
+    assert duplicate.id == "ENG-M1"
+    assert [ticket.id for ticket in backlog.fetch_ready(limit=3)] == ["ENG-M2", "ENG-M3", "ENG-M4"]
+    assert [lease.ticket_id for lease in backlog.claim_next("worker-a", n=2)] == ["ENG-M2", "ENG-M3"]
+    assert [ticket.id for ticket in backlog.fetch_ready()] == ["ENG-M4", "ENG-M1"]
+
+
+def test_memory_backlog_claim_allows_only_one_winner() -> None:
+    backlog = InMemoryBacklog(lease_ttl_seconds=30)
+    created = backlog.create_ticket(make_ticket("ENG-M10", "mem-claim"))
+
+    def _claim(owner: str) -> bool:
+        return backlog.claim_ticket(created.id, owner) is not None
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=20) as executor:
+        results = list(executor.map(_claim, [f"worker-{i}" for i in range(20)]))
+
+    assert sum(results) == 1
+    assert backlog.claim_next("worker-b", n=5) == []
+
+
+def test_memory_backlog_lease_expiry_and_terminal_updates() -> None:
+    backlog = InMemoryBacklog(lease_ttl_seconds=1)
+    created = backlog.create_ticket(make_ticket("ENG-M20", "mem-expiry"))
+    first = backlog.claim_ticket(created.id, "worker-a")
+    assert first is not None
+    assert backlog.heartbeat(created.id, first.token) is not None
+    assert backlog.expired_leases() == []
+
+    time.sleep(1.1)
+    assert [lease.token for lease in backlog.expired_leases()] == [first.token]
+    assert backlog.heartbeat_many([(created.id, first.token)]).lost == [created.id]
+
+    second = backlog.claim_ticket(created.id, "worker-b")
+    assert second is not None
+    assert backlog.complete_ticket(created.id, first.token) is None
+
+    failed = backlog.fail_ticket(created.id, second.token, reason="test")
+    assert failed is not None
+    assert failed.status == TicketStatus.FAILED
+    assert failed.attempts == 1
+
+
+def test_memory_backlog_reaps_expired_leases() -> None:
+    backlog = InMemoryBacklog(lease_ttl_seconds=60, max_attempts=2)
+    backlog.create_tickets([make_ticket(f"ENG-M4{i}", f"mem-reap-{i}") for i in range(3)])
+    leases = backlog.claim_next("worker-a", n=2)
+    later = datetime.now(UTC) + timedelta(minutes=5)
+
+    first = backlog.reap_expired_leases(now=later)
+    assert first.requeued == [lease.ticket_id for lease in leases]
+    assert [ticket.id for ticket in backlog.fetch_ready()] == ["ENG-M40", "ENG-M41", "ENG-M42"]
+    assert backlog.complete_ticket(leases[0].ticket_id, leases[0].token) is None
+
+    backlog.claim_ticket("ENG-M40", "worker-b")
+    assert backlog.reap_expired_leases(now=later).failed == ["ENG-M40"]
+    assert backlog.expired_leases(now=later) == []
+
+
+def test_memory_backlog_reaped_claim_is_queued_once() -> None:
+    backlog = InMemoryBacklog(lease_ttl_seconds=60, max_attempts=3)
+    backlog.create_ticket(make_ticket("ENG-M50", "mem-reap-once"))
+    assert backlog.claim_ticket("ENG-M50", "worker-a") is not None
+
+    assert backlog.reap_expired_leases(now=datetime.now(UTC) + timedelta(minutes=5)).requeued == [
+        "ENG-M50"
+    ]
+    assert [ticket.id for ticket in backlog.fetch_ready()] == ["ENG-M50"]
+    assert [lease.ticket_id for lease in backlog.claim_next("worker-b", n=5)] == ["ENG-M50"]
+
+
+def test_memory_backlog_snapshot_round_trip(tmp_path: Path) -> None:
+    backlog = InMemoryBacklog(lease_ttl_seconds=30)
+    backlog.create_tickets([make_ticket(f"ENG-M3{i}", f"mem-snap-{i}") for i in range(3)])
+    lease = backlog.claim_next("worker-a", n=1)[0]
+
+    path = tmp_path / "backlog.json"
+    backlog.snapshot(path)
+    restored = InMemoryBacklog.restore(path, lease_ttl_seconds=30)
+
+    assert [ticket.id for ticket in restored.fetch_ready()] == ["ENG-M31", "ENG-M32"]
+    assert restored.create_ticket(make_ticket("ENG-M99", "mem-snap-0")).id == "ENG-M30"
+    assert restored.heartbeat(lease.ticket_id, lease.token) is not None
+
+
+def test_memory_backlog_iter_tickets_filters_and_orders() -> None:
+    backlog = InMemoryBacklog(lease_ttl_seconds=30)
+    tickets = [make_ticket(f"ENG-M4{i}", f"mem-iter-{i}") for i in range(7)]
+    backlog.create_tickets(tickets)
+    lease = backlog.claim_next("worker-a", n=1)[0]
+
+    ready = [ticket.id for ticket in backlog.iter_tickets(status=TicketStatus.READY, batch_size=3)]
+
+    assert [ticket.id for ticket in backlog.iter_tickets(batch_size=2)] == [t.id for t in tickets]
+    assert lease.ticket_id not in ready
+    assert len(ready) == 6
@@ -0,0 +1,84 @@
+"""Run projection tests."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session, sessionmaker
+
+from software_factory.core.backlog.sqlalchemy_backlog import SQLAlchemyBacklog
+from software_factory.core.models import RunState
+from software_factory.core.supervisor.event_buffer import RunEventBuffer
+from software_factory.core.supervisor.projection import RunProjector
+from software_factory.core.supervisor.run_supervisor import RunSupervisor
+from software_factory.db.models import RunRow, RunSnapshotRow
+from tests.helpers import dispatch_run
+
+
+def _supervisor(session_factory: sessionmaker[Session]) -> RunSupervisor:
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=30)
+    return RunSupervisor(backlog=backlog, session_factory=session_factory, events=RunEventBuffer())
+
+
+def _later() -> datetime:
+    return datetime.now(UTC) + timedelta(minutes=1)
+
+
+def test_catch_up_matches_runs_and_resumes_from_checkpoint(
+    session_factory: sessionmaker[Session],
+) -> None:
+    supervisor = _supervisor(session_factory)
+    run = dispatch_run(supervisor, "ENG-P1")
+    other = dispatch_run(supervisor, "ENG-P2")
+    supervisor.monitor_run(run.run_id, RunState.RUNNING, token_delta=5)
+    supervisor.enforce_limits(run.run_id, token_count=40)
+    projector = RunProjector(session_factory)
+
+    assert projector.catch_up(batch_size=2, now=_later()) == 4
+    assert projector.catch_up(now=_later()) == 0
+
+    supervisor.monitor_run(run.run_id, RunState.SUCCEEDED, token_delta=2)
+    supervisor.monitor_run(other.run_id, RunState.CANCELED)
+    assert projector.catch_up(now=_later()) == 2
+
+    for run_id in (run.run_id, other.run_id):
+        projection = projector.project(run_id)
+        with session_factory() as session:
+            run_row = session.get(RunRow, run_id)
+            snapshot = session.get(RunSnapshotRow, run_id)
+        assert projection is not None and run_row is not None and snapshot is not None
+        assert snapshot.last_event_id == projection.last_event_id
+        assert projection.state == run_row.state
+        assert projection.version == run_row.version
+        assert projection.token_count == run_row.token_count
+        assert projection.harness == "codex"
+
+
+def test_project_replays_tail_and_restores_runs(session_factory: sessionmaker[Session]) -> None:
+    supervisor = _supervisor(session_factory)
+    run = dispatch_run(supervisor, "ENG-P3")
+    projector = RunProjector(session_factory)
+    projector.catch_up(now=_later())
+
+    supervisor.monitor_run(run.run_id, RunState.RUNNING)
+    supervisor.enforce_limits(run.run_id, token_count=70)
+
+    projection = projector.project(run.run_id)
+    assert projection is not None
+    assert projection.state == RunState.RUNNING
+    assert projection.token_count == 70
+
+    with session_factory() as session:
+        session.execute(
+            update(RunRow)
+            .where(RunRow.id == run.run_id)
+            .values(state=RunState.CLAIMED, token_count=0, version=1)
+        )
+        session.commit()
+
+    assert projector.restore_runs([run.run_id, "missing"]) == 1
+    with session_factory() as session:
+        run_row = session.get(RunRow, run.run_id)
+        assert run_row is not None
+        assert (run_row.state, run_row.token_count, run_row.version) == (RunState.RUNNING, 70, 2)
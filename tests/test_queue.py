@@ -0,0 +1,220 @@
+"""Queue implementation tests."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import threading
+from datetime import UTC, datetime, timedelta
+from typing import cast
+
+import fakeredis
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from software_factory.core.backlog.sqlalchemy_backlog import SQLAlchemyBacklog
+from software_factory.core.models import TicketPriority
+from software_factory.core.queue.async_redis_queue import AsyncRedisQueue
+from software_factory.core.queue.interface import QueueItem
+from software_factory.core.queue.outbox_relay import OutboxRelay
+from software_factory.core.queue.priority_queue import PriorityRedisQueue
+from software_factory.core.queue.redis_queue import RedisQueue
+from software_factory.core.queue.reliable_queue import ReliableRedisQueue
+from software_factory.core.queue.sql_queue import SQLQueue
+from software_factory.db.models import QueueDeadLetterRow, TicketOutboxRow
+from software_factory.services.manager.relay import run_outbox_relay
+from tests.helpers import make_ticket
+
+
+def test_priority_queue_orders_by_priority_then_age_in_batches() -> None:
+    queue = PriorityRedisQueue(fakeredis.FakeRedis(), priority_aging_minutes=0)
+    queue.enqueue_many(
+        [
+            QueueItem("ENG-1", TicketPriority.LOW),
+            QueueItem("ENG-2", TicketPriority.CRITICAL),
+            QueueItem("ENG-3", TicketPriority.HIGH),
+        ]
+    )
+    queue.enqueue(QueueItem("ENG-4", TicketPriority.CRITICAL))
+    queue.enqueue(QueueItem("ENG-1", TicketPriority.CRITICAL))
+
+    assert queue.pending_count() == 4
+    assert [item.ticket_id for item in queue.dequeue_many(3)] == ["ENG-2", "ENG-4", "ENG-3"]
+    assert queue.dequeue() == QueueItem("ENG-1")
+    assert queue.dequeue() is None
+    assert queue.dequeue_many(10) == []
+
+
+def test_priority_aging_lets_old_low_priority_items_win() -> None:
+    queue = PriorityRedisQueue(fakeredis.FakeRedis(), priority_aging_minutes=60)
+
+    old_low = queue.score(QueueItem("ENG-1", TicketPriority.LOW), enqueued_ms=0)
+    new_critical = queue.score(QueueItem("ENG-2", TicketPriority.CRITICAL), enqueued_ms=4 * 3_600_000)
+
+    assert old_low < new_critical
+
+
+def test_redis_queue_batches_keep_fifo_order() -> None:
+    queue = RedisQueue(fakeredis.FakeRedis())
+    queue.enqueue_many([QueueItem(f"ENG-{i}") for i in range(5)])
+
+    assert [item.ticket_id for item in queue.dequeue_many(3)] == ["ENG-0", "ENG-1", "ENG-2"]
+    assert queue.pending_count() == 2
+    assert [item.ticket_id for item in queue.dequeue_many(5)] == ["ENG-3", "ENG-4"]
+
+
+def test_reliable_queue_redelivers_until_dead_letter() -> None:
+    redis_client = fakeredis.FakeRedis()
+    worker = ReliableRedisQueue(
+        redis_client, consumer="worker-a", visibility_timeout_seconds=30, max_deliveries=2
+    )
+    worker.enqueue_many([QueueItem("ENG-1"), QueueItem("ENG-2")])
+
+    first, second = worker.dequeue_many(2)
+    assert worker.pending_count() == 0
+    assert worker.inflight_count() == 2
+    assert worker.ack(second)
+    assert not worker.ack(second)
+
+    assert worker.requeue_expired() == 0
+    later = datetime.now(UTC) + timedelta(seconds=60)
+    assert worker.requeue_expired(now=later) == 1
+    assert worker.pending_count() == 1
+
+    assert worker.dequeue() == first
+    assert worker.nack(first)
+    assert worker.pending_count() == 0
+    assert worker.inflight_count() == 0
+    dead = cast(bytes, redis_client.lpop("factory:dlq"))
+    assert json.loads(dead) == {"ticket_id": "ENG-1", "reason": "nack"}
+
+
+def test_reliable_queue_adopts_orphaned_processing_items() -> None:
+    redis_client = fakeredis.FakeRedis()
+    worker = ReliableRedisQueue(
+        redis_client, consumer="worker-a", visibility_timeout_seconds=30, block_timeout_seconds=0
+    )
+    worker.enqueue(QueueItem("ENG-1"))
+    redis_client.lmove("factory:ready", worker.processing_name, "LEFT", "RIGHT")
+    redis_client.sadd(worker.consumers_name, "worker-a")
+
+    assert worker.dequeue() is None
+    assert worker.requeue_expired() == 0
+    assert worker.requeue_expired(now=datetime.now(UTC) + timedelta(seconds=60)) == 1
+    assert worker.dequeue() == QueueItem("ENG-1")
+
+
+def test_async_queue_consumes_with_blocking_pops_and_back_pressure() -> None:
+    async def scenario() -> tuple[list[str], list[str], int]:
+        redis_client = fakeredis.FakeAsyncRedis()
+        queue = AsyncRedisQueue(redis_client)
+
+        async def produce() -> None:
+            await asyncio.sleep(0.05)
+            await queue.enqueue_many([QueueItem(f"ENG-{i}") for i in range(5)])
+
+        producer = asyncio.create_task(produce())
+        taken: list[str] = []
+        async with contextlib.aclosing(queue.consume(batch=3, timeout=1)) as items:
+            async for item in items:
+                taken.append(item.ticket_id)
+                if len(taken) == 2:
+                    break
+        await producer
+
+        left = [item.ticket_id for item in await queue.dequeue_many(10, timeout=0)]
+        consumer = asyncio.create_task(queue.dequeue(timeout=None))
+        await asyncio.sleep(0.05)
+        consumer.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await consumer
+        return taken, left, await queue.pending_count()
+
+    taken, left, pending = asyncio.run(scenario())
+
+    assert taken == ["ENG-0", "ENG-1"]
+    assert left == ["ENG-2", "ENG-3", "ENG-4"]
+    assert pending == 0
+
+
+def test_sql_queue_orders_by_priority_then_fifo_in_batches(
+    session_factory: sessionmaker[Session],
+) -> None:
+    queue = SQLQueue(session_factory, poll_interval_seconds=0)
+    other = SQLQueue(session_factory, name="factory:other")
+    queue.enqueue_many(
+        [
+            QueueItem("ENG-1", TicketPriority.LOW),
+            QueueItem("ENG-2", TicketPriority.CRITICAL),
+            QueueItem("ENG-3"),
+        ]
+    )
+    queue.enqueue(QueueItem("ENG-4", TicketPriority.CRITICAL))
+    other.enqueue(QueueItem("ENG-5"))
+
+    assert queue.pending_count() == 4
+    assert queue.wait()
+    assert queue.dequeue_many(3) == [
+        QueueItem("ENG-2", TicketPriority.CRITICAL),
+        QueueItem("ENG-4", TicketPriority.CRITICAL),
+        QueueItem("ENG-3"),
+    ]
+    assert queue.dequeue() == QueueItem("ENG-1", TicketPriority.LOW)
+    assert queue.dequeue() is None
+    assert not queue.wait()
+    assert other.pending_count() == 1
+
+    queue.dead_letter(QueueItem("ENG-1"), "unclaimable")
+    with session_factory() as session:
+        dead = session.scalars(select(QueueDeadLetterRow)).one()
+    assert (dead.queue, dead.ticket_id, dead.reason) == ("factory:dlq", "ENG-1", "unclaimable")
+
+
+def test_outbox_relay_publishes_each_ready_ticket_once(
+    session_factory: sessionmaker[Session],
+) -> None:
+    backlog = SQLAlchemyBacklog(session_factory, lease_ttl_seconds=60, max_attempts=3, outbox=True)
+    queue = PriorityRedisQueue(fakeredis.FakeRedis())
+    relay = OutboxRelay(session_factory, queue, batch_size=1)
+    backlog.create_tickets(
+        [
+            make_ticket("ENG-1", "key-1", TicketPriority.LOW),
+            make_ticket("ENG-2", "key-2"),
+            make_ticket("ENG-3", "key-1"),
+        ]
+    )
+    backlog.create_ticket(make_ticket("ENG-2", "key-2"))
+
+    done = backlog.claim_ticket("ENG-1", "worker-a")
+    assert done is not None
+    backlog.complete_ticket("ENG-1", done.token)
+    assert backlog.claim_ticket("ENG-2", "worker-a") is not None
+    reaped = backlog.reap_expired_leases(now=datetime.now(UTC) + timedelta(minutes=5))
+    assert reaped.requeued == ["ENG-2"]
+
+    assert relay.drain() == 3
+    # A row replayed after a crash between enqueue and commit is a no-op.
+    with session_factory() as session:
+        session.add(TicketOutboxRow(ticket_id="ENG-2", idempotency_key="key-2"))
+        session.commit()
+    assert relay.drain() == 1
+    assert [item.ticket_id for item in queue.dequeue_many(10)] == ["ENG-2"]
+    assert relay.drain() == 0
+    with session_factory() as session:
+        assert session.scalar(select(func.count()).select_from(TicketOutboxRow)) == 0
+
+
+def test_outbox_relay_runner_publishes_staged_tickets(
+    session_factory: sessionmaker[Session],
+) -> None:
+    backlog = SQLAlchemyBacklog(session_factory, lease_ttl_seconds=60, outbox=True)
+    queue = PriorityRedisQueue(fakeredis.FakeRedis())
+    backlog.create_ticket(make_ticket("ENG-9", "key-9"))
+
+    stop = threading.Event()
+    timer = threading.Timer(0.2, stop.set)
+    timer.start()
+    run_outbox_relay(OutboxRelay(session_factory, queue), 0.05, stop=stop)
+
+    assert [item.ticket_id for item in queue.dequeue_many(10)] == ["ENG-9"]
@@ -0,0 +1,90 @@
+"""Lease retention tests."""
+
+from __future__ import annotations
+
+import threading
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from software_factory.core.backlog.retention import archive_released_leases
+from software_factory.core.backlog.sqlalchemy_backlog import SQLAlchemyBacklog
+from software_factory.core.supervisor.event_archive import LocalSegmentStore
+from software_factory.db.models import LeaseArchiveRow, LeaseRow, TicketRow
+from software_factory.services.manager.archiver import run_archiver
+from tests.helpers import make_ticket
+
+
+def test_archive_moves_only_old_released_leases(session_factory: sessionmaker[Session]) -> None:
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=30)
+    backlog.create_tickets([make_ticket(f"ENG-R{i}", f"retention-key-{i}") for i in range(5)])
+    leases = backlog.claim_next("worker-a", n=5)
+    for lease in leases[:4]:
+        assert backlog.complete_ticket(lease.ticket_id, lease.token) is not None
+
+    with session_factory() as session:
+        for row in session.execute(select(LeaseRow)).scalars():
+            if row.ticket_id in {"ENG-R0", "ENG-R1", "ENG-R2"}:
+                row.released_at = datetime.now(UTC) - timedelta(days=40)
+        session.commit()
+
+    archived = archive_released_leases(session_factory, retention_days=30, batch_size=2)
+
+    assert archived == 3
+    with session_factory() as session:
+        hot = sorted(row.ticket_id for row in session.execute(select(LeaseRow)).scalars())
+        cold = sorted(row.ticket_id for row in session.execute(select(LeaseArchiveRow)).scalars())
+    assert hot == ["ENG-R3", "ENG-R4"]
+    assert cold == ["ENG-R0", "ENG-R1", "ENG-R2"]
+    assert backlog.heartbeat(leases[4].ticket_id, leases[4].token) is not None
+
+
+def test_reclaimed_expired_lease_is_archived(session_factory: sessionmaker[Session]) -> None:
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=30)
+    backlog.create_ticket(make_ticket("ENG-R10", "retention-reclaim"))
+    expired = backlog.claim_ticket("ENG-R10", "worker-a")
+    assert expired is not None
+    with session_factory() as session:
+        ticket = session.get(TicketRow, "ENG-R10")
+        assert ticket is not None
+        ticket.lease_expires_at = datetime.now(UTC) - timedelta(seconds=1)
+        session.commit()
+
+    current = backlog.claim_ticket("ENG-R10", "worker-b")
+    assert current is not None
+
+    with session_factory() as session:
+        released = {
+            row.token: row.released_at for row in session.execute(select(LeaseRow)).scalars()
+        }
+    assert released[expired.token] is not None
+    assert released[current.token] is None
+
+    later = datetime.now(UTC) + timedelta(days=31)
+    assert archive_released_leases(session_factory, retention_days=30, now=later) == 1
+
+
+def test_archiver_runner_archives_released_leases(
+    session_factory: sessionmaker[Session], tmp_path: Path
+) -> None:
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=30)
+    backlog.create_ticket(make_ticket("ENG-R20", "retention-runner"))
+    lease = backlog.claim_ticket("ENG-R20", "worker-a")
+    assert lease is not None
+    backlog.complete_ticket(lease.ticket_id, lease.token)
+    with session_factory() as session:
+        for row in session.execute(select(LeaseRow)).scalars():
+            row.released_at = datetime.now(UTC) - timedelta(days=400)
+        session.commit()
+
+    stop = threading.Event()
+    timer = threading.Timer(0.2, stop.set)
+    timer.start()
+    run_archiver(session_factory, LocalSegmentStore(tmp_path), 0.05, stop=stop)
+
+    with session_factory() as session:
+        assert session.execute(select(LeaseRow)).first() is None
+        archived = session.execute(select(LeaseArchiveRow.token)).scalars().all()
+    assert archived == [lease.token]
@@ -0,0 +1,111 @@
+"""Manager dispatch loop tests."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from software_factory.core.backlog.async_sqlalchemy_backlog import AsyncSQLAlchemyBacklog
+from software_factory.core.backlog.interface import ReapResult
+from software_factory.core.backlog.memory_backlog import InMemoryBacklog
+from software_factory.core.models import RunBudget, Ticket
+from software_factory.core.supervisor.async_run_supervisor import AsyncRunSupervisor
+from software_factory.services.manager.reaper import run_reaper
+from software_factory.services.manager.scheduler import DispatchLoop, select_dispatch_batch
+from tests.helpers import make_ticket
+
+
+def _ticket(ticket_id: str, repo: str) -> Ticket:
+    return make_ticket(ticket_id, f"sched-{ticket_id}").model_copy(update={"repo": repo})
+
+
+def _loop(
+    session_factory: async_sessionmaker[AsyncSession], paused: list[bool] | None = None
+) -> DispatchLoop:
+    backlog = AsyncSQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=30)
+    flag = paused if paused is not None else [False]
+
+    async def is_paused() -> bool:
+        return flag[0]
+
+    return DispatchLoop(
+        backlog=backlog,
+        supervisor=AsyncRunSupervisor(backlog, session_factory, heartbeat_timeout_seconds=60),
+        harnesses=["codex", "aider"],
+        harness_slots=2,
+        repo_cap=2,
+        owner="manager-test",
+        budget=RunBudget(max_minutes=10, max_tokens=1000),
+        interval_seconds=0.01,
+        is_paused=is_paused,
+    )
+
+
+def test_select_dispatch_batch_spreads_harnesses_and_caps_repos() -> None:
+    ready = [_ticket("ENG-S1", "a"), _ticket("ENG-S2", "a"), _ticket("ENG-S3", "b"), _ticket("ENG-S4", "c")]
+
+    batch = select_dispatch_batch(ready, {"codex": 2, "aider": 1}, {"a": 1}, repo_cap=2, limit=10)
+
+    assert batch == [("ENG-S1", "codex"), ("ENG-S3", "codex"), ("ENG-S4", "aider")]
+
+
+def test_dispatch_tick_fills_free_slots(async_session_factory: async_sessionmaker[AsyncSession]) -> None:
+    paused = [True]
+    loop = _loop(async_session_factory, paused)
+
+    async def _scenario() -> None:
+        await loop.backlog.create_tickets(
+            [_ticket(f"ENG-D{i}", "a") for i in range(3)] + [_ticket(f"ENG-D{i}", "b") for i in range(3, 6)]
+        )
+        assert await loop.dispatch_tick() == []
+
+        paused[0] = False
+        runs = await loop.dispatch_tick()
+        assert sorted(run.ticket_id for run in runs) == ["ENG-D0", "ENG-D1", "ENG-D3", "ENG-D4"]
+        assert sorted(run.harness for run in runs) == ["aider", "aider", "codex", "codex"]
+        assert await loop.dispatch_tick() == []
+        assert len(await loop.backlog.fetch_ready()) == 2
+
+    asyncio.run(_scenario())
+
+
+def test_dispatch_loop_runs_until_stopped(async_session_factory: async_sessionmaker[AsyncSession]) -> None:
+    loop = _loop(async_session_factory)
+
+    async def _scenario() -> None:
+        await loop.backlog.create_ticket(_ticket("ENG-L1", "a"))
+        task = asyncio.create_task(loop.run())
+        await asyncio.sleep(0.2)
+        loop.stop()
+        await asyncio.wait_for(task, timeout=5)
+
+    asyncio.run(_scenario())
+
+    stats = loop.stats_snapshot()
+    assert all(stats[name]["ticks"] >= 1 for name in ("dispatch", "monitor", "recovery"))
+    assert stats["dispatch"]["errors"] == 0
+    assert "p95_ms" in stats["dispatch"]
+
+
+def test_reaper_survives_failed_passes() -> None:
+    stop = threading.Event()
+
+    class FlakyBacklog(InMemoryBacklog):
+        calls = 0
+
+        def reap_expired_leases(
+            self, now: datetime | None = None, batch_size: int = 500
+        ) -> ReapResult:
+            self.calls += 1
+            if self.calls == 1:
+                raise RuntimeError("database unavailable")
+            stop.set()
+            return super().reap_expired_leases(now, batch_size)
+
+    backlog = FlakyBacklog()
+    run_reaper(backlog, interval_seconds=0.01, stop=stop)
+
+    assert backlog.calls == 2
@@ -4,14 +4,15 @@ from __future__ import annotations
 
 from datetime import UTC, datetime, timedelta
 
-from sqlalchemy import select
+from sqlalchemy import event, select
 from sqlalchemy.orm import Session, sessionmaker
 
 from software_factory.core.backlog.sqlalchemy_backlog import SQLAlchemyBacklog
 from software_factory.core.models import RunBudget, RunState, TicketStatus
+from software_factory.core.supervisor.run_cache import ActiveRunCache
 from software_factory.core.supervisor.run_supervisor import RunSupervisor
-from software_factory.db.models import RunRow, TicketRow
-from tests.helpers import make_ticket
+from software_factory.db.models import LeaseRow, RunEventRow, RunRow, TicketRow
+from tests.helpers import dispatch_run, make_ticket
 
 
 def test_dispatch_creates_run_and_claims_ticket(session_factory: sessionmaker[Session]) -> None:
@@ -76,6 +77,55 @@ def test_succeeded_run_completes_ticket(session_factory: sessionmaker[Session])
         assert ticket.status == TicketStatus.COMPLETED
 
 
+def test_failed_run_releases_ticket_in_same_transaction(session_factory: sessionmaker[Session]) -> None:
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=30)
+    supervisor = RunSupervisor(backlog=backlog, session_factory=session_factory, heartbeat_timeout_seconds=1)
+
+    created = backlog.create_ticket(make_ticket(ticket_id="ENG-24", idempotency_key="run-key-5"))
+    run = supervisor.dispatch(
+        ticket_id=created.id,
+        owner="runner-1",
+        harness="codex",
+        budget=RunBudget(max_minutes=10, max_tokens=1000),
+    )
+    assert run is not None
+
+    failed = supervisor.monitor_run(run.run_id, RunState.CANCELED)
+    assert failed is not None
+
+    with session_factory() as session:
+        ticket = session.execute(select(TicketRow).where(TicketRow.id == created.id)).scalar_one()
+        lease = session.execute(select(LeaseRow).where(LeaseRow.token == run.lease_token)).scalar_one()
+        events = session.execute(
+            select(RunEventRow.event_type).where(RunEventRow.run_id == run.run_id)
+        ).scalars().all()
+    assert ticket.status == TicketStatus.FAILED
+    assert ticket.attempts == 1
+    assert ticket.last_failure_reason == "canceled"
+    assert ticket.lease_token is None
+    assert lease.released_at is not None
+    assert events == ["run_claimed", "state_transition"]
+
+
+def test_terminal_run_leaves_reclaimed_ticket_alone(session_factory: sessionmaker[Session]) -> None:
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=30)
+    supervisor = RunSupervisor(backlog=backlog, session_factory=session_factory, heartbeat_timeout_seconds=1)
+    run = dispatch_run(supervisor, "ENG-25")
+
+    backlog.reap_expired_leases(now=datetime.now(UTC) + timedelta(minutes=5))
+    lease = backlog.claim_ticket(run.ticket_id, owner="runner-2")
+    assert lease is not None
+
+    failed = supervisor.monitor_run(run.run_id, RunState.FAILED)
+    assert failed is not None and failed.state == RunState.FAILED
+
+    with session_factory() as session:
+        ticket = session.execute(select(TicketRow).where(TicketRow.id == run.ticket_id)).scalar_one()
+    assert ticket.status == TicketStatus.CLAIMED
+    assert ticket.lease_token == lease.token
+    assert ticket.lease_owner == "runner-2"
+
+
 def test_recover_stale_runs_marks_timeout(session_factory: sessionmaker[Session]) -> None:
     backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=30)
     supervisor = RunSupervisor(backlog=backlog, session_factory=session_factory, heartbeat_timeout_seconds=1)
@@ -97,3 +147,195 @@ def test_recover_stale_runs_marks_timeout(session_factory: sessionmaker[Session]
 
     recovered = supervisor.recover_stale_runs()
     assert run.run_id in recovered
+
+
+def test_recover_stale_runs_leaves_reclaimed_tickets_alone(
+    session_factory: sessionmaker[Session],
+) -> None:
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=30)
+    supervisor = RunSupervisor(backlog=backlog, session_factory=session_factory, heartbeat_timeout_seconds=1)
+    run = dispatch_run(supervisor, "ENG-26")
+
+    backlog.reap_expired_leases(now=datetime.now(UTC) + timedelta(minutes=5))
+    lease = backlog.claim_ticket(run.ticket_id, owner="runner-2")
+    assert lease is not None
+    with session_factory() as session:
+        row = session.execute(select(RunRow).where(RunRow.id == run.run_id)).scalar_one()
+        row.heartbeat_at = datetime.now(UTC) - timedelta(seconds=30)
+        session.commit()
+
+    assert supervisor.recover_stale_runs() == [run.run_id]
+
+    with session_factory() as session:
+        ticket = session.execute(select(TicketRow).where(TicketRow.id == run.ticket_id)).scalar_one()
+    assert ticket.status == TicketStatus.CLAIMED
+    assert ticket.lease_token == lease.token
+
+
+def test_recover_stale_runs_in_batches(session_factory: sessionmaker[Session]) -> None:
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=30)
+    supervisor = RunSupervisor(backlog=backlog, session_factory=session_factory, heartbeat_timeout_seconds=1)
+
+    runs = []
+    for i in range(5):
+        created = backlog.create_ticket(make_ticket(ticket_id=f"ENG-3{i}", idempotency_key=f"stale-{i}"))
+        run = supervisor.dispatch(
+            ticket_id=created.id,
+            owner="runner-1",
+            harness="codex",
+            budget=RunBudget(max_minutes=10, max_tokens=1000),
+        )
+        assert run is not None
+        runs.append(run)
+    supervisor.monitor_run(runs[0].run_id, RunState.RUNNING)
+
+    with session_factory() as session:
+        for row in session.execute(select(RunRow)).scalars():
+            if row.id != runs[4].run_id:
+                row.heartbeat_at = datetime.now(UTC) - timedelta(seconds=30)
+        session.commit()
+
+    recovered = supervisor.recover_stale_runs(batch_size=2)
+    assert sorted(recovered) == sorted(run.run_id for run in runs[:4])
+    assert supervisor.recover_stale_runs() == []
+
+    with session_factory() as session:
+        states = {row.id: row.state for row in session.execute(select(RunRow.id, RunRow.state))}
+        tickets = session.execute(select(TicketRow).order_by(TicketRow.id)).scalars().all()
+        released = session.execute(select(LeaseRow.released_at)).scalars().all()
+        transitions: list[dict[str, str]] = list(
+            session.execute(
+                select(RunEventRow.payload).where(
+                    RunEventRow.run_id == runs[0].run_id,
+                    RunEventRow.event_type == "state_transition",
+                )
+            ).scalars()
+        )
+    assert states[runs[4].run_id] == RunState.CLAIMED
+    assert [ticket.status for ticket in tickets] == [TicketStatus.FAILED] * 4 + [TicketStatus.CLAIMED]
+    assert [ticket.attempts for ticket in tickets] == [1, 1, 1, 1, 0]
+    assert sum(value is not None for value in released) == 4
+    assert transitions[-1] == {"from": "running", "to": "timed_out", "reason": "stale_heartbeat"}
+
+
+def test_enforce_all_limits_sweeps_fleet_in_constant_queries(
+    session_factory: sessionmaker[Session],
+) -> None:
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=30)
+    supervisor = RunSupervisor(backlog=backlog, session_factory=session_factory, heartbeat_timeout_seconds=60)
+
+    runs = []
+    for i in range(4):
+        created = backlog.create_ticket(make_ticket(ticket_id=f"ENG-4{i}", idempotency_key=f"sweep-{i}"))
+        run = supervisor.dispatch(
+            ticket_id=created.id,
+            owner="runner-1",
+            harness="codex",
+            budget=RunBudget(max_minutes=10, max_tokens=1000),
+        )
+        assert run is not None
+        runs.append(run)
+
+    with session_factory() as session:
+        row = session.execute(select(RunRow).where(RunRow.id == runs[0].run_id)).scalar_one()
+        row.deadline_at = datetime.now(UTC) - timedelta(minutes=1)
+        session.commit()
+
+    statements: list[str] = []
+
+    def record(*args: object) -> None:
+        statements.append(str(args[2]))
+
+    engine = session_factory.kw["bind"]
+    event.listen(engine, "before_cursor_execute", record)
+    timed_out = supervisor.enforce_all_limits(
+        {runs[1].run_id: 5000, runs[2].run_id: 200, "missing-run": 10}
+    )
+    event.remove(engine, "before_cursor_execute", record)
+
+    assert sorted(timed_out) == sorted([runs[0].run_id, runs[1].run_id])
+    assert len(statements) <= 10
+    with session_factory() as session:
+        rows = {row.id: row for row in session.execute(select(RunRow)).scalars()}
+        statuses = {row.id: row.status for row in session.execute(select(TicketRow.id, TicketRow.status))}
+    assert rows[runs[0].run_id].error_message == "Budget exceeded: max_minutes"
+    assert rows[runs[1].run_id].error_message == "Budget exceeded: max_tokens"
+    assert rows[runs[2].run_id].state == RunState.CLAIMED
+    assert rows[runs[2].run_id].token_count == 200
+    assert statuses["ENG-40"] == TicketStatus.FAILED
+    assert statuses["ENG-41"] == TicketStatus.FAILED
+    assert statuses["ENG-43"] == TicketStatus.CLAIMED
+
+
+def test_transitions_are_conditional_on_run_version(session_factory: sessionmaker[Session]) -> None:
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=30)
+    supervisor = RunSupervisor(backlog=backlog, session_factory=session_factory, heartbeat_timeout_seconds=1)
+
+    created = backlog.create_ticket(make_ticket(ticket_id="ENG-50", idempotency_key="version-key"))
+    run = supervisor.dispatch(
+        ticket_id=created.id,
+        owner="runner-1",
+        harness="codex",
+        budget=RunBudget(max_minutes=10, max_tokens=1000),
+    )
+    assert run is not None
+    running = supervisor.monitor_run(run.run_id, RunState.RUNNING, expected_version=run.version)
+    assert running is not None
+    assert running.version == run.version + 1
+
+    succeeded = supervisor.monitor_run(run.run_id, RunState.SUCCEEDED, expected_version=running.version)
+    stale = supervisor.monitor_run(run.run_id, RunState.FAILED, expected_version=running.version)
+    assert succeeded is not None
+    assert stale is None
+    assert supervisor.monitor_run(run.run_id, RunState.FAILED) is None
+
+    with session_factory() as session:
+        row = session.execute(select(RunRow).where(RunRow.id == run.run_id)).scalar_one()
+        transitions = session.execute(
+            select(RunEventRow.id).where(
+                RunEventRow.run_id == run.run_id, RunEventRow.event_type == "state_transition"
+            )
+        ).all()
+    assert row.state == RunState.SUCCEEDED
+    assert row.version == 3
+    assert len(transitions) == 2
+
+
+def test_active_run_cache_skips_reads_and_survives_other_replicas(
+    session_factory: sessionmaker[Session],
+) -> None:
+    backlog = SQLAlchemyBacklog(session_factory=session_factory, lease_ttl_seconds=30)
+    supervisor = RunSupervisor(
+        backlog=backlog, session_factory=session_factory, cache=ActiveRunCache(max_size=8)
+    )
+    replica = RunSupervisor(backlog=backlog, session_factory=session_factory)
+
+    created = backlog.create_ticket(make_ticket(ticket_id="ENG-60", idempotency_key="cache-key"))
+    run = supervisor.dispatch(
+        ticket_id=created.id,
+        owner="runner-1",
+        harness="codex",
+        budget=RunBudget(max_minutes=10, max_tokens=1000),
+    )
+    assert run is not None
+
+    statements: list[str] = []
+
+    def record(*args: object) -> None:
+        statements.append(str(args[2]))
+
+    engine = session_factory.kw["bind"]
+    event.listen(engine, "before_cursor_execute", record)
+    assert supervisor.monitor_run(run.run_id, RunState.RUNNING) is not None
+    assert supervisor.enforce_limits(run.run_id, token_count=10) is not None
+    event.remove(engine, "before_cursor_execute", record)
+    assert not [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+
+    assert replica.monitor_run(run.run_id, RunState.BLOCKED) is not None
+    resumed = supervisor.monitor_run(run.run_id, RunState.RUNNING)
+    assert resumed is not None
+    assert resumed.version == 4
+
+    assert supervisor.monitor_run(run.run_id, RunState.SUCCEEDED) is not None
+    assert supervisor.cache is not None
+    assert len(supervisor.cache) == 0